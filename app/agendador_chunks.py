@@ -0,0 +1,91 @@
+# ===================================================================
+# app/agendador_chunks.py (PRIORIZAÇÃO DE CHUNKS POR SEÇÃO DO PROCESSO)
+#
+# Funcionalidades:
+# - DETECÇÃO DE SEÇÃO: Identifica o tipo de peça de cada chunk (petição
+#   inicial, sentença, acórdão, contestação, ata, notificação, prova...).
+# - PRIORIDADE: Combina o peso da seção com a densidade de termos
+#   relevantes (pedidos, verbas, valores, datas contratuais).
+# - ORDEM DE PROCESSAMENTO: Os chunks de maior valor são enviados primeiro,
+#   respeitando o limite de concorrência configurado em
+#   GEMINI_MAX_CONCORRENCIA, para que uma prévia da consolidação fique
+#   disponível após os primeiros K chunks.
+# ===================================================================
+
+import os
+import re
+from normalizacao import normalizar_texto
+
+# Padrões de abertura/identificação de cada peça (texto já normalizado)
+PADROES_SECAO = {
+    "peticao_inicial": [r"peticao inicial", r"excelentissimo", r"reclamacao trabalhista", r"dos pedidos", r"requer a procedencia"],
+    "sentenca": [r"\bsentenca\b", r"\bdispositivo\b", r"julgo (?:parcialmente )?procedentes?", r"\bcondeno\b"],
+    "acordao": [r"\bacordao\b", r"\bacordam\b", r"recurso ordinario", r"\bturma\b"],
+    "contestacao": [r"\bcontestacao\b", r"\bimpugna", r"\bpreliminarmente\b"],
+    "calculos": [r"planilha de calculos?", r"\bliquidacao\b", r"memoria de calculo"],
+    "ata": [r"\bata de audiencia\b", r"\baudiencia\b", r"\bpregao\b"],
+    "notificacao": [r"\bnotificacao\b", r"\bintimacao\b", r"\bcitacao\b", r"\bmandado\b"],
+    "prova": [r"\bholerite\b", r"\brecibo\b", r"\bextrato\b", r"\bcartao de ponto\b", r"\bctps\b", r"\bdocumento\b"],
+}
+
+# Peso de cada seção na ordem de processamento
+PESO_SECAO = {
+    "peticao_inicial": 10,
+    "sentenca": 9,
+    "acordao": 8,
+    "calculos": 6,
+    "contestacao": 5,
+    "outros": 3,
+    "prova": 2,
+    "ata": 1,
+    "notificacao": 0,
+}
+
+# Termos cuja densidade indica dados úteis para o PJe-Calc
+TERMOS_DENSIDADE = re.compile(
+    r"\bverbas?\b|\bpedidos?\b|\bsalario\b|\bferias\b|\bfgts\b|\baviso previo\b|\bmulta\b|"
+    r"\bhoras extras\b|\bdano moral\b|\badmissao\b|\bdemissao\b|\brescisao\b|r\$ ?\d|\d{2}/\d{2}/\d{4}"
+)
+
+_REGEX_SECAO = {secao: [re.compile(p) for p in padroes] for secao, padroes in PADROES_SECAO.items()}
+
+
+def detectar_secao(texto):
+    """Retorna o tipo de peça com mais padrões encontrados no texto já normalizado."""
+    melhor, melhor_pontos = "outros", 0
+    for secao, padroes in _REGEX_SECAO.items():
+        pontos = sum(1 for regex in padroes if regex.search(texto))
+        if pontos > melhor_pontos:
+            melhor, melhor_pontos = secao, pontos
+    return melhor
+
+
+def calcular_prioridade(chunk):
+    """
+    Prioridade do chunk: peso da seção + densidade de termos relevantes
+    (ocorrências por 1.000 caracteres, limitada a 10).
+    """
+    texto = normalizar_texto(chunk)
+    secao = detectar_secao(texto)
+    ocorrencias = len(TERMOS_DENSIDADE.findall(texto))
+    densidade = min(10.0, ocorrencias * 1000.0 / max(len(texto), 1))
+    return PESO_SECAO[secao] + densidade, secao
+
+
+def ordenar_por_prioridade(text_chunks):
+    """
+    Retorna os índices dos chunks na ordem de processamento (maior prioridade
+    primeiro; empates mantêm a ordem do arquivo) e a seção de cada chunk.
+    """
+    prioridades = [calcular_prioridade(chunk) for chunk in text_chunks]
+    ordem = sorted(range(len(text_chunks)), key=lambda i: (-prioridades[i][0], i))
+    secoes = [secao for _, secao in prioridades]
+    return ordem, secoes
+
+
+def max_concorrencia():
+    """Limite de chamadas simultâneas ao Gemini (GEMINI_MAX_CONCORRENCIA, padrão 2)."""
+    try:
+        return max(1, int(os.getenv("GEMINI_MAX_CONCORRENCIA", "2")))
+    except ValueError:
+        return 2
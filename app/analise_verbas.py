@@ -5,13 +5,25 @@ Data: 2025-08-05
 """
 
 import re
-import unicodedata
 import datetime
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal, InvalidOperation
 import logging
 import difflib
+import os
+import copy
+import json
+import hashlib
+import threading
+import time
+from types import MappingProxyType
 from rag_manager import consultar_rag
+from cache_lru import CacheLRU
+from escaner_padroes import EscanerCategorias
+from correlacao_lote import MotorCorrelacao, IndiceVerbas, IndiceCorrelacoes
+from normalizacao import normalizar_texto, normalizar_com_mapa
+from deteccao_paralela import varrer_posicoes
+from instrumentacao import medir
 
 # Tentar importar pacotes NLTK, mas fornecer fallback se não estiver disponível
 try:
@@ -25,133 +37,178 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("analise_verbas")
 
-def aprimorar_padroes_verbas(analisador):
-    """
-    Melhora os padrões de detecção para verbas problemáticas.
-    Modifica o analisador passado como parâmetro.
-    """
+# Resultados memorizados por hash do texto + conteúdo da planilha/dados,
+# compartilhados entre reruns e sessões (limitados em número de entradas)
+_MAX_CACHE_ANALISE = int(os.getenv("ANALISE_VERBAS_CACHE_MAX", "16"))
+_cache_analise = CacheLRU(max_entradas=_MAX_CACHE_ANALISE, nome="analise_verbas")
+_cache_quadro = CacheLRU(max_entradas=_MAX_CACHE_ANALISE, nome="quadro_calculo")
+# Nomes de verbas distintos mantidos no cache do classificador
+_MAX_CACHE_CLASSIFICADOR = int(os.getenv("CLASSIFICADOR_VERBAS_CACHE_MAX", "4096"))
+
+
+def _chave_cache(texto, dados):
+    """Chave do cache: SHA-256 do texto e do JSON canônico dos dados."""
+    digest = hashlib.sha256((texto or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(dados, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Padrões adicionais para verbas problemáticas (usados por aprimorar_padroes_verbas)
+_PADROES_VERBAS_APRIMORADOS = {
     # 1. Padrões aprimorados para FGTS
-    analisador.categorias_verbas["fgts"].extend([
+    "fgts": [
         r"saldo[s]?\s+de\s+fgts", r"fgts\s+n[aã]o\s+recolhido",
         r"dep[óo]sito[s]?\s+do\s+fgts", r"fgts\s+em\s+atraso",
         r"parcela[s]?\s+do\s+fgts", r"recolhimento[s]?\s+fundi[áa]rio[s]?",
         r"dep[óo]sito[s]?\s+mensais\s+(?:d[eo]|no)?\s+fgts",
         r"fgts\s+não\s+depositado", r"obrigação\s+de\s+recolher\s+(?:o\s+)?fgts"
-    ])
-    
+    ],
+
     # 2. Padrões aprimorados para Intervalo Intrajornada
-    analisador.categorias_verbas["intervalo"].extend([
+    "intervalo": [
         r"hora\s+extra\s+intervalar", r"não\s+concess[ãa]o\s+de\s+intervalo", 
         r"intervalo\s+para\s+alimenta[çc][ãa]o", r"ausência\s+de\s+intervalo",
         r"intervalo\s+aliment[aá]rio", r"suprimido\s+o\s+intervalo",
         r"intervalo\s+m[íi]nimo", r"intervalo\s+legal", r"pausa\s+para\s+refeição",
         r"direito\s+[ao]o?\s+intervalo", r"horário\s+de\s+almo[çc]o"
-    ])
-    
+    ],
+
     # 3. Padrões aprimorados para Verbas por Acidente de Trabalho
-    analisador.categorias_verbas["verbas_acidente"].extend([
+    "verbas_acidente": [
         r"acidente[s]?(?:\s+de)?\s+trabalho", r"doen[çc]a[s]?\s+profission[ai][li]s?",
         r"c[âa]ncer", r"aux[íi]lio-?doen[çc]a\s+acidentário",
         r"B9[12]", r"atestado\s+m[ée]dico", r"afastamento\s+m[ée]dico",
         r"benef[íi]cio\s+previdenci[áa]rio", r"INSS\s+(?:por|devido\s+a)\s+doen[çc]a",
         r"afastamento\s+(?:por|devido\s+a)\s+doen[çc]a", r"CID\s*-?\s*[A-Z]\d+"
-    ])
-    
+    ],
+
     # 4. Padrões aprimorados para Rescisão Indireta
-    analisador.categorias_verbas["rescisao_indireta"].extend([
+    "rescisao_indireta": [
         r"rescis[ãa]o\s+por\s+culpa\s+d[ao](?:\s+parte)?\s+empregador[a]?",
         r"rescindir\s+indiretamente", r"rescis[ãa]o\s+contratual\s+indireta",
         r"rescis[ãa]o\s+do\s+contrato\s+por\s+culpa\s+d[ao](?:\s+parte)?\s+empregador[a]?",
         r"rescis[ãa]o\s+(?:por\s+meio|através)\s+d[ao]\s+art(?:igo)?\.?\s*483",
         r"rompimento\s+contratual\s+por\s+culpa\s+d[ao](?:\s+parte)?\s+empregador[a]?"
-    ])
-    
+    ],
+
     # 5. Padrões aprimorados para Obrigações Documentais
-    analisador.categorias_verbas["obrigacoes_documentos"].extend([
+    "obrigacoes_documentos": [
         r"carteira\s+de\s+trabalho", r"CTPS", 
         r"assinatura\s+d[ae](?:\s+carteira|\s+CTPS)", r"assinar\s+a\s+carteira",
         r"entrega\s+d[eo]s?\s+PPP", r"guias\s+d[eo]\s+seguro",
         r"fornec(?:er|imento)\s+d[eo]s?\s+documentos?",
         r"libera[çc][ãa]o\s+d[eo]s?\s+documentos?", r"comunicado\s+de\s+dispensa", 
         r"documenta[çc][ãa]o\s+rescis[óo]ria", r"anotação\s+n[ao]\s+registro"
-    ])
-    
+    ],
+
     # 6. Padrões aprimorados para Tutelas de Urgência
-    analisador.categorias_verbas["liminares_tutelas"].extend([
+    "liminares_tutelas": [
         r"provimento\s+jurisdicional\s+(?:de|em)?\s+urg[êe]ncia", 
         r"art\.?\s*300", r"C[óo]digo\s+de\s+Processo\s+Civil", 
         r"tutela\s+provis[óo]ria", r"medida\s+liminar",
         r"suspens[ãa]o\s+d[eo]", r"determin(?:e|ar|ação)\s+imediata",
         r"provimento\s+liminar", r"pedido\s+de\s+urg[êe]ncia"
-    ])
+    ]
+}
+
+
+def aprimorar_padroes_verbas(analisador):
+    """
+    Melhora os padrões de detecção para verbas problemáticas.
+    Modifica o analisador passado como parâmetro.
+    """
+    # 1-6. Padrões aprimorados (FGTS, intervalo, acidente, rescisão indireta,
+    # documentos e tutelas): troca o registro pelo já compilado com os extras
+    analisador.registro_padroes = obter_registro_padroes(aprimorado=True)
+    analisador.categorias_verbas = analisador.registro_padroes.padroes
     
     # 7. Aumentar o contexto de análise
     original_detectar_verbas = analisador.detectar_verbas
     
     def detectar_verbas_melhorado(texto):
         """Detecta todas as verbas mencionadas no texto com seu contexto ampliado."""
-        texto_norm = analisador.normalizar_texto(texto)
-        resultado = {}
-        
-        for categoria, patterns in analisador.categorias_verbas.items():
-            matches = []
-            for pattern in patterns:
-                for match in re.finditer(pattern, texto_norm):
-                    # Captura contexto: 250 caracteres antes e depois da menção (aumentado de 150)
-                    inicio = max(0, match.start() - 250)
-                    fim = min(len(texto_norm), match.end() + 250)
-                    
-                    matches.append({
-                        "termo": match.group(0),
-                        "contexto": texto_norm[inicio:fim],
-                        "posicao": match.start()
-                    })
-            
-            if matches:
-                resultado[categoria] = matches
-                
-        return resultado
+        # Captura contexto: 250 caracteres antes e depois da menção (aumentado de 150)
+        return analisador._montar_ocorrencias(normalizar_com_mapa(texto), 250)
 
     # Substituir o método original pelo melhorado
     analisador.detectar_verbas = detectar_verbas_melhorado
 
     return analisador
 
+
+# Nome padronizado de cada categoria de verba
+_NOMES_PADRONIZADOS = {
+    "salario": "Saldo de Salário",
+    "ferias": "Férias Proporcionais",
+    "13_salario": "13º Salário Proporcional",
+    "aviso_previo": "Aviso Prévio Indenizado",
+    "fgts": "Depósitos do FGTS",
+    "multa_477": "Multa do art. 477 da CLT",
+    "multa_467": "Multa do art. 467 da CLT",
+    "outras_multas": "Multas Convencionais/Legais",
+    "dano_moral": "Dano Moral",
+    "dano_material": "Dano Material",
+    "dano_estetico": "Dano Estético",
+    "dano_existencial": "Dano Existencial",
+    "assedio": "Assédio Moral/Sexual",
+    "plano_saude": "Reestabelecimento do Plano de Saúde",
+    "horas_extras": "Horas Extras",
+    "adicional_noturno": "Adicional Noturno",
+    "adicional_periculosidade": "Adicional de Periculosidade",
+    "adicional_insalubridade": "Adicional de Insalubridade",
+    "outros_adicionais": "Adicionais Diversos",
+    "intervalo": "Intervalo Intrajornada",
+    "intervalo_interjornada": "Intervalo Interjornada",
+    "verbas_acidente": "Verbas por Acidente de Trabalho",
+    "reintegracao": "Reintegração ao Emprego",
+    "verbas_gestante": "Estabilidade Gestante",
+    "verbas_dirigente": "Estabilidade Sindical/CIPA",
+    "rescisao_indireta": "Rescisão Indireta",
+    "obrigacoes_documentos": "Obrigações Documentais",
+    "liminares_tutelas": "Tutelas de Urgência"
+}
+
+
+# Dicionário de sinônimos baseado no compartilhado
+_DICIONARIO_VERBAS = {
+    "13_salario": [
+        "13º salário indenizado", "13º proporcional", "décimo terceiro proporcional", 
+        "pagamento de 13º", "indenização de 13º", "gratificação natalina", 
+        "13º salário proporcional"
+    ],
+    "ferias_vencidas": [
+        "férias vencidas", "férias não gozadas vencidas", 
+        "férias vencidas acrescidas de 1/3", "férias + 1/3 constitucional (vencidas)",
+        "férias vencidas + terço constitucional"
+    ],
+    "ferias_indenizadas": [
+        "férias proporcionais", "férias proporcionais + 1/3", "férias não gozadas proporcionais", 
+        "indenização de férias", "férias proporcionais acrescidas de 1/3",
+        "férias indenizadas"
+    ],
+    "fgts_multa": [
+        "fgts + 40%", "depósitos do fgts", "multa de 40% sobre o fgts", 
+        "liberação das guias do fgts", "recolhimentos fundiários", "fgts rescisório",
+        "multa de 40% do fgts", "fgts e multa de 40%"
+    ],
+    "multa_477": [
+        "multa do art. 477 da clt", "multa do artigo 477", "multa por atraso na rescisão", 
+        "multa por verbas rescisórias fora do prazo", "multa rescisória"
+    ],
+    "multa_467": [
+        "multa do art. 467 da clt", "multa do artigo 467", "multa por verbas incontroversas",
+        "multa por verbas não pagas na 1ª audiência", "multa incontroversas"
+    ]
+}
+
+
 def implementar_dicionario_verbas(analisador):
     """
     Implementa um sistema de reconhecimento por dicionário de sinônimos para verbas trabalhistas.
     """
     # Dicionário de sinônimos baseado no compartilhado
-    analisador.dicionario_verbas = {
-        "13_salario": [
-            "13º salário indenizado", "13º proporcional", "décimo terceiro proporcional", 
-            "pagamento de 13º", "indenização de 13º", "gratificação natalina", 
-            "13º salário proporcional"
-        ],
-        "ferias_vencidas": [
-            "férias vencidas", "férias não gozadas vencidas", 
-            "férias vencidas acrescidas de 1/3", "férias + 1/3 constitucional (vencidas)",
-            "férias vencidas + terço constitucional"
-        ],
-        "ferias_indenizadas": [
-            "férias proporcionais", "férias proporcionais + 1/3", "férias não gozadas proporcionais", 
-            "indenização de férias", "férias proporcionais acrescidas de 1/3",
-            "férias indenizadas"
-        ],
-        "fgts_multa": [
-            "fgts + 40%", "depósitos do fgts", "multa de 40% sobre o fgts", 
-            "liberação das guias do fgts", "recolhimentos fundiários", "fgts rescisório",
-            "multa de 40% do fgts", "fgts e multa de 40%"
-        ],
-        "multa_477": [
-            "multa do art. 477 da clt", "multa do artigo 477", "multa por atraso na rescisão", 
-            "multa por verbas rescisórias fora do prazo", "multa rescisória"
-        ],
-        "multa_467": [
-            "multa do art. 467 da clt", "multa do artigo 467", "multa por verbas incontroversas",
-            "multa por verbas não pagas na 1ª audiência", "multa incontroversas"
-        ]
-    }
+    analisador.dicionario_verbas = {c: list(sinonimos) for c, sinonimos in _DICIONARIO_VERBAS.items()}
     
     # Adicionar método para correspondência por dicionário
     def correspondencia_por_dicionario(self, verba_texto, verbas_planilha):
@@ -162,27 +219,31 @@ def implementar_dicionario_verbas(analisador):
         texto_norm = self.normalizar_texto(verba_texto.get("verba", ""))
         categoria = verba_texto.get("categoria", "")
         
+        # Sinônimos normalizados das categorias do dicionário ligadas à categoria da verba
+        sinonimos_categorias = [
+            [self.normalizar_texto(s) for s in sinonimos]
+            for cat_dict, sinonimos in self.dicionario_verbas.items()
+            if (cat_dict == categoria or 
+                (cat_dict == "ferias_vencidas" and categoria == "ferias") or
+                (cat_dict == "ferias_indenizadas" and categoria == "ferias") or
+                (cat_dict == "fgts_multa" and categoria == "fgts"))
+        ]
+        if not sinonimos_categorias:
+            return correspondencias
+        
         # Para cada verba da planilha
         for verba_planilha in verbas_planilha:
             planilha_norm = self.normalizar_texto(verba_planilha.get("verba", ""))
             
-            # Verificar correspondências de dicionário
-            for cat_dict, sinonimos in self.dicionario_verbas.items():
-                # Se a categoria da verba texto tem correspondência no dicionário
-                if (cat_dict == categoria or 
-                    (cat_dict == "ferias_vencidas" and categoria == "ferias") or
-                    (cat_dict == "ferias_indenizadas" and categoria == "ferias") or
-                    (cat_dict == "fgts_multa" and categoria == "fgts")):
-                    
-                    # Verificar se a verba da planilha é um dos sinônimos desta categoria
-                    sinonimos_norm = [self.normalizar_texto(s) for s in sinonimos]
-                    if any(s in planilha_norm or planilha_norm in s for s in sinonimos_norm):
-                        correspondencias.append({
-                            "verba_texto": verba_texto,
-                            "verba_planilha": verba_planilha,
-                            "pontuacao": 0.9,  # Alta pontuação para correspondências de dicionário
-                            "via_dicionario": True
-                        })
+            # Verificar se a verba da planilha é um dos sinônimos de cada categoria
+            for sinonimos_norm in sinonimos_categorias:
+                if any(s in planilha_norm or planilha_norm in s for s in sinonimos_norm):
+                    correspondencias.append({
+                        "verba_texto": verba_texto,
+                        "verba_planilha": verba_planilha,
+                        "pontuacao": 0.9,  # Alta pontuação para correspondências de dicionário
+                        "via_dicionario": True
+                    })
         
         return correspondencias
     
@@ -191,260 +252,369 @@ def implementar_dicionario_verbas(analisador):
     
     return analisador
 
+
+# Dicionário com categorias de verbas e expressões regulares correspondentes
+_PADROES_VERBAS_BASE = {
+    # VERBAS PRINCIPAIS (EXPANDIDAS)
+    "salario": [
+        r"sal[aá]rio.*base", r"remunera[cç][aã]o", r"saldo\s+de\s+sal[aá]rio",
+        r"diferen[çc]as?\s+salaria(l|is)", r"desvio\s+de\s+fun[çc][ãa]o",
+        r"acúmulo\s+de\s+fun[çc][ãa]o", r"equipara[çc][ãa]o\s+salarial",
+        r"sal[aá]rio.*substitui[çc][ãa]o", r"comiss[õo]es", r"sal[aá]rio\s+por\s+fora",
+        r"gorjetas", r"ajuda\s+de\s+custo", r"vantagens?\s+salaria(l|is)",
+        r"parcela\s+salarial", r"verbas?\s+salaria(l|is)"
+    ],
+    
+    "ferias": [
+        r"f[eé]rias", r"1/?3\s+(de|sobre)\s+f[eé]rias", r"adicional\s+de\s+f[eé]rias",
+        r"f[eé]rias\s+(?:em\s+)?dobro", r"f[eé]rias\s+proporcionais",
+        r"f[eé]rias\s+vencidas", r"f[eé]rias\s+n[ãa]o\s+gozadas",
+        r"indeniza[çc][ãa]o\s+de\s+f[eé]rias", r"abono\s+pecuni[aá]rio",
+        r"dobra\s+de\s+f[eé]rias", r"terço\s+constitucional"
+    ],
+    
+    "13_salario": [
+        r"13[\.º°]?\s*sal[aá]rio", r"d[eé]cimo\s+terceiro", r"gratifica[çc][ãa]o\s+natalina",
+        r"13[\.º°]?\s*proporcional", r"13[\.º°]?\s*integral"
+    ],
+    
+    "aviso_previo": [
+        r"aviso\s+pr[eé]vio", r"pr[eé]\s+aviso", r"indeniza[çc][ãa]o\s+de\s+aviso",
+        r"aviso\s+pr[eé]vio\s+proporcional", r"aviso\s+pr[eé]vio\s+trabalhado",
+        r"aviso\s+pr[eé]vio\s+indenizado", r"trintídio", r"projeta[çc][ãa]o\s+do\s+aviso",
+        r"proporcionalidade\s+do\s+aviso", r"lei\s+12\.506"
+    ],
+    
+    "fgts": [
+        r"fgts", r"fundo\s+de\s+garantia", r"dep[oó]sitos?\s+fundi[aá]rio",
+        r"diferen[çc]as?\s+de\s+fgts", r"corre[çc][ãa]o\s+do\s+fgts",
+        r"libera[çc][ãa]o\s+do\s+fgts", r"chave\s+de\s+conectividade",
+        r"tr\s+sobre\s+fgts", r"multa\s+do\s+fgts", r"40%\s+do\s+fgts",
+        r"saque\s+do\s+fgts", r"recolhimentos?\s+do\s+fgts"
+    ],
+    
+    # MULTAS (SEPARADAS)
+    "multa_477": [
+        r"multa\s+(do\s+)?art\.?\s*47[7]", r"multa\s+rescis[oó]ria", 
+        r"pagamento\s+fora\s+do\s+prazo\s+legal", r"atraso\s+nas?\s+verbas?\s+rescis[óo]rias?",
+        r"multa\s+por\s+atraso\s+no\s+pagamento\s+das\s+verbas", r"multa\s+pela\s+rescis[ãa]o",
+        r"penalidade\s+do\s+art\.?\s*47[7]"
+    ],
+    
+    "multa_467": [
+        r"multa\s+(do\s+)?art\.?\s*46[7]", r"multa\s+por\s+verbas\s+incontroversas", 
+        r"acr[ée]scimo\s+de\s+50\s*%", r"parcelas\s+incontroversas",
+        r"multa\s+de\s+50%", r"dobra\s+das\s+verbas\s+incontroversas"
+    ],
+    
+    "outras_multas": [
+        r"multa\s+(do\s+)?art\.?\s*47[9]", r"multa\s+(do\s+)?art\.?\s*48[0]",
+        r"multa\s+por\s+atraso\s+salarial", r"multa\s+convencional",
+        r"multa\s+normativa", r"multa\s+do\s+art\.?\s*47[4]-?A",
+        r"multa\s+diária", r"astreintes", r"multa\s+por\s+embargos\s+protelatórios",
+        r"multa\s+por\s+litigância\s+de\s+má-?fé"
+    ],
+    
+    # DANOS E INDENIZAÇÕES (EXPANDIDOS)
+    "dano_moral": [
+        r"danos?\s+mora(l|is)", r"indeniza[çc][ãa]o\s+por\s+dano\s+moral",
+        r"repara[çc][ãa]o\s+por\s+danos?\s+morais", r"abalo\s+moral",
+        r"sofrimento\s+moral", r"ofensa\s+[aà]\s+dignidade"
+    ],
+    
+    "dano_material": [
+        r"danos?\s+materia(l|is)", r"indeniza[çc][ãa]o\s+por\s+danos?\s+materiais",
+        r"ressarcimento\s+de\s+despesas", r"reembolso\s+de\s+gastos",
+        r"danos?\s+emergentes?", r"lucros?\s+cessantes?"
+    ],
+    
+    "dano_estetico": [
+        r"danos?\s+est[eé]ticos?", r"indeniza[çc][ãa]o\s+por\s+danos?\s+est[eé]ticos?",
+        r"altera[çc][ãa]o\s+est[eé]tica", r"deformidade\s+f[ií]sica",
+        r"cicatri(z|zes)", r"marca\s+permanente"
+    ],
+    
+    "dano_existencial": [
+        r"danos?\s+existencia(l|is)", r"indeniza[çc][ãa]o\s+por\s+danos?\s+existencia(l|is)",
+        r"projeto\s+de\s+vida", r"vida\s+de\s+rela[çc][ãa]o"
+    ],
+    
+    "assedio": [
+        r"ass[eé]dio\s+mora(l|is)", r"ass[eé]dio\s+sexua(l|is)",
+        r"ass[eé]dio\s+processual", r"persegui[çc][ãa]o\s+no\s+trabalho",
+        r"press[ãa]o\s+psicol[óo]gica", r"ambiente\s+t[óo]xico"
+    ],
+    
+    # BENEFÍCIOS E ADICIONAIS
+    "plano_saude": [
+        r"plano\s+de\s+sa[uú]de", r"unimed", r"assist[eê]ncia\s+m[eé]dica",
+        r"reintegra[çc][ãa]o\s+a[o]?\s+plano", r"extens[ãa]o\s+do\s+plano",
+        r"manuten[çc][ãa]o\s+do\s+plano", r"seguro\s+sa[úu]de",
+        r"conv[êe]nio\s+m[ée]dico", r"benef[íi]cio\s+de\s+sa[úu]de",
+        # Novos padrões
+        r"reembolso\s+(?:de\s+)?plano\s+de\s+sa[uú]de", r"despesas?\s+m[ée]dicas",
+        r"gastos\s+(?:com\s+)?sa[uú]de", r"assist[êe]ncia\s+médica\s+hospitalar"
+    ],
+    
+    "horas_extras": [
+        r"hora(s)?\s+extra(s)?", r"sobrejornada", r"adicional\s+de\s+horas?",
+        r"labor\s+extraordin[áa]rio", r"horas?\s+excedentes?", 
+        r"jornada\s+extraordin[aá]ria", r"adicional\s+de\s+50%",
+        r"adicional\s+de\s+100%", r"reflexos?\s+de\s+horas?\s+extras?", 
+        r"minutos?\s+residuais?",
+        # Novos padrões
+        r"horas?\s+home\s+office", r"trabalho\s+remoto\s+extraordin[áa]rio",
+        r"jornada\s+exaustiva", r"excesso\s+de\s+jornada",
+        r"horas?\s+(?:aos|em)\s+s[áa]bados", r"horas?\s+(?:aos|em)\s+domingos"
+    ],
+    
+    "adicional_noturno": [
+        r"adicional\s+noturno", r"trabalho\s+noturno", r"hora\s+noturna",
+        r"jornada\s+noturna", r"prorroga[çc][ãa]o\s+noturna", 
+        r"20%\s+noturno", r"per[íi]odo\s+noturno", r"labor\s+noturno"
+    ],
+    
+    "adicional_periculosidade": [
+        r"periculosidade", r"adicional\s+de\s+periculosidade",
+        r"trabalho\s+perigoso", r"atividade\s+de\s+risco",
+        r"30%\s+de\s+periculosidade", r"atividade\s+perigosa",
+        r"energia\s+el[ée]trica", r"combust[íi]veis?", r"explosivos", 
+        r"radia[çc][ãa]o\s+ionizante",
+        # Novos padrões
+        r"30%\s+sobre\s+o\s+sal[áa]rio", r"adicional\s+de\s+30%",
+        r"risco\s+de\s+vida", r"NR-16"
+    ],
+    
+    "adicional_insalubridade": [
+        r"insalubridade", r"adicional\s+de\s+insalubridade",
+        r"trabalho\s+insalubre", r"grau\s+m[áa]ximo", r"grau\s+m[ée]dio", 
+        r"grau\s+m[íi]nimo", r"40%\s+de\s+insalubridade",
+        r"20%\s+de\s+insalubridade", r"10%\s+de\s+insalubridade", 
+        r"agentes?\s+qu[íi]micos?", r"agentes?\s+f[íi]sicos?", 
+        r"agentes?\s+biol[óo]gicos?",
+        # Novos padrões
+        r"laudo\s+pericial\s+de\s+insalubridade", r"NR-15",
+        r"per[íi]cia\s+de\s+insalubridade", r"agentes\s+nocivos"
+    ],
+    
+    "outros_adicionais": [
+        r"adicional\s+de\s+transfer[êe]ncia", r"adicional\s+de\s+sobreaviso",
+        r"adicional\s+de\s+prontid[ãa]o", r"adicional\s+de\s+acúmulo",
+        r"adicional\s+de\s+risco", r"adicional\s+de\s+confinamento",
+        r"adic\s+de\s+campo", r"adicional\s+de\s+fronteira",
+        # Novos padrões
+        r"sobreaviso", r"regime\s+de\s+plant[ãa]o", r"1/3\s+do\s+sal[áa]rio-hora",
+        r"OJ\s+394", r"disponibilidade\s+(?:ao|para)\s+empregador"
+    ],
+    
+    # INTERVALOS
+    "intervalo": [
+        r"intervalo(\s+de\s+)?intrajornada", r"intrajornada", 
+        r"hora\s+intervalar", r"supressão\s+d[eo]\s+intervalo",
+        r"violação\s+d[eo]\s+intervalo", r"não\s+usufruto\s+d[oe]\s+intervalo",
+        r"intervalos?\s+(para\s+)?(refeição|descanso|alimentação)",
+        r"art\.?\s*71\s*d[a|e]\s*CLT", r"supressão\s+intervalar",
+        r"pausas?\s+para\s+alimenta[çc][ãa]o",
+        # Novos padrões
+        r"ausência\s+de\s+intervalo", r"intervalo\s+para\s+refeição\s+e\s+descanso",
+        r"não\s+concess[ãa]o\s+de\s+intervalo", r"sonegação\s+d[oe]\s+intervalo",
+        r"hora\s+extra\s+intervalar"
+    ],
+    
+    "intervalo_interjornada": [
+        r"intervalo\s+interjornada", r"interjornada", r"entre\s+jornadas",
+        r"descanso\s+entre\s+jornadas", r"art\.?\s*66\s*d[a|e]\s*CLT",
+        r"onze\s+horas\s+consecutivas", r"11\s+horas\s+de\s+descanso"
+    ],
+    
+    # VERBAS ESPECÍFICAS DE CATEGORIAS E SITUAÇÕES
+    "verbas_acidente": [
+        r"acidente\s+de\s+trabalho", r"doen[çc]a\s+ocupacional",
+        r"les[ãa]o\s+por\s+esfor[çc]o\s+repetitivo", r"LER", r"DORT",
+        r"estabilidade\s+acidentária", r"indeniza[çc][ãa]o\s+acidente",
+        r"CAT", r"aux[íi]lio-?acidente", r"pens[ãa]o\s+vital[íi]cia",
+        r"aux[íi]lio-?doen[çc]a", r"responsabilidade\s+civil\s+acidente",
+        # Novos padrões
+        r"sequelas\s+permanentes", r"agravamento\s+de\s+doen[çc]a",
+        r"afastamento\s+por\s+acidente", r"patologia\s+laboral",
+        r"nexo\s+causal", r"adoecimento\s+ocupacional",
+        r"perícia\s+médica", r"laudo\s+pericial"
+    ],
+    
+    "reintegracao": [
+        r"reintegra[çc][ãa]o", r"estabilidade", r"garantia\s+de\s+emprego",
+        r"anula[çc][ãa]o\s+da\s+demiss[ãa]o", r"revers[ãa]o\s+da\s+justa\s+causa",
+        r"indeniza[çc][ãa]o\s+substitutiva", r"restitui[çc][ãa]o\s+ao\s+emprego"
+    ],
+    
+    "verbas_gestante": [
+        r"estabilidade\s+gestante", r"licen[çc]a-?maternidade",
+        r"sal[áa]rio-?maternidade", r"amamenta[çc][ãa]o", 
+        r"intervalo\s+para\s+amamenta[çc][ãa]o"
+    ],
+    
+    "verbas_dirigente": [
+        r"estabilidade\s+sindical", r"dirigente\s+sindical", 
+        r"CIPA\s+estabilidade", r"cipeiro"
+    ],
+    
+    "rescisao_indireta": [
+        r"rescis[ãa]o\s+indireta", r"justa\s+causa\s+patronal",
+        r"falta\s+grave\s+d[ao]\s+empregador", r"art\.?\s*483",
+        # Novos padrões
+        r"conduta\s+abusiva\s+do\s+empregador", r"dispensa\s+indireta",
+        r"rescis[ãa]o\s+por\s+culpa\s+do\s+empregador", 
+        r"abandono\s+de\s+emprego\s+for[çc]ado"
+    ],
+    
+    # OBRIGAÇÕES DE FAZER
+    "obrigacoes_documentos": [
+        r"anota[çc][ãa]o\s+de\s+CTPS", r"baixa\s+na\s+CTPS", 
+        r"retifica[çc][ãa]o\s+de\s+CTPS", r"entrega\s+de\s+guias",
+        r"seguro-?desemprego", r"fornecimento\s+de\s+PPP", 
+        r"emiss[ãa]o\s+de\s+CAT", r"TRCT", r"chave\s+de\s+conectividade",
+        r"c[óo]digo\s+de\s+saque", r"libera[çc][ãa]o\s+de\s+FGTS", 
+        r"documento", r"entrega\s+de\s+documentos",
+        # Novos padrões
+        r"libera[çc][ãa]o\s+da\s+chave", r"guias\s+do\s+FGTS",
+        r"comunica[çc][ãa]o\s+de\s+dispensa", r"chave\s+de\s+saque",
+        r"registro\s+(?:em|na|de)\s+CTPS"
+    ],
+    
+    # TUTELAS ESPECÍFICAS
+    "liminares_tutelas": [
+        r"tutela\s+de\s+urg[êe]ncia", r"tutela\s+antecipada", 
+        r"liminar", r"obriga[çc][ãa]o\s+de\s+fazer", 
+        r"obriga[çc][ãa]o\s+de\s+n[ãa]o\s+fazer", r"medida\s+cautelar",
+        # Novos padrões
+        r"antecipa[çc][ãa]o\s+de\s+tutela", r"pedido\s+liminar",
+        r"determina[çc][ãa]o\s+judicial\s+urgente", r"manuten[çc][ãa]o\s+de\s+plano\s+de\s+sa[úu]de",
+        r"reintegra[çc][ãa]o\s+imediata", r"medida\s+de\s+urg[êe]ncia"
+    ],
+    
+    # NOVA CATEGORIA
+    "vale_transporte": [
+        r"vale(?:\s+|\-)?transporte", r"VT", r"transporte\s+fornecido", 
+        r"aux[íi]lio(?:\s+|\-)?transporte", r"reembolso\s+de\s+transporte",
+        r"despesas?\s+com\s+transporte", r"custeio\s+de\s+transporte",
+        r"lei\s+7.418"
+    ]
+}
+
+
+class RegistroPadroesVerbas:
+    """
+    Padrões de verbas compilados uma única vez e compartilhados entre todas
+    as instâncias do analisador. Somente leitura: categorias mapeiam para
+    tuplas, e os índices derivados são montados na criação.
+    """
+
+    def __init__(self, *fontes):
+        padroes = {}
+        for fonte in fontes:
+            for categoria, lista in fonte.items():
+                padroes.setdefault(categoria, []).extend(lista)
+
+        # Categoria -> tupla de padrões (texto), na ordem original
+        self.padroes = MappingProxyType({c: tuple(lista) for c, lista in padroes.items()})
+        # Categoria -> tupla de padrões compilados
+        self.compilados = MappingProxyType(
+            {c: tuple(re.compile(p) for p in lista) for c, lista in self.padroes.items()}
+        )
+        # Ordem de prioridade usada na classificação (primeira categoria que casar)
+        self.ordem_categorias = tuple(self.padroes)
+        self.total_padroes = sum(len(lista) for lista in self.padroes.values())
+        # Varredura única de todos os padrões sobre textos longos
+        self.escaner = EscanerCategorias(self.compilados)
+        # Nome de verba -> categoria, memorizado
+        self.classificador = ClassificadorVerbas(self)
+
+    def categoria_de(self, nome_norm):
+        """Primeira categoria cujo padrão ocorre no nome (já normalizado) da verba, ou None."""
+        for categoria in self.ordem_categorias:
+            if any(padrao.search(nome_norm) for padrao in self.compilados[categoria]):
+                return categoria
+        return None
+
+    def categoria_presente(self, categoria, nomes_norm):
+        """Indica se algum dos nomes (já normalizados) casa com os padrões da categoria."""
+        compilados = self.compilados.get(categoria, ())
+        return any(padrao.search(nome) for padrao in compilados for nome in nomes_norm)
+
+
+class ClassificadorVerbas:
+    """
+    Classifica nomes de verbas em categorias com cache LRU por nome
+    normalizado. Os nomes canônicos (dicionário de sinônimos e nomes
+    padronizados) já são classificados na criação.
+    """
+
+    def __init__(self, registro, max_entradas=_MAX_CACHE_CLASSIFICADOR):
+        self.registro = registro
+        self._cache = CacheLRU(max_entradas=max_entradas, nome="classificador_verbas")
+        canonicos = [nome for sinonimos in _DICIONARIO_VERBAS.values() for nome in sinonimos]
+        canonicos.extend(_NOMES_PADRONIZADOS.values())
+        self.precomputar(canonicos)
+
+    def precomputar(self, nomes):
+        """Classifica e guarda os nomes informados sem afetar as estatísticas."""
+        for nome in nomes:
+            nome_norm = normalizar_texto(nome)
+            self._cache.guardar(nome_norm, self.registro.categoria_de(nome_norm))
+
+    def classificar(self, nome_norm):
+        """Categoria do nome de verba (já normalizado) ou None."""
+        return self._cache.obter_ou_gerar(nome_norm, lambda: self.registro.categoria_de(nome_norm))
+
+    def estatisticas(self):
+        """Acertos, faltas e taxa de acerto do cache (para profiling)."""
+        return self._cache.estatisticas()
+
+
+# Registros do módulo: padrões base e base + aprimorados (criados sob demanda)
+_registros_padroes = {}
+_lock_registros = threading.Lock()
+
+
+def estatisticas_classificador():
+    """Estatísticas do cache de classificação de cada registro já criado."""
+    return {
+        ("aprimorado" if aprimorado else "base"): registro.classificador.estatisticas()
+        for aprimorado, registro in list(_registros_padroes.items())
+    }
+
+
+def obter_registro_padroes(aprimorado=False):
+    """Retorna o registro compartilhado de padrões (base ou com os aprimoramentos)."""
+    registro = _registros_padroes.get(aprimorado)
+    if registro is not None:
+        return registro
+    with _lock_registros:
+        if aprimorado not in _registros_padroes:
+            fontes = (_PADROES_VERBAS_BASE, _PADROES_VERBAS_APRIMORADOS) if aprimorado else (_PADROES_VERBAS_BASE,)
+            _registros_padroes[aprimorado] = RegistroPadroesVerbas(*fontes)
+        return _registros_padroes[aprimorado]
+
+
 class AnalisadorVerbasInteligente:
     """
     Classe principal que implementa a análise inteligente de verbas trabalhistas.
     Combina NLP, regras especializadas e consulta à base de conhecimento.
     """
     
+    def __setattr__(self, nome, valor):
+        # Analisadores entregues por `obter_analisador` são compartilhados entre sessões
+        if self.__dict__.get("_somente_leitura"):
+            raise AttributeError(
+                f"Analisador compartilhado é somente leitura (atributo '{nome}'); "
+                "crie uma instância própria para alterá-lo."
+            )
+        object.__setattr__(self, nome, valor)
+    
     def __init__(self):
-        # Dicionário com categorias de verbas e expressões regulares correspondentes
-        self.categorias_verbas = {
-            # VERBAS PRINCIPAIS (EXPANDIDAS)
-            "salario": [
-                r"sal[aá]rio.*base", r"remunera[cç][aã]o", r"saldo\s+de\s+sal[aá]rio",
-                r"diferen[çc]as?\s+salaria(l|is)", r"desvio\s+de\s+fun[çc][ãa]o",
-                r"acúmulo\s+de\s+fun[çc][ãa]o", r"equipara[çc][ãa]o\s+salarial",
-                r"sal[aá]rio.*substitui[çc][ãa]o", r"comiss[õo]es", r"sal[aá]rio\s+por\s+fora",
-                r"gorjetas", r"ajuda\s+de\s+custo", r"vantagens?\s+salaria(l|is)",
-                r"parcela\s+salarial", r"verbas?\s+salaria(l|is)"
-            ],
-            
-            "ferias": [
-                r"f[eé]rias", r"1/?3\s+(de|sobre)\s+f[eé]rias", r"adicional\s+de\s+f[eé]rias",
-                r"f[eé]rias\s+(?:em\s+)?dobro", r"f[eé]rias\s+proporcionais",
-                r"f[eé]rias\s+vencidas", r"f[eé]rias\s+n[ãa]o\s+gozadas",
-                r"indeniza[çc][ãa]o\s+de\s+f[eé]rias", r"abono\s+pecuni[aá]rio",
-                r"dobra\s+de\s+f[eé]rias", r"terço\s+constitucional"
-            ],
-            
-            "13_salario": [
-                r"13[\.º°]?\s*sal[aá]rio", r"d[eé]cimo\s+terceiro", r"gratifica[çc][ãa]o\s+natalina",
-                r"13[\.º°]?\s*proporcional", r"13[\.º°]?\s*integral"
-            ],
-            
-            "aviso_previo": [
-                r"aviso\s+pr[eé]vio", r"pr[eé]\s+aviso", r"indeniza[çc][ãa]o\s+de\s+aviso",
-                r"aviso\s+pr[eé]vio\s+proporcional", r"aviso\s+pr[eé]vio\s+trabalhado",
-                r"aviso\s+pr[eé]vio\s+indenizado", r"trintídio", r"projeta[çc][ãa]o\s+do\s+aviso",
-                r"proporcionalidade\s+do\s+aviso", r"lei\s+12\.506"
-            ],
-            
-            "fgts": [
-                r"fgts", r"fundo\s+de\s+garantia", r"dep[oó]sitos?\s+fundi[aá]rio",
-                r"diferen[çc]as?\s+de\s+fgts", r"corre[çc][ãa]o\s+do\s+fgts",
-                r"libera[çc][ãa]o\s+do\s+fgts", r"chave\s+de\s+conectividade",
-                r"tr\s+sobre\s+fgts", r"multa\s+do\s+fgts", r"40%\s+do\s+fgts",
-                r"saque\s+do\s+fgts", r"recolhimentos?\s+do\s+fgts"
-            ],
-            
-            # MULTAS (SEPARADAS)
-            "multa_477": [
-                r"multa\s+(do\s+)?art\.?\s*47[7]", r"multa\s+rescis[oó]ria", 
-                r"pagamento\s+fora\s+do\s+prazo\s+legal", r"atraso\s+nas?\s+verbas?\s+rescis[óo]rias?",
-                r"multa\s+por\s+atraso\s+no\s+pagamento\s+das\s+verbas", r"multa\s+pela\s+rescis[ãa]o",
-                r"penalidade\s+do\s+art\.?\s*47[7]"
-            ],
-            
-            "multa_467": [
-                r"multa\s+(do\s+)?art\.?\s*46[7]", r"multa\s+por\s+verbas\s+incontroversas", 
-                r"acr[ée]scimo\s+de\s+50\s*%", r"parcelas\s+incontroversas",
-                r"multa\s+de\s+50%", r"dobra\s+das\s+verbas\s+incontroversas"
-            ],
-            
-            "outras_multas": [
-                r"multa\s+(do\s+)?art\.?\s*47[9]", r"multa\s+(do\s+)?art\.?\s*48[0]",
-                r"multa\s+por\s+atraso\s+salarial", r"multa\s+convencional",
-                r"multa\s+normativa", r"multa\s+do\s+art\.?\s*47[4]-?A",
-                r"multa\s+diária", r"astreintes", r"multa\s+por\s+embargos\s+protelatórios",
-                r"multa\s+por\s+litigância\s+de\s+má-?fé"
-            ],
-            
-            # DANOS E INDENIZAÇÕES (EXPANDIDOS)
-            "dano_moral": [
-                r"danos?\s+mora(l|is)", r"indeniza[çc][ãa]o\s+por\s+dano\s+moral",
-                r"repara[çc][ãa]o\s+por\s+danos?\s+morais", r"abalo\s+moral",
-                r"sofrimento\s+moral", r"ofensa\s+[aà]\s+dignidade"
-            ],
-            
-            "dano_material": [
-                r"danos?\s+materia(l|is)", r"indeniza[çc][ãa]o\s+por\s+danos?\s+materiais",
-                r"ressarcimento\s+de\s+despesas", r"reembolso\s+de\s+gastos",
-                r"danos?\s+emergentes?", r"lucros?\s+cessantes?"
-            ],
-            
-            "dano_estetico": [
-                r"danos?\s+est[eé]ticos?", r"indeniza[çc][ãa]o\s+por\s+danos?\s+est[eé]ticos?",
-                r"altera[çc][ãa]o\s+est[eé]tica", r"deformidade\s+f[ií]sica",
-                r"cicatri(z|zes)", r"marca\s+permanente"
-            ],
-            
-            "dano_existencial": [
-                r"danos?\s+existencia(l|is)", r"indeniza[çc][ãa]o\s+por\s+danos?\s+existencia(l|is)",
-                r"projeto\s+de\s+vida", r"vida\s+de\s+rela[çc][ãa]o"
-            ],
-            
-            "assedio": [
-                r"ass[eé]dio\s+mora(l|is)", r"ass[eé]dio\s+sexua(l|is)",
-                r"ass[eé]dio\s+processual", r"persegui[çc][ãa]o\s+no\s+trabalho",
-                r"press[ãa]o\s+psicol[óo]gica", r"ambiente\s+t[óo]xico"
-            ],
-            
-            # BENEFÍCIOS E ADICIONAIS
-            "plano_saude": [
-                r"plano\s+de\s+sa[uú]de", r"unimed", r"assist[eê]ncia\s+m[eé]dica",
-                r"reintegra[çc][ãa]o\s+a[o]?\s+plano", r"extens[ãa]o\s+do\s+plano",
-                r"manuten[çc][ãa]o\s+do\s+plano", r"seguro\s+sa[úu]de",
-                r"conv[êe]nio\s+m[ée]dico", r"benef[íi]cio\s+de\s+sa[úu]de",
-                # Novos padrões
-                r"reembolso\s+(?:de\s+)?plano\s+de\s+sa[uú]de", r"despesas?\s+m[ée]dicas",
-                r"gastos\s+(?:com\s+)?sa[uú]de", r"assist[êe]ncia\s+médica\s+hospitalar"
-            ],
-            
-            "horas_extras": [
-                r"hora(s)?\s+extra(s)?", r"sobrejornada", r"adicional\s+de\s+horas?",
-                r"labor\s+extraordin[áa]rio", r"horas?\s+excedentes?", 
-                r"jornada\s+extraordin[aá]ria", r"adicional\s+de\s+50%",
-                r"adicional\s+de\s+100%", r"reflexos?\s+de\s+horas?\s+extras?", 
-                r"minutos?\s+residuais?",
-                # Novos padrões
-                r"horas?\s+home\s+office", r"trabalho\s+remoto\s+extraordin[áa]rio",
-                r"jornada\s+exaustiva", r"excesso\s+de\s+jornada",
-                r"horas?\s+(?:aos|em)\s+s[áa]bados", r"horas?\s+(?:aos|em)\s+domingos"
-            ],
-            
-            "adicional_noturno": [
-                r"adicional\s+noturno", r"trabalho\s+noturno", r"hora\s+noturna",
-                r"jornada\s+noturna", r"prorroga[çc][ãa]o\s+noturna", 
-                r"20%\s+noturno", r"per[íi]odo\s+noturno", r"labor\s+noturno"
-            ],
-            
-            "adicional_periculosidade": [
-                r"periculosidade", r"adicional\s+de\s+periculosidade",
-                r"trabalho\s+perigoso", r"atividade\s+de\s+risco",
-                r"30%\s+de\s+periculosidade", r"atividade\s+perigosa",
-                r"energia\s+el[ée]trica", r"combust[íi]veis?", r"explosivos", 
-                r"radia[çc][ãa]o\s+ionizante",
-                # Novos padrões
-                r"30%\s+sobre\s+o\s+sal[áa]rio", r"adicional\s+de\s+30%",
-                r"risco\s+de\s+vida", r"NR-16"
-            ],
-            
-            "adicional_insalubridade": [
-                r"insalubridade", r"adicional\s+de\s+insalubridade",
-                r"trabalho\s+insalubre", r"grau\s+m[áa]ximo", r"grau\s+m[ée]dio", 
-                r"grau\s+m[íi]nimo", r"40%\s+de\s+insalubridade",
-                r"20%\s+de\s+insalubridade", r"10%\s+de\s+insalubridade", 
-                r"agentes?\s+qu[íi]micos?", r"agentes?\s+f[íi]sicos?", 
-                r"agentes?\s+biol[óo]gicos?",
-                # Novos padrões
-                r"laudo\s+pericial\s+de\s+insalubridade", r"NR-15",
-                r"per[íi]cia\s+de\s+insalubridade", r"agentes\s+nocivos"
-            ],
-            
-            "outros_adicionais": [
-                r"adicional\s+de\s+transfer[êe]ncia", r"adicional\s+de\s+sobreaviso",
-                r"adicional\s+de\s+prontid[ãa]o", r"adicional\s+de\s+acúmulo",
-                r"adicional\s+de\s+risco", r"adicional\s+de\s+confinamento",
-                r"adic\s+de\s+campo", r"adicional\s+de\s+fronteira",
-                # Novos padrões
-                r"sobreaviso", r"regime\s+de\s+plant[ãa]o", r"1/3\s+do\s+sal[áa]rio-hora",
-                r"OJ\s+394", r"disponibilidade\s+(?:ao|para)\s+empregador"
-            ],
-            
-            # INTERVALOS
-            "intervalo": [
-                r"intervalo(\s+de\s+)?intrajornada", r"intrajornada", 
-                r"hora\s+intervalar", r"supressão\s+d[eo]\s+intervalo",
-                r"violação\s+d[eo]\s+intervalo", r"não\s+usufruto\s+d[oe]\s+intervalo",
-                r"intervalos?\s+(para\s+)?(refeição|descanso|alimentação)",
-                r"art\.?\s*71\s*d[a|e]\s*CLT", r"supressão\s+intervalar",
-                r"pausas?\s+para\s+alimenta[çc][ãa]o",
-                # Novos padrões
-                r"ausência\s+de\s+intervalo", r"intervalo\s+para\s+refeição\s+e\s+descanso",
-                r"não\s+concess[ãa]o\s+de\s+intervalo", r"sonegação\s+d[oe]\s+intervalo",
-                r"hora\s+extra\s+intervalar"
-            ],
-            
-            "intervalo_interjornada": [
-                r"intervalo\s+interjornada", r"interjornada", r"entre\s+jornadas",
-                r"descanso\s+entre\s+jornadas", r"art\.?\s*66\s*d[a|e]\s*CLT",
-                r"onze\s+horas\s+consecutivas", r"11\s+horas\s+de\s+descanso"
-            ],
-            
-            # VERBAS ESPECÍFICAS DE CATEGORIAS E SITUAÇÕES
-            "verbas_acidente": [
-                r"acidente\s+de\s+trabalho", r"doen[çc]a\s+ocupacional",
-                r"les[ãa]o\s+por\s+esfor[çc]o\s+repetitivo", r"LER", r"DORT",
-                r"estabilidade\s+acidentária", r"indeniza[çc][ãa]o\s+acidente",
-                r"CAT", r"aux[íi]lio-?acidente", r"pens[ãa]o\s+vital[íi]cia",
-                r"aux[íi]lio-?doen[çc]a", r"responsabilidade\s+civil\s+acidente",
-                # Novos padrões
-                r"sequelas\s+permanentes", r"agravamento\s+de\s+doen[çc]a",
-                r"afastamento\s+por\s+acidente", r"patologia\s+laboral",
-                r"nexo\s+causal", r"adoecimento\s+ocupacional",
-                r"perícia\s+médica", r"laudo\s+pericial"
-            ],
-            
-            "reintegracao": [
-                r"reintegra[çc][ãa]o", r"estabilidade", r"garantia\s+de\s+emprego",
-                r"anula[çc][ãa]o\s+da\s+demiss[ãa]o", r"revers[ãa]o\s+da\s+justa\s+causa",
-                r"indeniza[çc][ãa]o\s+substitutiva", r"restitui[çc][ãa]o\s+ao\s+emprego"
-            ],
-            
-            "verbas_gestante": [
-                r"estabilidade\s+gestante", r"licen[çc]a-?maternidade",
-                r"sal[áa]rio-?maternidade", r"amamenta[çc][ãa]o", 
-                r"intervalo\s+para\s+amamenta[çc][ãa]o"
-            ],
-            
-            "verbas_dirigente": [
-                r"estabilidade\s+sindical", r"dirigente\s+sindical", 
-                r"CIPA\s+estabilidade", r"cipeiro"
-            ],
-            
-            "rescisao_indireta": [
-                r"rescis[ãa]o\s+indireta", r"justa\s+causa\s+patronal",
-                r"falta\s+grave\s+d[ao]\s+empregador", r"art\.?\s*483",
-                # Novos padrões
-                r"conduta\s+abusiva\s+do\s+empregador", r"dispensa\s+indireta",
-                r"rescis[ãa]o\s+por\s+culpa\s+do\s+empregador", 
-                r"abandono\s+de\s+emprego\s+for[çc]ado"
-            ],
-            
-            # OBRIGAÇÕES DE FAZER
-            "obrigacoes_documentos": [
-                r"anota[çc][ãa]o\s+de\s+CTPS", r"baixa\s+na\s+CTPS", 
-                r"retifica[çc][ãa]o\s+de\s+CTPS", r"entrega\s+de\s+guias",
-                r"seguro-?desemprego", r"fornecimento\s+de\s+PPP", 
-                r"emiss[ãa]o\s+de\s+CAT", r"TRCT", r"chave\s+de\s+conectividade",
-                r"c[óo]digo\s+de\s+saque", r"libera[çc][ãa]o\s+de\s+FGTS", 
-                r"documento", r"entrega\s+de\s+documentos",
-                # Novos padrões
-                r"libera[çc][ãa]o\s+da\s+chave", r"guias\s+do\s+FGTS",
-                r"comunica[çc][ãa]o\s+de\s+dispensa", r"chave\s+de\s+saque",
-                r"registro\s+(?:em|na|de)\s+CTPS"
-            ],
-            
-            # TUTELAS ESPECÍFICAS
-            "liminares_tutelas": [
-                r"tutela\s+de\s+urg[êe]ncia", r"tutela\s+antecipada", 
-                r"liminar", r"obriga[çc][ãa]o\s+de\s+fazer", 
-                r"obriga[çc][ãa]o\s+de\s+n[ãa]o\s+fazer", r"medida\s+cautelar",
-                # Novos padrões
-                r"antecipa[çc][ãa]o\s+de\s+tutela", r"pedido\s+liminar",
-                r"determina[çc][ãa]o\s+judicial\s+urgente", r"manuten[çc][ãa]o\s+de\s+plano\s+de\s+sa[úu]de",
-                r"reintegra[çc][ãa]o\s+imediata", r"medida\s+de\s+urg[êe]ncia"
-            ],
-            
-            # NOVA CATEGORIA
-            "vale_transporte": [
-                r"vale(?:\s+|\-)?transporte", r"VT", r"transporte\s+fornecido", 
-                r"aux[íi]lio(?:\s+|\-)?transporte", r"reembolso\s+de\s+transporte",
-                r"despesas?\s+com\s+transporte", r"custeio\s+de\s+transporte",
-                r"lei\s+7.418"
-            ]
-        }
+        # Padrões compartilhados (compilados uma única vez no registro do módulo)
+        self.registro_padroes = obter_registro_padroes()
+        self.categorias_verbas = self.registro_padroes.padroes
         
         # Expressões para extração de parâmetros
         self.parametros_patterns = {
@@ -495,36 +665,41 @@ class AnalisadorVerbasInteligente:
         
     def normalizar_texto(self, texto):
         """Normaliza texto removendo acentos e convertendo para minúsculas."""
-        if not texto:
-            return ""
-        texto = ''.join(c for c in unicodedata.normalize('NFD', texto)
-                    if unicodedata.category(c) != 'Mn')
-        return texto.lower().strip()
+        return normalizar_texto(texto)
     
     def detectar_verbas(self, texto):
         """Detecta todas as verbas mencionadas no texto com seu contexto."""
-        texto_norm = self.normalizar_texto(texto)
+        # Captura contexto: 150 caracteres antes e depois da menção
+        return self._montar_ocorrencias(normalizar_com_mapa(texto), 150)
+
+    def classificar_verba(self, nome_norm):
+        """Categoria de um nome de verba já normalizado (classificação memorizada)."""
+        return self.registro_padroes.classificador.classificar(nome_norm)
+
+    def escaner_verbas(self):
+        """Escaner de varredura única do registro de padrões em uso (compartilhado)."""
+        return self.registro_padroes.escaner
+
+    def _montar_ocorrencias(self, texto_normalizado, tamanho_contexto):
+        """
+        Converte os matches do escaner em {categoria: [{termo, contexto, posicao, posicao_original}]}.
+        `posicao_original` aponta para o texto recebido (antes da normalização).
+        """
+        texto_norm = texto_normalizado.normalizado
         resultado = {}
-        
-        for categoria, patterns in self.categorias_verbas.items():
-            matches = []
-            for pattern in patterns:
-                for match in re.finditer(pattern, texto_norm):
-                    # Captura contexto: 150 caracteres antes e depois da menção
-                    inicio = max(0, match.start() - 150)
-                    fim = min(len(texto_norm), match.end() + 150)
-                    
-                    matches.append({
-                        "termo": match.group(0),
-                        "contexto": texto_norm[inicio:fim],
-                        "posicao": match.start()
-                    })
-            
-            if matches:
-                resultado[categoria] = matches
-                
+        # Textos grandes são varridos em paralelo (mesmo resultado da varredura serial)
+        for categoria, posicoes in varrer_posicoes(self.escaner_verbas(), texto_norm).items():
+            resultado[categoria] = [
+                {
+                    "termo": texto_norm[inicio:fim],
+                    "contexto": texto_norm[max(0, inicio - tamanho_contexto):fim + tamanho_contexto],
+                    "posicao": inicio,
+                    "posicao_original": texto_normalizado.posicao_original(inicio)
+                }
+                for inicio, fim in posicoes
+            ]
         return resultado
-    
+
     def extrair_parametros(self, contexto):
         """
         Extrai parâmetros relevantes do contexto de uma verba.
@@ -548,11 +723,7 @@ class AnalisadorVerbasInteligente:
             nome_verba = self.normalizar_texto(verba.get("verba", ""))
             
             # Encontrar a categoria mais apropriada
-            categoria_encontrada = None
-            for categoria, patterns in self.categorias_verbas.items():
-                if any(re.search(p, nome_verba) for p in patterns):
-                    categoria_encontrada = categoria
-                    break
+            categoria_encontrada = self.classificar_verba(nome_verba)
             
             if categoria_encontrada:
                 if categoria_encontrada not in categorias:
@@ -566,14 +737,10 @@ class AnalisadorVerbasInteligente:
         Calcula os parâmetros apropriados para uma verba com base nos dados do contrato.
         Retorna um dicionário com os parâmetros calculados.
         """
-        categoria = None
         nome_verba = self.normalizar_texto(verba)
         
         # Identificar categoria da verba
-        for cat, patterns in self.categorias_verbas.items():
-            if any(re.search(p, nome_verba) for p in patterns):
-                categoria = cat
-                break
+        categoria = self.classificar_verba(nome_verba)
         
         if not categoria:
             return {"periodo": "N/A", "valor_base": "N/A", "percentual_quantidade": "N/A"}
@@ -718,11 +885,7 @@ class AnalisadorVerbasInteligente:
         # Processar cada categoria de verba detectada
         for categoria, matches in verbas_detectadas.items():
             # Verificar se a verba já está na planilha
-            categoria_na_planilha = False
-            for padrao in self.categorias_verbas[categoria]:
-                if any(re.search(padrao, nome) for nome in verbas_planilha_nomes):
-                    categoria_na_planilha = True
-                    break
+            categoria_na_planilha = self.registro_padroes.categoria_presente(categoria, verbas_planilha_nomes)
             
             if not categoria_na_planilha and matches:
                 # Nome padronizado da verba baseado na categoria
@@ -746,37 +909,7 @@ class AnalisadorVerbasInteligente:
     
     def _obter_nome_padronizado(self, categoria):
         """Retorna um nome padronizado para a categoria de verba."""
-        mapeamento = {
-            "salario": "Saldo de Salário",
-            "ferias": "Férias Proporcionais",
-            "13_salario": "13º Salário Proporcional",
-            "aviso_previo": "Aviso Prévio Indenizado",
-            "fgts": "Depósitos do FGTS",
-            "multa_477": "Multa do art. 477 da CLT",
-            "multa_467": "Multa do art. 467 da CLT",
-            "outras_multas": "Multas Convencionais/Legais",
-            "dano_moral": "Dano Moral",
-            "dano_material": "Dano Material",
-            "dano_estetico": "Dano Estético",
-            "dano_existencial": "Dano Existencial",
-            "assedio": "Assédio Moral/Sexual",
-            "plano_saude": "Reestabelecimento do Plano de Saúde",
-            "horas_extras": "Horas Extras",
-            "adicional_noturno": "Adicional Noturno",
-            "adicional_periculosidade": "Adicional de Periculosidade",
-            "adicional_insalubridade": "Adicional de Insalubridade",
-            "outros_adicionais": "Adicionais Diversos",
-            "intervalo": "Intervalo Intrajornada",
-            "intervalo_interjornada": "Intervalo Interjornada",
-            "verbas_acidente": "Verbas por Acidente de Trabalho",
-            "reintegracao": "Reintegração ao Emprego",
-            "verbas_gestante": "Estabilidade Gestante",
-            "verbas_dirigente": "Estabilidade Sindical/CIPA",
-            "rescisao_indireta": "Rescisão Indireta",
-            "obrigacoes_documentos": "Obrigações Documentais",
-            "liminares_tutelas": "Tutelas de Urgência"
-        }
-        return mapeamento.get(categoria, categoria.replace("_", " ").title())
+        return _NOMES_PADRONIZADOS.get(categoria, categoria.replace("_", " ").title())
 
     def determinar_natureza_reflexos(self, categoria_verba):
         """
@@ -985,24 +1118,21 @@ class CorrelacaoParcialMixin:
             "sem_correspondencia": []           # Sem correspondência encontrada
         }
         
-        # Para cada verba do texto, buscar correspondências na planilha
-        for verba_texto in verbas_texto:
-            melhor_pontuacao = 0
+        # Melhor verba da planilha para cada verba do texto, calculada em lote
+        # (mesma pontuação e desempate de calcular_similaridade par a par)
+        melhores = MotorCorrelacao(self).melhores_correspondencias(
+            [verba.get("verba", "") for verba in verbas_texto],
+            [verba.get("verba", "") for verba in verbas_planilha]
+        )
+        
+        for verba_texto, (indice, melhor_pontuacao) in zip(verbas_texto, melhores):
             melhor_correspondencia = None
-            
-            for verba_planilha in verbas_planilha:
-                pontuacao = self.calcular_similaridade(
-                    verba_texto.get("verba", ""),
-                    verba_planilha.get("verba", "")
-                )
-                
-                if pontuacao > melhor_pontuacao:
-                    melhor_pontuacao = pontuacao
-                    melhor_correspondencia = {
-                        "verba_texto": verba_texto,
-                        "verba_planilha": verba_planilha,
-                        "pontuacao": pontuacao
-                    }
+            if indice is not None:
+                melhor_correspondencia = {
+                    "verba_texto": verba_texto,
+                    "verba_planilha": verbas_planilha[indice],
+                    "pontuacao": melhor_pontuacao
+                }
             
             # Classificar a correspondência com base na pontuação
             if melhor_pontuacao >= self.limiar_correspondencia_forte:
@@ -1036,28 +1166,78 @@ class CorrelacaoParcialMixin:
         # Padrões para identificar reflexos
         padrao_reflexos = re.compile(r'reflexo|repercuss[aã]o|sobre|incid[eê]ncia|em|integra[cç][aã]o')
         
-        for verba in verbas_planilha:
-            nome_verba = verba.get("verba", "").lower()
-            
+        nomes = [verba.get("verba", "").lower() for verba in verbas_planilha]
+        
+        # Posições de cada nome na planilha (mantém ordem e repetições no resultado)
+        posicoes = {}
+        for posicao, nome in enumerate(nomes):
+            posicoes.setdefault(nome, []).append(posicao)
+        
+        # Índice invertido: só os pares plausíveis são comparados
+        motor = MotorCorrelacao(self)
+        indice = IndiceVerbas(nomes, motor)
+        principais_por_nome = {}
+        
+        for nome_verba in nomes:
             # Verifica se contém padrão de reflexo
-            if padrao_reflexos.search(nome_verba):
-                # Tenta identificar a verba principal
-                for outra_verba in verbas_planilha:
-                    nome_outra = outra_verba.get("verba", "").lower()
-                    
+            if not padrao_reflexos.search(nome_verba):
+                continue
+            
+            # Tenta identificar a verba principal (uma vez por nome distinto)
+            if nome_verba not in principais_por_nome:
+                principais = set()
+                for nome_outra in indice.candidatos_contidos(nome_verba) | indice.candidatos_similares(nome_verba):
                     # Evita comparar com ela mesma
                     if nome_outra == nome_verba:
                         continue
                     
                     # Se a verba atual menciona a outra verba, provavelmente é um reflexo dela
-                    if nome_outra in nome_verba or self.calcular_similaridade(nome_outra, nome_verba) > 0.4:
-                        if nome_verba not in desmembramentos:
-                            desmembramentos[nome_verba] = []
-                        desmembramentos[nome_verba].append(nome_outra)
+                    if nome_outra in nome_verba or motor.similaridade_acima(nome_outra, nome_verba, 0.4):
+                        principais.add(nome_outra)
+                
+                principais_por_nome[nome_verba] = [
+                    nomes[posicao] for posicao in sorted(p for nome in principais for p in posicoes[nome])
+                ]
+            
+            if principais_por_nome[nome_verba]:
+                desmembramentos.setdefault(nome_verba, []).extend(principais_por_nome[nome_verba])
         
         return desmembramentos
 
 
+def _mesclar_correspondencias_dicionario(analisador, correlacoes, verbas_texto, verbas_planilha):
+    """
+    Passos 2 e 3 da análise avançada: busca por dicionário de sinônimos para
+    as verbas do texto sem correspondência forte e as acrescenta às fortes.
+    Retorna o `IndiceCorrelacoes` já atualizado.
+    """
+    indice = IndiceCorrelacoes(correlacoes)
+    correspondencias_dicionario = []
+    if hasattr(analisador, 'correspondencia_por_dicionario'):
+        for verba_texto in verbas_texto:
+            # Verificar se já tem correspondência forte
+            if not indice.tem_forte(verba_texto["verba"]):
+                correspondencias_dicionario.extend(
+                    analisador.correspondencia_por_dicionario(verba_texto, verbas_planilha)
+                )
+    indice.adicionar_fortes(correspondencias_dicionario)
+    return indice
+
+
+def _verbas_adicionais(analisador, verbas_planilha, indice, desmembramentos):
+    """Passo 4: verbas da planilha sem correspondência e que não são reflexos desmembrados."""
+    verbas_adicionais = []
+    for verba_planilha in verbas_planilha:
+        nome_verba = verba_planilha.get("verba", "")
+        encontrada = (
+            indice.planilha_correspondida(nome_verba)
+            or analisador.normalizar_texto(nome_verba) in desmembramentos
+        )
+        if not encontrada:
+            verbas_adicionais.append(nome_verba)
+    return verbas_adicionais
+
+
 class AnalisadorVerbasAvancado(AnalisadorVerbasInteligente, CorrelacaoParcialMixin):
     """
     Versão avançada do analisador de verbas que incorpora
@@ -1102,54 +1282,14 @@ class AnalisadorVerbasAvancado(AnalisadorVerbasInteligente, CorrelacaoParcialMix
         # 1. Correlacionar verbas usando o sistema de pontuação padrão
         correlacoes = self.correlacionar_verbas(verbas_texto, verbas_planilha)
         
-        # 2. Adicionar correlações por dicionário de sinônimos
-        correspondencias_dicionario = []
-        if hasattr(self, 'correspondencia_por_dicionario'):
-            for verba_texto in verbas_texto:
-                # Verificar se já tem correspondência forte
-                if not any(cor["verba_texto"]["verba"] == verba_texto["verba"] 
-                        for cor in correlacoes["correspondencias_fortes"]):
-                    # Buscar correspondências por dicionário
-                    novas_correspondencias = self.correspondencia_por_dicionario(verba_texto, verbas_planilha)
-                    correspondencias_dicionario.extend(novas_correspondencias)
-        
-        # 3. Adicionar correspondências do dicionário às fortes
-        for corr in correspondencias_dicionario:
-            # Verificar se a verba já tem alguma correspondência forte
-            if not any(c["verba_texto"]["verba"] == corr["verba_texto"]["verba"] 
-                    for c in correlacoes["correspondencias_fortes"]):
-                correlacoes["correspondencias_fortes"].append(corr)
-                
-                # Remover das sem correspondência
-                for i, sem_corr in enumerate(correlacoes["sem_correspondencia"]):
-                    if sem_corr["verba_texto"]["verba"] == corr["verba_texto"]["verba"]:
-                        correlacoes["sem_correspondencia"].pop(i)
-                        break
+        # 2 e 3. Correspondências por dicionário de sinônimos, acrescentadas às fortes
+        indice = _mesclar_correspondencias_dicionario(self, correlacoes, verbas_texto, verbas_planilha)
         
         # Verificar desmembramentos de reflexos
         desmembramentos = self.verificar_desmembramentos_reflexos(verbas_planilha)
         
         # 4. Verbas adicionais na planilha
-        verbas_texto_nomes = [item["verba"] for item in verbas_texto]
-        verbas_adicionais = []
-        
-        for verba_planilha in verbas_planilha:
-            nome_verba = verba_planilha.get("verba", "")
-            # Verificar se esta verba está entre as correspondências encontradas
-            encontrada = False
-            
-            # Verificar em todas as correspondências
-            for tipo in ["correspondencias_fortes", "correspondencias_provaveis", "correspondencias_possiveis"]:
-                if any(item["verba_planilha"].get("verba") == nome_verba for item in correlacoes[tipo]):
-                    encontrada = True
-                    break
-                    
-            # Verificar se é um reflexo desmembrado
-            if self.normalizar_texto(nome_verba) in desmembramentos:
-                encontrada = True
-            
-            if not encontrada:
-                verbas_adicionais.append(nome_verba)
+        verbas_adicionais = _verbas_adicionais(self, verbas_planilha, indice, desmembramentos)
         
         # Gerar relatório detalhado como antes
         relatorio = []
@@ -1217,14 +1357,99 @@ class AnalisadorVerbasAvancado(AnalisadorVerbasInteligente, CorrelacaoParcialMix
         
         return "\n".join(relatorio)
 
+# Analisadores compartilhados do processo (base e aprimorado), montados uma
+# única vez e reaproveitados por todas as sessões do Streamlit e pelos jobs
+_analisadores = {}
+_construcao_analisadores = {}
+_lock_analisadores = threading.Lock()
+
+
+def _montar_analisador(aprimorado):
+    """Analisador configurado: base ou avançado com padrões aprimorados e dicionário."""
+    if not aprimorado:
+        return AnalisadorVerbasInteligente()
+    analisador = AnalisadorVerbasAvancado()
+    analisador = aprimorar_padroes_verbas(analisador)
+    return implementar_dicionario_verbas(analisador)
+
+
+def _congelar_analisador(analisador):
+    """
+    Troca as estruturas de configuração por versões imutáveis e bloqueia
+    novas atribuições, para o analisador poder ser usado por várias threads.
+    """
+    for atributo, valor in list(vars(analisador).items()):
+        if isinstance(valor, dict):
+            valor = MappingProxyType({
+                chave: tuple(item) if isinstance(item, list) else item for chave, item in valor.items()
+            })
+        elif isinstance(valor, set):
+            valor = frozenset(valor)
+        else:
+            continue
+        setattr(analisador, atributo, valor)
+    analisador._somente_leitura = True
+    return analisador
+
+
+def obter_analisador(aprimorado=True):
+    """
+    Retorna o analisador compartilhado (somente leitura) do processo.
+    Com `aprimorado=True`: AnalisadorVerbasAvancado com padrões aprimorados
+    e dicionário de sinônimos; senão, o AnalisadorVerbasInteligente base.
+    """
+    analisador = _analisadores.get(aprimorado)
+    if analisador is None:
+        with _lock_analisadores:
+            analisador = _analisadores.get(aprimorado)
+            if analisador is None:
+                # Os registros de padrões já são compartilhados: medidos à parte
+                inicio = time.perf_counter()
+                obter_registro_padroes()
+                if aprimorado:
+                    obter_registro_padroes(aprimorado=True)
+                registros_ms = (time.perf_counter() - inicio) * 1000
+                inicio = time.perf_counter()
+                analisador = _congelar_analisador(_montar_analisador(aprimorado))
+                construcao_ms = (time.perf_counter() - inicio) * 1000
+                _construcao_analisadores[aprimorado] = {
+                    "registros_ms": registros_ms, "construcao_ms": construcao_ms, "reutilizacoes": 0,
+                }
+                _analisadores[aprimorado] = analisador
+                print(f"🧠 Analisador de verbas {'aprimorado' if aprimorado else 'base'} montado em "
+                      f"{construcao_ms:.1f} ms (+ {registros_ms:.1f} ms de padrões) e compartilhado.")
+                return analisador
+    with _lock_analisadores:
+        _construcao_analisadores[aprimorado]["reutilizacoes"] += 1
+    return analisador
+
+
+def estatisticas_analisadores():
+    """
+    Custo de construção de cada analisador compartilhado (sem a compilação
+    dos registros de padrões, feita uma vez de qualquer forma), quantas vezes
+    foi reutilizado e o tempo de construção economizado (estimado).
+    """
+    with _lock_analisadores:
+        return {
+            ("aprimorado" if aprimorado else "base"): {
+                **dados,
+                "economia_estimada_ms": dados["construcao_ms"] * dados["reutilizacoes"],
+            }
+            for aprimorado, dados in _construcao_analisadores.items()
+        }
+
+
 def mapear_verbas_trabalhistas(texto_peticao, verbas_planilha):
     """
     Função legada mantida para compatibilidade.
-    Agora usa o novo AnalisadorVerbasInteligente.
+    Agora usa o AnalisadorVerbasInteligente compartilhado.
     """
-    analisador = AnalisadorVerbasInteligente()
-    verbas_detectadas = analisador.detectar_verbas(texto_peticao)
-    verbas_categorizadas = analisador.identificar_verbas_planilha(verbas_planilha)
+    analisador = obter_analisador(aprimorado=False)
+    with medir("verbas.mapeamento") as span:
+        verbas_detectadas = analisador.detectar_verbas(texto_peticao)
+        verbas_categorizadas = analisador.identificar_verbas_planilha(verbas_planilha)
+        span.registrar(bytes=len((texto_peticao or "").encode("utf-8")), itens=len(verbas_planilha or []))
     
     # Mapear para o formato de retorno original
     resultado = {
@@ -1260,6 +1485,7 @@ def analisar_processo_trabalhista(texto_peticao, dados_planilha):
     """
     Analisa inteligentemente um processo trabalhista, comparando a petição com a planilha.
     Usa o sistema avançado de correlação parcial e dicionário de sinônimos.
+    O relatório é memorizado pelo hash do texto e do conteúdo da planilha.
     
     Parâmetros:
         texto_peticao (str): Texto completo da petição inicial
@@ -1268,14 +1494,18 @@ def analisar_processo_trabalhista(texto_peticao, dados_planilha):
     Retorna:
         str: Relatório detalhado da análise
     """
-    # Instanciar o analisador avançado
-    analisador = AnalisadorVerbasAvancado()
-    
-    # Aplicar melhorias aos padrões de detecção
-    analisador = aprimorar_padroes_verbas(analisador)
-    
-    # Aplicar o dicionário de sinônimos
-    analisador = implementar_dicionario_verbas(analisador)
+    with medir("verbas.analise") as span:
+        relatorio = _cache_analise.obter_ou_gerar(
+            _chave_cache(texto_peticao, dados_planilha),
+            lambda: _analisar_processo_trabalhista(texto_peticao, dados_planilha),
+        )
+        span.registrar(bytes=len((texto_peticao or "").encode("utf-8")))
+    return relatorio
+
+def _analisar_processo_trabalhista(texto_peticao, dados_planilha):
+    """Executa a análise de `analisar_processo_trabalhista` sem cache."""
+    # Analisador avançado compartilhado (padrões aprimorados + dicionário de sinônimos)
+    analisador = obter_analisador()
     
     # Usar diretamente o método da classe
     resultado = analisador.analisar_processo_avancado(texto_peticao, dados_planilha)
@@ -1286,6 +1516,8 @@ def analisar_processo_trabalhista(texto_peticao, dados_planilha):
 def gerar_quadro_calculo_completo(texto_processo, dados_processo):
     """
     Função principal para gerar um quadro de cálculo completo com reflexos corretos.
+    O quadro é memorizado pelo hash do texto e dos dados do processo; cada
+    chamada recebe uma cópia própria.
     
     Args:
         texto_processo: Texto completo do processo
@@ -1294,10 +1526,27 @@ def gerar_quadro_calculo_completo(texto_processo, dados_processo):
     Returns:
         List[Dict]: Lista de verbas com parâmetros calculados
     """
-    analisador = AnalisadorVerbasAvancado()
-    
-    # Aplicar melhorias aos padrões de detecção
-    analisador = aprimorar_padroes_verbas(analisador)
+    with medir("verbas.quadro") as span:
+        chave = _chave_cache(texto_processo, dados_processo)
+        quadro = _cache_quadro.obter(chave)
+        span.registrar(cache=quadro is not None)
+        if quadro is None:
+            quadro = _gerar_quadro_calculo_completo(texto_processo, copy.deepcopy(dados_processo))
+            _cache_quadro.guardar(chave, quadro)
+        span.registrar(bytes=len((texto_processo or "").encode("utf-8")), itens=len(quadro))
+
+    # Mantém o efeito da versão sem cache: os reflexos das verbas já existentes
+    # em `dados_processo` são atualizados no próprio dicionário recebido
+    for verba, verba_quadro in zip(dados_processo.get('verbas_pleiteadas', []), quadro):
+        if isinstance(verba, dict) and 'reflexos' in verba_quadro:
+            verba['reflexos'] = verba_quadro['reflexos']
+
+    return copy.deepcopy(quadro)
+
+def _gerar_quadro_calculo_completo(texto_processo, dados_processo):
+    """Monta o quadro de `gerar_quadro_calculo_completo` sem cache."""
+    # Analisador avançado compartilhado (com os padrões aprimorados)
+    analisador = obter_analisador()
     
     # 1. Detectar verbas no texto
     verbas_detectadas = analisador.detectar_verbas(texto_processo)
@@ -1322,12 +1571,7 @@ def gerar_quadro_calculo_completo(texto_processo, dados_processo):
         nome_verba = verba.get('verba', '').lower()
         
         # Encontrar a categoria da verba
-        categoria = None
-        for cat, patterns in analisador.categorias_verbas.items():
-            nome_norm = analisador.normalizar_texto(nome_verba)
-            if any(re.search(pattern, nome_norm) for pattern in patterns):
-                categoria = cat
-                break
+        categoria = analisador.classificar_verba(analisador.normalizar_texto(nome_verba))
         
         # Determinar reflexos conforme a natureza da verba
         if categoria:
@@ -1453,53 +1697,14 @@ def analisar_processo_avancado(analisador, texto_peticao, dados_planilha):
     # 1. Correlacionar verbas usando o sistema de pontuação padrão
     correlacoes = analisador.correlacionar_verbas(verbas_texto, verbas_planilha)
     
-    # 2. Adicionar correlações por dicionário de sinônimos
-    correspondencias_dicionario = []
-    if hasattr(analisador, 'correspondencia_por_dicionario'):
-        for verba_texto in verbas_texto:
-            # Verificar se já tem correspondência forte
-            if not any(cor.get("verba_texto", {}).get("verba") == verba_texto["verba"] 
-                    for cor in correlacoes["correspondencias_fortes"]):
-                # Buscar correspondências por dicionário
-                novas_correspondencias = analisador.correspondencia_por_dicionario(verba_texto, verbas_planilha)
-                correspondencias_dicionario.extend(novas_correspondencias)
-    
-    # 3. Adicionar correspondências do dicionário às fortes
-    for corr in correspondencias_dicionario:
-        # Verificar se a verba já tem alguma correspondência forte
-        if not any(c.get("verba_texto", {}).get("verba") == corr["verba_texto"]["verba"] 
-                for c in correlacoes["correspondencias_fortes"]):
-            correlacoes["correspondencias_fortes"].append(corr)
-            
-            # Remover das sem correspondência
-            for i, sem_corr in enumerate(correlacoes["sem_correspondencia"]):
-                if sem_corr["verba_texto"]["verba"] == corr["verba_texto"]["verba"]:
-                    correlacoes["sem_correspondencia"].pop(i)
-                    break
+    # 2 e 3. Correspondências por dicionário de sinônimos, acrescentadas às fortes
+    indice = _mesclar_correspondencias_dicionario(analisador, correlacoes, verbas_texto, verbas_planilha)
     
     # Verificar desmembramentos de reflexos
     desmembramentos = analisador.verificar_desmembramentos_reflexos(verbas_planilha)
     
     # 4. Verbas adicionais na planilha
-    verbas_adicionais = []
-    
-    for verba_planilha in verbas_planilha:
-        nome_verba = verba_planilha.get("verba", "")
-        # Verificar se esta verba está entre as correspondências encontradas
-        encontrada = False
-        
-        # Verificar em todas as correspondências
-        for tipo in ["correspondencias_fortes", "correspondencias_provaveis", "correspondencias_possiveis"]:
-            if any(item.get("verba_planilha", {}).get("verba") == nome_verba for item in correlacoes[tipo]):
-                encontrada = True
-                break
-                
-        # Verificar se é um reflexo desmembrado
-        if analisador.normalizar_texto(nome_verba) in desmembramentos:
-            encontrada = True
-        
-        if not encontrada:
-            verbas_adicionais.append(nome_verba)
+    verbas_adicionais = _verbas_adicionais(analisador, verbas_planilha, indice, desmembramentos)
     
     # Retornar resultado estruturado
     return {
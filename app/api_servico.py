@@ -0,0 +1,338 @@
+# ===================================================================
+# app/api_servico.py (API HTTP PARA ENVIO DE PROCESSOS)
+#
+# Funcionalidades:
+# - ENVIO PROGRAMÁTICO: Outros sistemas enviam PDFs por HTTP (corpo
+#   application/pdf ou multipart/form-data no campo "arquivo") sem passar
+#   pela interface Streamlit.
+# - FILA PERSISTENTE: Cada envio vira um job do `GerenciadorJobs` em um
+#   SQLite próprio da API (API_JOBS_DB), executado no pool de workers
+#   (JOBS_MAX_WORKERS) e retomado após reinícios.
+# - CONSULTA: Status e progresso do job, resultado completo em JSON e
+#   download das exportações (JSON, XML PJe-Calc, DOCX, Excel).
+# - CACHE: PDFs já analisados com a versão atual do pipeline são
+#   respondidos na hora pelo cache de casos (?reprocessar=1 ignora).
+# - SEGURANÇA: Ouve só em 127.0.0.1 por padrão; em outro endereço
+#   (API_HOST/--host) exige o token (API_TOKEN, cabeçalho "Authorization:
+#   Bearer <token>"). Limite de tamanho do upload (API_MAX_UPLOAD_MB).
+# - MÉTRICAS: /metrics no formato do Prometheus (metricas.py), aberto
+#   como /saude, além da latência das requisições por rota.
+#
+# Rotas:
+#   POST /jobs[?rag=1&reprocessar=1]        -> 202 {"id", "status", "url"} (200 se do cache)
+#   GET  /jobs                              -> jobs mais recentes
+#   GET  /jobs/<id>                         -> status, progresso e prévia
+#   GET  /jobs/<id>/resultado               -> resultado do pipeline
+#   GET  /jobs/<id>/exportacoes/<formato>   -> json | xml | docx | excel
+#   GET  /saude                             -> verificação de funcionamento
+#   GET  /metrics                           -> métricas (Prometheus)
+#
+# Uso (a partir de app/):  python api_servico.py [--porta 8080]
+# ===================================================================
+
+import os
+import re
+import sys
+import json
+import hmac
+import time
+import uuid
+import ipaddress
+import argparse
+import threading
+import traceback
+from email.parser import BytesParser
+from email.policy import default as politica_email
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metricas
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORTA = int(os.getenv("API_PORTA", "8080"))
+API_TOKEN = os.getenv("API_TOKEN", "")
+API_MAX_UPLOAD_MB = float(os.getenv("API_MAX_UPLOAD_MB", "100"))
+# Banco de jobs separado do da interface: cada serviço retoma apenas os próprios jobs
+CAMINHO_DB_JOBS_API = os.getenv("API_JOBS_DB", os.path.join("export", "jobs_api.sqlite3"))
+
+# Formato -> (tipo de conteúdo, nome do arquivo baixado)
+EXPORTACOES = {
+    "json": ("application/json", "resumo.json"),
+    "xml": ("application/xml", "saida_pjecalc.xml"),
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "resumo.docx"),
+    "excel": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "analise_processo.xlsx"),
+}
+
+ROTA_JOB = re.compile(r"^/jobs/([0-9a-f]{32})(?:/(resultado|exportacoes/([a-z]+)))?$")
+# Rotas sem token: healthcheck do container e coleta do Prometheus
+ROTAS_ABERTAS = ("/saude", "/metrics")
+
+_DURACAO_REQUISICAO = metricas.histograma(
+    "api_requisicao_segundos", "Duração das requisições à API por método, rota e status", ("metodo", "rota", "status")
+)
+
+# --- SINGLETON ---
+_gerenciador_api = None
+_lock_gerenciador_api = threading.Lock()
+
+
+class ErroRequisicao(Exception):
+    """Erro a ser devolvido ao cliente com o status HTTP indicado."""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+def obter_gerenciador_api():
+    """Gerenciador de jobs da API (SQLite próprio), retomando os jobs interrompidos na primeira chamada."""
+    global _gerenciador_api
+    if _gerenciador_api is not None:
+        return _gerenciador_api
+    with _lock_gerenciador_api:
+        if _gerenciador_api is None:
+            from jobs import GerenciadorJobs
+            gerenciador = GerenciadorJobs(caminho_db=CAMINHO_DB_JOBS_API)
+            gerenciador.retomar_pendentes()
+            _gerenciador_api = gerenciador
+    return _gerenciador_api
+
+
+def extrair_pdf(tipo_conteudo, corpo):
+    """Bytes do PDF de um corpo application/pdf ou multipart/form-data (campo "arquivo")."""
+    if tipo_conteudo.startswith("multipart/form-data"):
+        mensagem = BytesParser(policy=politica_email).parsebytes(
+            f"Content-Type: {tipo_conteudo}\r\n\r\n".encode("latin-1") + corpo
+        )
+        partes = [parte for parte in mensagem.iter_parts() if parte.get_param("name", header="content-disposition")]
+        parte = next(
+            (p for p in partes if p.get_param("name", header="content-disposition") == "arquivo"),
+            partes[0] if len(partes) == 1 else None,
+        )
+        if parte is None:
+            raise ErroRequisicao(400, "Envie o PDF no campo 'arquivo' do formulário.")
+        corpo = parte.get_payload(decode=True) or b""
+    if not corpo.startswith(b"%PDF-"):
+        raise ErroRequisicao(415, "O arquivo enviado não é um PDF.")
+    return corpo
+
+
+def _parametro_ativo(consulta, nome):
+    return consulta.get(nome, ["0"])[-1].lower() in ("1", "true", "sim")
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    """Rotas da API; cada requisição roda em uma thread do ThreadingHTTPServer."""
+
+    server_version = "PJeCalcAPI/1.0"
+
+    # --- Respostas ---
+
+    def _responder(self, status, conteudo, tipo="application/json; charset=utf-8", cabecalhos=None):
+        self._status = status
+        if not isinstance(conteudo, bytes):
+            conteudo = json.dumps(conteudo, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(conteudo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def _executar(self, rota):
+        inicio = time.perf_counter()
+        self._status = 500
+        try:
+            self._verificar_token()
+            rota()
+        except ErroRequisicao as e:
+            self._responder(e.status, {"erro": e.mensagem})
+        except Exception as e:
+            traceback.print_exc()
+            self._responder(500, {"erro": f"Erro interno: {e}"})
+        finally:
+            _DURACAO_REQUISICAO.observar(
+                time.perf_counter() - inicio, metodo=self.command, rota=self._rota_metrica(), status=self._status
+            )
+
+    def _rota_metrica(self):
+        # Ids de job substituídos para não criar uma série por job
+        caminho = urlparse(self.path).path.rstrip("/") or "/"
+        rota = ROTA_JOB.match(caminho)
+        if rota:
+            return "/jobs/{id}" + (f"/{rota.group(2).split('/')[0]}" if rota.group(2) else "")
+        return caminho if caminho in ROTAS_ABERTAS + ("/jobs",) else "outra"
+
+    def _verificar_token(self):
+        if not API_TOKEN or urlparse(self.path).path.rstrip("/") in ROTAS_ABERTAS:
+            return
+        recebido = self.headers.get("Authorization", "")
+        if not hmac.compare_digest(recebido.encode("utf-8"), f"Bearer {API_TOKEN}".encode("utf-8")):
+            raise ErroRequisicao(401, "Token de acesso ausente ou inválido.")
+
+    def log_message(self, formato, *args):
+        print(f"🌐 API {self.address_string()} - {formato % args}")
+
+    # --- Métodos HTTP ---
+
+    def do_GET(self):
+        self._executar(self._rotear_get)
+
+    def do_POST(self):
+        self._executar(self._rotear_post)
+
+    def _rotear_get(self):
+        caminho = urlparse(self.path).path.rstrip("/") or "/"
+        if caminho == "/saude":
+            return self._responder(200, {"status": "ok"})
+        if caminho == "/metrics":
+            return self._responder(200, metricas.gerar_texto().encode("utf-8"), metricas.TIPO_CONTEUDO)
+        if caminho == "/jobs":
+            return self._responder(200, {"jobs": obter_gerenciador_api().listar()})
+        rota = ROTA_JOB.match(caminho)
+        if not rota:
+            raise ErroRequisicao(404, "Rota não encontrada.")
+        job_id, subrota, formato = rota.groups()
+        job = obter_gerenciador_api().obter(job_id)
+        if job is None:
+            raise ErroRequisicao(404, "Job não encontrado.")
+        if subrota is None:
+            job.pop("caminho_pdf", None)
+            return self._responder(200, job)
+        resultado = self._resultado_concluido(job)
+        if subrota == "resultado":
+            return self._responder(200, resultado)
+        self._baixar_exportacao(job_id, formato, resultado)
+
+    def _rotear_post(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            raise ErroRequisicao(404, "Rota não encontrada.")
+        consulta = parse_qs(url.query)
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        if tamanho <= 0:
+            raise ErroRequisicao(411, "Envie o PDF no corpo da requisição (Content-Length obrigatório).")
+        if tamanho > API_MAX_UPLOAD_MB * 1024 * 1024:
+            raise ErroRequisicao(413, f"Arquivo acima do limite de {API_MAX_UPLOAD_MB:g} MB.")
+        conteudo = extrair_pdf(self.headers.get("Content-Type", "application/pdf"), self.rfile.read(tamanho))
+        job = enviar_pdf(conteudo, _parametro_ativo(consulta, "rag"), _parametro_ativo(consulta, "reprocessar"))
+        self._responder(200 if job["do_cache"] else 202, job)
+
+    # --- Auxiliares ---
+
+    def _resultado_concluido(self, job):
+        from jobs import CONCLUIDO, ERRO
+
+        if job["status"] == ERRO:
+            raise ErroRequisicao(409, f"O job terminou com erro: {job['mensagem']}")
+        if job["status"] != CONCLUIDO:
+            raise ErroRequisicao(409, f"O job ainda não foi concluído ({job['status']}, {job['progresso']:.0%}).")
+        resultado = obter_gerenciador_api().resultado(job["id"])
+        if resultado is None:
+            raise ErroRequisicao(404, "Resultado indisponível.")
+        return resultado
+
+    def _baixar_exportacao(self, job_id, formato, resultado):
+        from cache_exportacao import obter_exportacao
+
+        if formato not in EXPORTACOES:
+            raise ErroRequisicao(404, f"Formato desconhecido. Use: {', '.join(EXPORTACOES)}.")
+        dados = resultado.get("dados_completos")
+        if not dados:
+            raise ErroRequisicao(404, "O job não produziu dados para exportação.")
+        conteudo = obter_exportacao(formato, dados, resultado.get("texto_processo"))
+        tipo, nome_arquivo = EXPORTACOES[formato]
+        self._responder(200, conteudo, tipo, {
+            "Content-Disposition": f'attachment; filename="{job_id[:12]}_{nome_arquivo}"',
+        })
+
+
+def enviar_pdf(conteudo, rag_solicitado=False, reprocessar=False):
+    """
+    Grava o PDF no diretório do novo job e cria o job (ou devolve o resultado
+    do cache). Retorna o resumo do job criado.
+    """
+    from area_trabalho import salvar_upload_job, limpar_expirados
+    from cache_casos import obter_cache_casos, versao_pipeline
+
+    limpar_expirados()
+    rag_ativo = rag_solicitado and _rag_disponivel()
+    job_id = uuid.uuid4().hex
+    caminho_pdf, hash_pdf = salvar_upload_job(job_id, conteudo)
+    gerenciador = obter_gerenciador_api()
+
+    resultado = None if reprocessar else obter_cache_casos().obter(hash_pdf, versao_pipeline(rag_ativo))
+    if resultado is not None:
+        gerenciador.registrar_concluido(caminho_pdf, rag_ativo, resultado, job_id=job_id)
+    else:
+        gerenciador.enviar(caminho_pdf, rag_ativo, job_id=job_id)
+    job = gerenciador.obter(job_id)
+    return {
+        "id": job_id,
+        "status": job["status"],
+        "do_cache": resultado is not None,
+        "rag_ativo": rag_ativo,
+        "url": f"/jobs/{job_id}",
+    }
+
+
+def _rag_disponivel():
+    try:
+        from rag_manager import get_rag_status
+        return bool(get_rag_status().get("connected"))
+    except Exception as e:
+        print(f"⚠️ Base de conhecimento (RAG) indisponível para a API: {e}")
+        return False
+
+
+def _host_local(host):
+    """Indica se o endereço só aceita conexões da própria máquina."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def iniciar_servidor(host=API_HOST, porta=API_PORTA):
+    """
+    Cria o servidor HTTP (uma thread por requisição) e retoma os jobs pendentes.
+    Recusa (ValueError) ouvir fora do loopback sem API_TOKEN definido.
+    """
+    if not API_TOKEN and not _host_local(host):
+        raise ValueError(
+            f"API_TOKEN não definido: a API só pode ouvir em {host} com token. "
+            "Defina API_TOKEN ou use um endereço local (127.0.0.1)."
+        )
+    obter_gerenciador_api()
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorAPI)
+    servidor.daemon_threads = True
+    print(f"🚀 API de análise ouvindo em http://{host}:{porta} (token {'exigido' if API_TOKEN else 'desativado'}).")
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP para envio e acompanhamento de análises de processos.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--porta", type=int, default=API_PORTA)
+    args = parser.parse_args(argv)
+
+    try:
+        servidor = iniciar_servidor(args.host, args.porta)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 API encerrada.")
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
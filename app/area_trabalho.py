@@ -0,0 +1,169 @@
+# ===================================================================
+# app/area_trabalho.py (DIRETÓRIOS ISOLADOS POR SESSÃO E POR JOB)
+#
+# Funcionalidades:
+# - UPLOADS POR CONTEÚDO: Cada PDF enviado é gravado em
+#   export/sessoes/<sessao>/<sha256>.pdf, em vez do `export/temp.pdf`
+#   compartilhado; o mesmo arquivo enviado duas vezes não é duplicado.
+#   Uploads da API ficam no diretório do próprio job e expiram com ele.
+# - EXPORTAÇÕES POR SESSÃO: XML/DOCX de cada usuário ficam no diretório
+#   da própria sessão.
+# - ARTEFATOS POR JOB: Logs de chunks e relatórios de cada análise ficam
+#   em export/jobs/<job_id>/, permitindo análises simultâneas.
+# - GRAVAÇÃO ATÔMICA: `gravar_atomico`/`temporario_atomico` gravam num
+#   temporário de nome único e renomeiam (usados também pelo lote e pelo
+#   cache de casos).
+# - LIMPEZA AUTOMÁTICA: Diretórios sem uso há mais de
+#   AREA_TRABALHO_TTL_HORAS são removidos periodicamente.
+# ===================================================================
+
+import os
+import re
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+
+RAIZ_AREA_TRABALHO = os.getenv("AREA_TRABALHO_DIR", "export")
+DIR_SESSOES = os.path.join(RAIZ_AREA_TRABALHO, "sessoes")
+DIR_JOBS = os.path.join(RAIZ_AREA_TRABALHO, "jobs")
+TTL_HORAS = float(os.getenv("AREA_TRABALHO_TTL_HORAS", "24"))
+
+# Intervalo mínimo entre duas varreduras de limpeza
+INTERVALO_LIMPEZA_SEGUNDOS = 15 * 60
+
+_ultima_limpeza = 0.0
+_lock_limpeza = threading.Lock()
+
+
+def _validar_id(identificador):
+    """Impede que ids vindos da URL/sessão escapem do diretório base."""
+    if not identificador or not re.fullmatch(r"[A-Za-z0-9_-]+", str(identificador)):
+        raise ValueError(f"Identificador inválido para área de trabalho: {identificador!r}")
+    return str(identificador)
+
+
+def novo_id_sessao():
+    """Gera um identificador para a sessão de um usuário."""
+    return uuid.uuid4().hex
+
+
+def hash_conteudo(conteudo):
+    """SHA-256 (hex) do conteúdo de um arquivo."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+@contextmanager
+def temporario_atomico(caminho):
+    """
+    Caminho temporário de nome único ao lado de `caminho`, renomeado para ele
+    ao final do bloco (removido em caso de erro). Gravações simultâneas do
+    mesmo arquivo não se sobrepõem e nunca fica arquivo pela metade.
+    """
+    temporario = f"{caminho}.{uuid.uuid4().hex}.tmp"
+    try:
+        yield temporario
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def gravar_atomico(caminho, conteudo, modo="w"):
+    """Grava `conteudo` (texto UTF-8, ou bytes com modo "wb") de forma atômica."""
+    with temporario_atomico(caminho) as temporario:
+        with open(temporario, modo, **({} if "b" in modo else {"encoding": "utf-8"})) as f:
+            f.write(conteudo)
+
+
+def diretorio_sessao(sessao_id):
+    """Diretório da sessão (criado se necessário), com o mtime atualizado."""
+    caminho = os.path.join(DIR_SESSOES, _validar_id(sessao_id))
+    os.makedirs(caminho, exist_ok=True)
+    os.utime(caminho)
+    return caminho
+
+
+def diretorio_exportacao(sessao_id):
+    """Diretório onde os arquivos exportados da sessão são gravados."""
+    caminho = os.path.join(diretorio_sessao(sessao_id), "exportacoes")
+    os.makedirs(caminho, exist_ok=True)
+    return caminho
+
+
+def diretorio_job(job_id):
+    """Diretório de trabalho de um job (logs de chunks e relatórios)."""
+    caminho = os.path.join(DIR_JOBS, _validar_id(job_id))
+    os.makedirs(caminho, exist_ok=True)
+    os.utime(caminho)
+    return caminho
+
+
+def salvar_upload(sessao_id, conteudo, extensao=".pdf"):
+    """
+    Grava o upload no diretório da sessão com nome derivado do SHA-256 do
+    conteúdo. A escrita é atômica (arquivo temporário + rename).
+    Retorna `(caminho, hash)`.
+    """
+    return _salvar_por_conteudo(diretorio_sessao(sessao_id), conteudo, extensao)
+
+
+def salvar_upload_job(job_id, conteudo, extensao=".pdf"):
+    """Como `salvar_upload`, mas no diretório do job (o arquivo expira junto com ele)."""
+    return _salvar_por_conteudo(diretorio_job(job_id), conteudo, extensao)
+
+
+def _salvar_por_conteudo(diretorio, conteudo, extensao):
+    digest = hash_conteudo(conteudo)
+    caminho = os.path.join(diretorio, f"{digest}{extensao}")
+    if not os.path.exists(caminho):
+        gravar_atomico(caminho, conteudo, "wb")
+    else:
+        os.utime(caminho)
+    return caminho, digest
+
+
+def limpar_expirados(ttl_horas=TTL_HORAS, forcar=False):
+    """
+    Remove diretórios de sessões e jobs sem modificação há mais de `ttl_horas`.
+    Sem `forcar`, roda no máximo uma vez a cada INTERVALO_LIMPEZA_SEGUNDOS.
+    Retorna a quantidade de diretórios removidos.
+    """
+    global _ultima_limpeza
+    agora = time.time()
+    with _lock_limpeza:
+        if not forcar and agora - _ultima_limpeza < INTERVALO_LIMPEZA_SEGUNDOS:
+            return 0
+        _ultima_limpeza = agora
+
+    limite = agora - ttl_horas * 3600
+    removidos = 0
+    for base in (DIR_SESSOES, DIR_JOBS):
+        if not os.path.isdir(base):
+            continue
+        for nome in os.listdir(base):
+            caminho = os.path.join(base, nome)
+            try:
+                if os.path.isdir(caminho) and _ultima_modificacao(caminho) < limite:
+                    shutil.rmtree(caminho, ignore_errors=True)
+                    removidos += 1
+            except OSError as e:
+                print(f"⚠️ Não foi possível limpar {caminho}: {e}")
+    if removidos:
+        print(f"🧹 {removidos} diretório(s) de trabalho expirado(s) removido(s).")
+    return removidos
+
+
+def _ultima_modificacao(diretorio):
+    """Maior mtime entre o diretório e seus arquivos (uso recente mantém o diretório)."""
+    maior = os.path.getmtime(diretorio)
+    for raiz, _, arquivos in os.walk(diretorio):
+        for arquivo in arquivos:
+            try:
+                maior = max(maior, os.path.getmtime(os.path.join(raiz, arquivo)))
+            except OSError:
+                pass
+    return maior
@@ -0,0 +1,154 @@
+# ===================================================================
+# app/benchmarks/benchmark_analise_avancada.py (BENCHMARK DA MESCLAGEM DE CORRESPONDÊNCIAS)
+#
+# Funcionalidades:
+# - PLANILHAS SINTÉTICAS: Gera planilhas de 1k a 10k linhas a partir dos
+#   nomes padronizados e do dicionário de sinônimos, e uma verba do texto
+#   por categoria de verba conhecida.
+# - COMPARAÇÃO: Mede os passos 2 a 4 de `analisar_processo_avancado`
+#   (correspondências por dicionário, mesclagem com as fortes e verbas
+#   adicionais) na forma anterior, com `any(...)` e `list.pop(i)`, contra
+#   os índices de `IndiceCorrelacoes`.
+# - CONFERÊNCIA: Verifica que as correlações mescladas e as verbas
+#   adicionais são idênticas para cada tamanho.
+#
+# Uso (a partir de app/):  python benchmarks/benchmark_analise_avancada.py [linhas ...]
+# ===================================================================
+
+import os
+import sys
+import copy
+import time
+import random
+
+DIR_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_APP)
+
+from analise_verbas import (  # noqa: E402
+    AnalisadorVerbasAvancado, implementar_dicionario_verbas, _mesclar_correspondencias_dicionario,
+    _verbas_adicionais, _NOMES_PADRONIZADOS, _DICIONARIO_VERBAS,
+)
+
+TAMANHOS_PADRAO = [1000, 2500, 5000, 10000]
+
+VARIACOES = [
+    "{}", "Diferenças de {}", "Reflexos de {} em FGTS", "{} - período 01/2020 a 12/2021",
+    "{} (art. 59 da CLT)", "Integração de {} sobre férias + 1/3", "{} + 40%", "Repercussão de {} no 13º",
+    "{} - competência {:02d}/2022", "Parcela {} nº {}",
+]
+
+
+def gerar_planilha(linhas, semente):
+    aleatorio = random.Random(semente)
+    base = list(_NOMES_PADRONIZADOS.values()) + [s for sinonimos in _DICIONARIO_VERBAS.values() for s in sinonimos]
+    return [
+        {
+            "verba": aleatorio.choice(VARIACOES).format(aleatorio.choice(base), aleatorio.randint(1, 12)),
+            "valor": round(aleatorio.uniform(100, 10000), 2),
+        }
+        for _ in range(linhas)
+    ]
+
+
+def correspondencia_por_dicionario_anterior(analisador, verba_texto, verbas_planilha):
+    """Implementação anterior: sinônimos normalizados de novo para cada linha da planilha."""
+    correspondencias = []
+    categoria = verba_texto.get("categoria", "")
+    for verba_planilha in verbas_planilha:
+        planilha_norm = analisador.normalizar_texto(verba_planilha.get("verba", ""))
+        for cat_dict, sinonimos in analisador.dicionario_verbas.items():
+            if (cat_dict == categoria or
+                    (cat_dict == "ferias_vencidas" and categoria == "ferias") or
+                    (cat_dict == "ferias_indenizadas" and categoria == "ferias") or
+                    (cat_dict == "fgts_multa" and categoria == "fgts")):
+                sinonimos_norm = [analisador.normalizar_texto(s) for s in sinonimos]
+                if any(s in planilha_norm or planilha_norm in s for s in sinonimos_norm):
+                    correspondencias.append({
+                        "verba_texto": verba_texto,
+                        "verba_planilha": verba_planilha,
+                        "pontuacao": 0.9,
+                        "via_dicionario": True
+                    })
+    return correspondencias
+
+
+def mesclar_anterior(analisador, correlacoes, verbas_texto, verbas_planilha, desmembramentos):
+    """Passos 2 a 4 na forma anterior (varreduras `any(...)` e `list.pop(i)`)."""
+    correspondencias_dicionario = []
+    for verba_texto in verbas_texto:
+        if not any(cor["verba_texto"]["verba"] == verba_texto["verba"]
+                   for cor in correlacoes["correspondencias_fortes"]):
+            correspondencias_dicionario.extend(
+                correspondencia_por_dicionario_anterior(analisador, verba_texto, verbas_planilha)
+            )
+
+    for corr in correspondencias_dicionario:
+        if not any(c["verba_texto"]["verba"] == corr["verba_texto"]["verba"]
+                   for c in correlacoes["correspondencias_fortes"]):
+            correlacoes["correspondencias_fortes"].append(corr)
+            for i, sem_corr in enumerate(correlacoes["sem_correspondencia"]):
+                if sem_corr["verba_texto"]["verba"] == corr["verba_texto"]["verba"]:
+                    correlacoes["sem_correspondencia"].pop(i)
+                    break
+
+    verbas_adicionais = []
+    for verba_planilha in verbas_planilha:
+        nome_verba = verba_planilha.get("verba", "")
+        encontrada = False
+        for tipo in ["correspondencias_fortes", "correspondencias_provaveis", "correspondencias_possiveis"]:
+            if any(item["verba_planilha"].get("verba") == nome_verba for item in correlacoes[tipo]):
+                encontrada = True
+                break
+        if analisador.normalizar_texto(nome_verba) in desmembramentos:
+            encontrada = True
+        if not encontrada:
+            verbas_adicionais.append(nome_verba)
+    return correlacoes, verbas_adicionais
+
+
+def mesclar_indexado(analisador, correlacoes, verbas_texto, verbas_planilha, desmembramentos):
+    """Passos 2 a 4 como em `analisar_processo_avancado`."""
+    indice = _mesclar_correspondencias_dicionario(analisador, correlacoes, verbas_texto, verbas_planilha)
+    return correlacoes, _verbas_adicionais(analisador, verbas_planilha, indice, desmembramentos)
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO
+    analisador = implementar_dicionario_verbas(AnalisadorVerbasAvancado())
+    verbas_texto = [
+        {"verba": analisador._obter_nome_padronizado(categoria), "categoria": categoria, "matches": []}
+        for categoria in analisador.categorias_verbas
+    ]
+    print(f"📚 {len(verbas_texto)} verbas do texto (uma por categoria).")
+
+    todos_identicos = True
+    for linhas in tamanhos:
+        verbas_planilha = gerar_planilha(linhas, semente=linhas)
+        correlacoes = analisador.correlacionar_verbas(verbas_texto, verbas_planilha)
+        desmembramentos = analisador.verificar_desmembramentos_reflexos(verbas_planilha)
+
+        antigo, tempo_antigo = medir(
+            mesclar_anterior, analisador, copy.deepcopy(correlacoes), verbas_texto, verbas_planilha, desmembramentos
+        )
+        novo, tempo_novo = medir(
+            mesclar_indexado, analisador, copy.deepcopy(correlacoes), verbas_texto, verbas_planilha, desmembramentos
+        )
+
+        identicos = antigo == novo
+        todos_identicos = todos_identicos and identicos
+        print(f"⏱️ {linhas:>6} linhas: anterior {tempo_antigo:.3f} s | indexado {tempo_novo:.3f} s "
+              f"({tempo_antigo / tempo_novo:.1f}x; {len(novo[0]['correspondencias_fortes'])} fortes, "
+              f"{len(novo[1])} adicionais) {'✅' if identicos else '❌ divergente'}")
+
+    print(f"{'✅' if todos_identicos else '❌'} Resultados idênticos: {todos_identicos}")
+    return 0 if todos_identicos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# ===================================================================
+# app/benchmarks/benchmark_calculo_verbas.py (BENCHMARK DO MOTOR DE CÁLCULO)
+#
+# Funcionalidades:
+# - CONTRATOS SINTÉTICOS: Contratos de 1 a 40 anos com reajustes anuais e
+#   afastamentos (doença e acidente) em datas aleatórias.
+# - CONFERÊNCIA: Compara a linha do tempo vetorizada (dias trabalhados,
+#   remuneração e FGTS por competência) com uma referência dia a dia em
+#   Python puro usando Decimal com ROUND_HALF_UP.
+# - TEMPO: Mede `calcular_verbas_rescisorias` completo por duração de contrato.
+# - PLEITOS: Confere a correspondência nome do pleito -> verba calculada
+#   (`verba_calculada`): pleitos derivados não recebem o valor da verba
+#   principal e pleitos compostos (férias + 1/3, FGTS + 40%) somam as partes.
+#
+# Uso (a partir de app/):  python benchmarks/benchmark_calculo_verbas.py [contratos_por_duracao]
+# ===================================================================
+
+import os
+import sys
+import time
+import random
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+DIR_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_APP)
+
+from calculo_verbas import calcular_verbas_rescisorias, converter_centavos, verba_calculada  # noqa: E402
+
+DURACOES_ANOS = [1, 5, 10, 20, 40]
+UM_DIA = datetime.timedelta(days=1)
+
+# Nome do pleito -> chaves esperadas da verba calculada (None = não recebe valor do motor)
+CASOS_PLEITOS = [
+    ("Saldo de salário", ("saldo_salario",)),
+    ("Aviso prévio indenizado", ("aviso_previo",)),
+    ("13º salário proporcional", ("decimo_terceiro",)),
+    ("Férias proporcionais", ("ferias_proporcionais",)),
+    ("1/3 de férias proporcionais", ("terco_ferias_proporcionais",)),
+    ("Multa do art. 477 da CLT", ("multa_477",)),
+    ("Multa do art. 467 da CLT", ("multa_467",)),
+    ("Multa de 40% sobre o FGTS", ("multa_fgts",)),
+    ("Férias proporcionais + 1/3", ("ferias_proporcionais", "terco_ferias_proporcionais")),
+    ("Férias proporcionais acrescidas de 1/3", ("ferias_proporcionais", "terco_ferias_proporcionais")),
+    ("Férias vencidas + 1/3", ("ferias_vencidas", "terco_ferias_vencidas")),
+    ("FGTS + 40%", ("fgts", "multa_fgts")),
+    ("Depósitos do FGTS", ("fgts",)),
+    ("Reflexos das horas extras em FGTS + 40%", None),
+    ("Reflexos das horas extras no 13º salário", None),
+    ("Reflexo em aviso prévio", None),
+    ("Diferenças de FGTS", None),
+    ("Repercussão do aviso prévio no 13º salário", None),
+    ("Projeção do aviso prévio no FGTS", None),
+    ("Integração do aviso prévio nas férias", None),
+    ("Incidência do FGTS sobre o aviso prévio", None),
+    ("13º salário sobre o aviso prévio", None),
+    ("Aviso prévio nas férias e no 13º", None),
+    ("Horas extras", None),
+    ("Dano moral", None),
+]
+
+
+def gerar_contrato(anos, aleatorio):
+    admissao = datetime.date(1980, 1, 1) + datetime.timedelta(days=aleatorio.randint(0, 3000))
+    demissao = admissao + datetime.timedelta(days=365 * anos + aleatorio.randint(0, 364))
+    salarios = [
+        {"inicio": datetime.date(ano, aleatorio.randint(1, 12), 1).strftime("%d/%m/%Y"),
+         "valor": f"{aleatorio.uniform(1000, 9000):.2f}".replace(".", ",")}
+        for ano in range(admissao.year + 1, demissao.year + 1)
+    ]
+    salarios.insert(0, {"inicio": admissao.strftime("%d/%m/%Y"), "valor": "1.200,00"})
+    afastamentos = []
+    for _ in range(anos // 3):
+        inicio = admissao + datetime.timedelta(days=aleatorio.randint(0, (demissao - admissao).days))
+        fim = inicio + datetime.timedelta(days=aleatorio.randint(1, 200))
+        afastamentos.append({
+            "inicio": inicio.strftime("%d/%m/%Y"), "fim": fim.strftime("%d/%m/%Y"),
+            "motivo": aleatorio.choice(["auxílio-doença B31", "acidente de trabalho B91"]),
+        })
+    return admissao, demissao, salarios, afastamentos
+
+
+def referencia_dia_a_dia(admissao, demissao, salarios, afastamentos):
+    """Dias trabalhados, remuneração e FGTS por competência, percorrendo dia a dia."""
+    def converter(texto):
+        return datetime.datetime.strptime(texto, "%d/%m/%Y").date()
+
+    vigencias = sorted((converter(s["inicio"]).replace(day=1), Decimal(converter_centavos(s["valor"])) / 100) for s in salarios)
+    periodos = [(converter(a["inicio"]), converter(a["fim"]), "acidente" in a["motivo"]) for a in afastamentos]
+    meses = {}
+    dia = admissao
+    while dia <= demissao:
+        chave = (dia.year, dia.month)
+        trabalhados, base_fgts = meses.get(chave, (0, 0))
+        afastado = [mantem for inicio, fim, mantem in periodos if inicio <= dia <= fim]
+        meses[chave] = (trabalhados + (not afastado), base_fgts + (not afastado or any(afastado)))
+        dia += UM_DIA
+
+    resultado = []
+    for (ano, mes), (trabalhados, dias_fgts) in meses.items():
+        salario = [valor for inicio, valor in vigencias if inicio <= datetime.date(ano, mes, 1)]
+        salario = salario[-1] if salario else vigencias[0][1]
+        dias_mes = ((datetime.date(ano + mes // 12, mes % 12 + 1, 1)) - datetime.date(ano, mes, 1)).days
+
+        def proporcional(dias):
+            if dias >= dias_mes:
+                return salario
+            return (salario * min(dias, 30) / 30).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+        remuneracao = proporcional(trabalhados)
+        fgts = (proporcional(dias_fgts) * Decimal("0.08")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        resultado.append((trabalhados, remuneracao, fgts))
+    return resultado
+
+
+def vetorizado(linha):
+    return [
+        (int(trabalhados), Decimal(int(remuneracao)) / 100, Decimal(int(fgts)) / 100)
+        for trabalhados, remuneracao, fgts, contrato in zip(
+            linha.dias_trabalhados, linha.remuneracao, linha.fgts, linha.dias_contrato
+        )
+        if contrato
+    ]
+
+
+def conferir_pleitos():
+    """Confere CASOS_PLEITOS em um contrato com todas as verbas. Retorna True se todos casaram."""
+    resultado = calcular_verbas_rescisorias(
+        "01/03/2017", "20/02/2023", "2.000,00", ferias_vencidas=1, fgts_depositado=0, multa_477=True, multa_467=True,
+    )
+    divergentes = []
+    for nome, esperado in CASOS_PLEITOS:
+        item = verba_calculada(resultado, nome)
+        partes = item.get("componentes", [item]) if item else []
+        obtido = tuple(parte["chave"] for parte in partes) or None
+        if obtido != esperado:
+            divergentes.append(f"{nome!r}: esperado {esperado}, obtido {obtido}")
+        elif item and item["centavos"] != sum(parte["centavos"] for parte in partes):
+            divergentes.append(f"{nome!r}: valor {item['valor_formatado']} diferente da soma das partes")
+    for divergencia in divergentes:
+        print(f"❌ Pleito {divergencia}")
+    print(f"{'✅' if not divergentes else '❌'} Pleitos conferidos: {len(CASOS_PLEITOS) - len(divergentes)} de {len(CASOS_PLEITOS)}")
+    return not divergentes
+
+
+def main():
+    por_duracao = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    aleatorio = random.Random(43)
+    todos_identicos = True
+    for anos in DURACOES_ANOS:
+        contratos = [gerar_contrato(anos, aleatorio) for _ in range(por_duracao)]
+        inicio = time.perf_counter()
+        resultados = [
+            calcular_verbas_rescisorias(adm, dem, sal, afastamentos=afa, multa_477=True, multa_467=True)
+            for adm, dem, sal, afa in contratos
+        ]
+        tempo = (time.perf_counter() - inicio) / por_duracao
+
+        inicio = time.perf_counter()
+        referencias = [referencia_dia_a_dia(*contrato) for contrato in contratos]
+        tempo_referencia = (time.perf_counter() - inicio) / por_duracao
+
+        identicos = all(vetorizado(r["linha_do_tempo"]) == ref for r, ref in zip(resultados, referencias))
+        todos_identicos = todos_identicos and identicos
+        print(f"⏱️ {anos:>2} anos: {tempo * 1000:.2f} ms por contrato "
+              f"(referência dia a dia: {tempo_referencia * 1000:.1f} ms) {'✅' if identicos else '❌ divergente'}")
+
+    print(f"{'✅' if todos_identicos else '❌'} Linha do tempo idêntica à referência: {todos_identicos}")
+    pleitos_ok = conferir_pleitos()
+    return 0 if todos_identicos and pleitos_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
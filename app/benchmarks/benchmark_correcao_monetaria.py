@@ -0,0 +1,107 @@
+# ===================================================================
+# app/benchmarks/benchmark_correcao_monetaria.py (BENCHMARK DA CORREÇÃO MONETÁRIA)
+#
+# Funcionalidades:
+# - TABELAS SINTÉTICAS: Taxas mensais aleatórias de IPCA-E, SELIC e TR
+#   (não são índices reais; servem só para medir e conferir o cálculo).
+# - CONFERÊNCIA: Compara `corrigir_parcelas` (acumulados vetorizados) com
+#   uma referência parcela a parcela que multiplica/soma as taxas mês a mês
+#   em Decimal, aceitando no máximo 1 centavo de diferença por parcela.
+# - TEMPO: Mede lotes de 100 a 5.000 parcelas.
+#
+# Uso (a partir de app/):  python benchmarks/benchmark_correcao_monetaria.py [parcelas ...]
+# ===================================================================
+
+import os
+import sys
+import time
+import random
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+DIR_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_APP)
+
+from correcao_monetaria import TabelaIndice, corrigir_parcelas  # noqa: E402
+
+TAMANHOS_PADRAO = [100, 500, 1000, 5000]
+INICIO_TABELAS = np.datetime64("1995-01", "M")
+MESES_TABELAS = 372
+AJUIZAMENTO = datetime.date(2018, 7, 10)
+LIQUIDACAO = datetime.date(2025, 6, 30)
+
+
+def gerar_tabelas(aleatorio):
+    def taxas(minimo, maximo):
+        return [aleatorio.uniform(minimo, maximo) for _ in range(MESES_TABELAS)]
+    return {
+        "ipca_e": TabelaIndice("ipca_e", INICIO_TABELAS, taxas(-0.002, 0.012)),
+        "selic": TabelaIndice("selic", INICIO_TABELAS, taxas(0.002, 0.014)),
+        "tr": TabelaIndice("tr", INICIO_TABELAS, taxas(0.0, 0.003)),
+    }
+
+
+def gerar_parcelas(quantidade, aleatorio):
+    competencias = np.array([
+        INICIO_TABELAS + aleatorio.randint(0, 300) for _ in range(quantidade)
+    ])
+    valores = [aleatorio.randint(1000, 2_000_000) for _ in range(quantidade)]
+    return competencias, valores
+
+
+def referencia_parcela_a_parcela(competencias, valores, tabelas):
+    """Mesmo regime, percorrendo as competências de cada parcela."""
+    def taxa(nome, competencia):
+        return Decimal(repr(float(tabelas[nome].taxas[int(competencia - INICIO_TABELAS)])))
+
+    mes_ajuizamento = np.datetime64(AJUIZAMENTO, "M")
+    mes_liquidacao = np.datetime64(LIQUIDACAO, "M")
+    resultado = []
+    for competencia, valor in zip(competencias, valores):
+        mes = competencia + 1
+        ipca, tr, selic = Decimal(1), Decimal(1), Decimal(1)
+        while mes < mes_ajuizamento:
+            ipca *= 1 + taxa("ipca_e", mes)
+            tr *= 1 + taxa("tr", mes)
+            mes += 1
+        while mes < mes_liquidacao:
+            selic += taxa("selic", mes)
+            mes += 1
+        atualizado = Decimal(valor) * ipca * tr * selic
+        resultado.append(int(atualizado.quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+    return resultado
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO
+    aleatorio = random.Random(44)
+    tabelas = gerar_tabelas(aleatorio)
+    print("⚠️ Tabelas sintéticas: os valores não correspondem a índices reais.")
+
+    todos_conferem = True
+    for quantidade in tamanhos:
+        competencias, valores = gerar_parcelas(quantidade, aleatorio)
+
+        inicio = time.perf_counter()
+        correcao = corrigir_parcelas(competencias, valores, AJUIZAMENTO, LIQUIDACAO, tabelas)
+        tempo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        referencia = referencia_parcela_a_parcela(competencias, valores, tabelas)
+        tempo_referencia = time.perf_counter() - inicio
+
+        diferenca = int(np.abs(correcao.atualizados - np.array(referencia)).max())
+        conferem = diferenca <= 1
+        todos_conferem = todos_conferem and conferem
+        print(f"⏱️ {quantidade:>5} parcelas: vetorizado {tempo * 1000:.2f} ms | "
+              f"parcela a parcela {tempo_referencia * 1000:.0f} ms "
+              f"(diferença máxima {diferenca} centavo(s)) {'✅' if conferem else '❌ divergente'}")
+
+    print(f"{'✅' if todos_conferem else '❌'} Valores conferem com a referência: {todos_conferem}")
+    return 0 if todos_conferem else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# ===================================================================
+# app/benchmarks/benchmark_correlacao.py (BENCHMARK DA CORRELAÇÃO DE VERBAS)
+#
+# Funcionalidades:
+# - ENTRADAS SINTÉTICAS: Gera verbas do texto e da planilha a partir dos
+#   nomes padronizados e do dicionário de sinônimos, com variações típicas
+#   de planilhas do PJe-Calc (reflexos, diferenças, períodos).
+# - COMPARAÇÃO: Mede o laço par a par com `calcular_similaridade` contra o
+#   `MotorCorrelacao` em lote usado por `correlacionar_verbas`.
+# - REFLEXOS: Mede `verificar_desmembramentos_reflexos` (índice invertido)
+#   contra o laço O(n²) original sobre a mesma planilha sintética.
+# - CONFERÊNCIA: Verifica que a melhor correspondência e a pontuação de
+#   cada verba do texto, e o mapeamento de reflexos, são idênticos.
+#
+# Uso (a partir de app/):  python benchmarks/benchmark_correlacao.py [n_texto] [n_planilha]
+# ===================================================================
+
+import os
+import re
+import sys
+import time
+import random
+
+DIR_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_APP)
+
+from analise_verbas import AnalisadorVerbasAvancado, _NOMES_PADRONIZADOS, _DICIONARIO_VERBAS  # noqa: E402
+from correlacao_lote import MotorCorrelacao  # noqa: E402
+
+VARIACOES = [
+    "{}", "Diferenças de {}", "Reflexos de {} em FGTS", "{} - período 01/2020 a 12/2021",
+    "{} (art. 59 da CLT)", "Integração de {} sobre férias + 1/3", "{} + 40%", "Repercussão de {} no 13º",
+]
+
+
+def gerar_nomes(quantidade, semente):
+    aleatorio = random.Random(semente)
+    base = list(_NOMES_PADRONIZADOS.values()) + [s for sinonimos in _DICIONARIO_VERBAS.values() for s in sinonimos]
+    return [aleatorio.choice(VARIACOES).format(aleatorio.choice(base)) for _ in range(quantidade)]
+
+
+def correlacao_par_a_par(analisador, nomes_texto, nomes_planilha):
+    """Implementação anterior: `calcular_similaridade` para cada par."""
+    resultados = []
+    for nome_texto in nomes_texto:
+        melhor_indice, melhor_pontuacao = None, 0
+        for indice, nome_planilha in enumerate(nomes_planilha):
+            pontuacao = analisador.calcular_similaridade(nome_texto, nome_planilha)
+            if pontuacao > melhor_pontuacao:
+                melhor_indice, melhor_pontuacao = indice, pontuacao
+        resultados.append((melhor_indice, melhor_pontuacao))
+    return resultados
+
+
+def reflexos_par_a_par(analisador, verbas_planilha):
+    """Implementação anterior de `verificar_desmembramentos_reflexos` (todos os pares)."""
+    desmembramentos = {}
+    padrao_reflexos = re.compile(r'reflexo|repercuss[aã]o|sobre|incid[eê]ncia|em|integra[cç][aã]o')
+    for verba in verbas_planilha:
+        nome_verba = verba.get("verba", "").lower()
+        if padrao_reflexos.search(nome_verba):
+            for outra_verba in verbas_planilha:
+                nome_outra = outra_verba.get("verba", "").lower()
+                if nome_outra == nome_verba:
+                    continue
+                if nome_outra in nome_verba or analisador.calcular_similaridade(nome_outra, nome_verba) > 0.4:
+                    desmembramentos.setdefault(nome_verba, []).append(nome_outra)
+    return desmembramentos
+
+
+def main():
+    n_texto = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_planilha = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    nomes_texto = gerar_nomes(n_texto, semente=1)
+    nomes_planilha = gerar_nomes(n_planilha, semente=2)
+    analisador = AnalisadorVerbasAvancado()
+    print(f"📚 Entradas: {n_texto} verbas do texto x {n_planilha} verbas da planilha.")
+
+    inicio = time.perf_counter()
+    antigo = correlacao_par_a_par(analisador, nomes_texto, nomes_planilha)
+    tempo_antigo = time.perf_counter() - inicio
+
+    motor = MotorCorrelacao(analisador)
+    inicio = time.perf_counter()
+    novo = motor.melhores_correspondencias(nomes_texto, nomes_planilha)
+    tempo_novo = time.perf_counter() - inicio
+
+    identicos = antigo == novo
+    print(f"⏱️ Par a par: {tempo_antigo:.3f} s ({n_texto * n_planilha} pares)")
+    print(f"⏱️ Em lote:   {tempo_novo:.3f} s ({tempo_antigo / tempo_novo:.1f}x; "
+          f"{motor.pares_exatos} pares com SequenceMatcher exato)")
+    print(f"{'✅' if identicos else '❌'} Resultados idênticos: {identicos}")
+
+    verbas_planilha = [{"verba": nome} for nome in nomes_planilha]
+    inicio = time.perf_counter()
+    reflexos_antigo = reflexos_par_a_par(analisador, verbas_planilha)
+    tempo_antigo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    reflexos_novo = analisador.verificar_desmembramentos_reflexos(verbas_planilha)
+    tempo_novo = time.perf_counter() - inicio
+
+    reflexos_identicos = reflexos_antigo == reflexos_novo
+    print(f"⏱️ Reflexos par a par:        {tempo_antigo:.3f} s")
+    print(f"⏱️ Reflexos índice invertido: {tempo_novo:.3f} s ({tempo_antigo / tempo_novo:.1f}x)")
+    print(f"{'✅' if reflexos_identicos else '❌'} Reflexos idênticos: {reflexos_identicos}")
+    return 0 if identicos and reflexos_identicos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
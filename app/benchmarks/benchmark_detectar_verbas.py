@@ -0,0 +1,97 @@
+# ===================================================================
+# app/benchmarks/benchmark_detectar_verbas.py (BENCHMARK DA DETECÇÃO DE VERBAS)
+#
+# Funcionalidades:
+# - CORPUS: Concatena os chunks salvos em app/logs (chunk_*.txt).
+# - COMPARAÇÃO: Mede a varredura padrão a padrão (`re.finditer`) contra a
+#   varredura única do `EscanerCategorias` com os padrões aprimorados.
+# - PARALELO: Mede a varredura por janelas em processos (deteccao_paralela)
+#   com DETECCAO_PARALELA_WORKERS processos (padrão: número de CPUs).
+# - CONFERÊNCIA: Verifica que todas produzem exatamente os mesmos matches.
+#
+# Uso (a partir de app/):  python benchmarks/benchmark_detectar_verbas.py [repeticoes]
+# ===================================================================
+
+import os
+import re
+import sys
+import glob
+import time
+
+DIR_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_APP)
+
+from analise_verbas import AnalisadorVerbasAvancado, aprimorar_padroes_verbas  # noqa: E402
+from escaner_padroes import EscanerCategorias  # noqa: E402
+from deteccao_paralela import varrer_posicoes_paralelo, WORKERS_DETECCAO  # noqa: E402
+
+
+def carregar_corpus():
+    arquivos = sorted(glob.glob(os.path.join(DIR_APP, "logs", "chunk_*.txt")))
+    partes = []
+    for arquivo in arquivos:
+        with open(arquivo, encoding="utf-8") as f:
+            partes.append(f.read())
+    return "\n".join(partes), len(arquivos)
+
+
+def varredura_por_padrao(categorias, texto_norm):
+    """Implementação anterior: um `re.finditer` por padrão."""
+    resultado = {}
+    for categoria, patterns in categorias.items():
+        matches = [m for pattern in patterns for m in re.finditer(pattern, texto_norm)]
+        if matches:
+            resultado[categoria] = matches
+    return resultado
+
+
+def medir(funcao, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        retorno = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, retorno
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    texto, quantidade = carregar_corpus()
+    if not texto:
+        print("❌ Nenhum chunk encontrado em app/logs.")
+        return 1
+
+    analisador = aprimorar_padroes_verbas(AnalisadorVerbasAvancado())
+    categorias = analisador.categorias_verbas
+    total_padroes = sum(len(p) for p in categorias.values())
+    texto_norm = analisador.normalizar_texto(texto)
+    print(f"📚 Corpus: {quantidade} chunks, {len(texto):,} caracteres, {total_padroes} padrões.")
+
+    inicio = time.perf_counter()
+    escaner = EscanerCategorias(categorias)
+    construcao = time.perf_counter() - inicio
+    print(f"🔧 Escaner montado em {construcao * 1000:.1f} ms "
+          f"({len(escaner.escaner.indices_finditer)} padrões sem prefixo literal).")
+
+    tempo_antigo, antigo = medir(lambda: varredura_por_padrao(categorias, texto_norm), repeticoes)
+    tempo_novo, novo = medir(lambda: escaner.varrer(texto_norm), repeticoes)
+    tempo_total, _ = medir(lambda: analisador.detectar_verbas(texto), repeticoes)
+
+    workers = max(2, WORKERS_DETECCAO)
+    varrer_posicoes_paralelo(escaner, texto_norm, workers)  # aquece o pool de processos
+    tempo_paralelo, paralelo = medir(lambda: varrer_posicoes_paralelo(escaner, texto_norm, workers), repeticoes)
+
+    assinatura = lambda r: {c: [(m.start(), m.end()) for m in ms] for c, ms in r.items()}  # noqa: E731
+    identicos = assinatura(antigo) == assinatura(novo) == paralelo
+    ocorrencias = sum(len(ms) for ms in novo.values())
+
+    print(f"⏱️ Varredura por padrão: {tempo_antigo:.3f} s")
+    print(f"⏱️ Varredura única:      {tempo_novo:.3f} s  ({tempo_antigo / tempo_novo:.1f}x)")
+    print(f"⏱️ Varredura paralela:   {tempo_paralelo:.3f} s  ({workers} processos, {os.cpu_count()} CPUs)")
+    print(f"⏱️ detectar_verbas completo (normalização + contexto): {tempo_total:.3f} s")
+    print(f"{'✅' if identicos else '❌'} Resultados idênticos: {identicos} ({ocorrencias} ocorrências)")
+    return 0 if identicos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,459 @@
+# ===================================================================
+# app/benchmarks/executar_benchmarks.py (SUÍTE DE BENCHMARKS REPRODUZÍVEL)
+#
+# Funcionalidades:
+# - CORPUS FIXO: Usa os chunks reais salvos em app/logs (chunk_*.txt, na
+#   ordem numérica) como texto do processo; o SHA-256 do corpus vai para o
+#   resultado, para só comparar execuções sobre o mesmo texto.
+# - GEMINI LOCAL: `ModeloLocal` substitui o `GenerativeModel` durante a
+#   suíte. Extrai por regex (número do processo, partes, datas, valores e
+#   verbas do glossário) e consolida os JSONs parciais de forma
+#   determinística, com latência simulada opcional (--latencia-llm).
+# - ETAPAS MEDIDAS: Divisão em chunks, detecção de verbas por regex,
+#   correlação por similaridade, análise avançada, extração (agendador +
+#   parsing), consolidação, `adaptar_formato_para_interface`, relatório
+#   formatado e cada exportador de `cache_exportacao.GERADORES` (sem o
+#   cache LRU).
+# - MEDIÇÃO: Aquecimento + N repetições por etapa; guarda melhor, mediana
+#   e média, além de itens/s. Etapas cuja dependência não está instalada
+#   ficam como "indisponivel" e a suíte continua.
+# - LINHA DE BASE: Grava um JSON (ambiente, commit, corpus e tempos) e,
+#   com --comparar, aponta as etapas cuja mediana piorou além da
+#   tolerância (código de saída 1).
+#
+# Uso (a partir de app/):
+#   python benchmarks/executar_benchmarks.py [--repeticoes 5] [--saida arquivo.json]
+#          [--comparar linha_de_base.json] [--tolerancia 0.25] [--apenas etapa,...]
+# ===================================================================
+
+import os
+import re
+import sys
+import json
+import copy
+import time
+import random
+import hashlib
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import subprocess
+import traceback
+
+DIR_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_APP)
+
+DIR_RESULTADOS = os.path.join(DIR_APP, "benchmarks", "resultados")
+MARCADOR_CONSOLIDACAO = "**LISTA DE DADOS BRUTOS EXTRAÍDOS DO PROCESSO ATUAL:**"
+
+# Verbas do glossário do prompt de consolidação: (nome, padrão no texto, reflexos)
+GLOSSARIO_VERBAS = [
+    ("Saldo de Salário", r"saldo de sal[aá]rio", "FGTS e Multa de 40%"),
+    ("Aviso Prévio", r"aviso pr[eé]vio", "FGTS e Multa de 40%"),
+    ("13º Salário", r"13[º°o]? sal[aá]rio|d[eé]cimo terceiro", "FGTS e Multa de 40%"),
+    ("Férias Vencidas", r"f[eé]rias vencidas", "N/A"),
+    ("Férias Proporcionais", r"f[eé]rias proporcionais", "N/A"),
+    ("Multa do art. 467 da CLT", r"(?:art(?:igo)?\.?\s*)467", "N/A"),
+    ("Multa do art. 477 da CLT", r"(?:art(?:igo)?\.?\s*)477", "N/A"),
+    ("Depósitos do FGTS", r"dep[oó]sitos? (?:do |de )?fgts|fgts", "N/A"),
+    ("Multa de 40% do FGTS", r"40\s?%", "N/A"),
+    ("Horas Extras", r"horas? extras?", "FGTS e Multa de 40%"),
+    ("Adicional de Insalubridade", r"insalubridade", "FGTS e Multa de 40%"),
+    ("Dano Moral", r"danos? morais?|dano moral", "N/A"),
+]
+
+_RE_PROCESSO = re.compile(r"\b\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}\b")
+_RE_DATA = re.compile(r"\b\d{2}/\d{2}/\d{4}\b")
+_RE_VALOR = re.compile(r"R\$\s?\d{1,3}(?:\.\d{3})*,\d{2}")
+_RE_RECLAMANTE = re.compile(r"RECLAMANTE:\s+([A-ZÀ-Ý][A-ZÀ-Ý ]{4,80})")
+_RE_RECLAMADA = re.compile(r"RECLAMAD[OA]S?:\s+([A-ZÀ-Ý0-9][A-ZÀ-Ý0-9 .,&/-]{4,80})")
+_RE_ADMISSAO = re.compile(r"admitid[oa]\D{0,40}(\d{2}/\d{2}/\d{4})", re.IGNORECASE)
+_RE_DISPENSA = re.compile(r"(?:dispensad[oa]|demitid[oa]|rescis[aã]o)\D{0,40}(\d{2}/\d{2}/\d{4})", re.IGNORECASE)
+_PADROES_GLOSSARIO = [(nome, re.compile(padrao, re.IGNORECASE), reflexos) for nome, padrao, reflexos in GLOSSARIO_VERBAS]
+
+
+# --- GEMINI LOCAL ---
+
+class RespostaLocal:
+    def __init__(self, texto):
+        self.text = texto
+
+
+class ModeloLocal:
+    """Substituto determinístico do `genai.GenerativeModel` (mesma interface usada pelo extrator)."""
+
+    latencia_s = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def count_tokens(self, conteudo):
+        raise RuntimeError("contagem de tokens indisponível no modelo local")
+
+    def generate_content(self, conteudo, generation_config=None):
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        conteudo = str(conteudo)
+        if MARCADOR_CONSOLIDACAO in conteudo:
+            parciais = json.loads(conteudo.split(MARCADOR_CONSOLIDACAO, 1)[1])
+            return RespostaLocal(json.dumps(consolidar_localmente(parciais), ensure_ascii=False))
+        return RespostaLocal(json.dumps(extrair_localmente(conteudo), ensure_ascii=False))
+
+
+def extrair_localmente(texto):
+    """JSON parcial no formato do PROMPT_EXTRACAO, obtido por regex."""
+    processo = _RE_PROCESSO.search(texto)
+    reclamante = _RE_RECLAMANTE.search(texto)
+    admissao = _RE_ADMISSAO.search(texto)
+    dispensa = _RE_DISPENSA.search(texto)
+    valores = _RE_VALOR.findall(texto)
+    return {
+        "dados_processuais": {
+            "numero_processo": processo.group(0) if processo else "",
+            "valor_causa": valores[-1] if valores else "",
+        },
+        "partes": {
+            "reclamante": reclamante.group(1).strip() if reclamante else "",
+            "reclamadas": sorted({m.strip() for m in _RE_RECLAMADA.findall(texto)}),
+        },
+        "contrato_trabalho": {
+            "data_admissao": admissao.group(1) if admissao else "",
+            "data_demissao_rescisao_indireta": dispensa.group(1) if dispensa else "",
+            "salario_base": valores[0] if valores else "",
+        },
+        "pleitos_e_verbas": [
+            {"verba": nome, "parametros": f"Menções: {len(padrao.findall(texto))}", "reflexos": reflexos}
+            for nome, padrao, reflexos in _PADROES_GLOSSARIO if padrao.search(texto)
+        ],
+        "datas_citadas": _RE_DATA.findall(texto)[:10],
+    }
+
+
+def consolidar_localmente(parciais):
+    """Mescla os JSONs parciais: primeiro valor não vazio de cada campo e verbas sem duplicatas."""
+    consolidado = {"dados_processuais": {}, "partes": {"reclamadas": []}, "contrato_trabalho": {}, "pleitos_e_verbas": []}
+    vistas = set()
+    for parcial in parciais:
+        for secao in ("dados_processuais", "partes", "contrato_trabalho"):
+            for campo, valor in (parcial.get(secao) or {}).items():
+                if isinstance(valor, list):
+                    destino = consolidado[secao].setdefault(campo, [])
+                    destino.extend(v for v in valor if v not in destino)
+                elif valor and not consolidado[secao].get(campo):
+                    consolidado[secao][campo] = valor
+        for verba in parcial.get("pleitos_e_verbas") or []:
+            if verba["verba"] not in vistas:
+                vistas.add(verba["verba"])
+                consolidado["pleitos_e_verbas"].append(verba)
+    consolidado["dados_processuais"].setdefault("fase_calculo", "Provisão Inicial")
+    consolidado["parametros_calculo"] = {
+        "honorarios_advocaticios": {"percentual": "15%", "base_calculo": "Valor da condenação"},
+        "correcao_monetaria": [{"indice": "IPCA-E", "periodo": "Fase pré-judicial"}],
+        "juros_mora": [{"tipo": "SELIC", "periodo": "A partir do ajuizamento"}],
+        "contribuicao_social": {"inss_terceiros_percentual": "5,8%"},
+    }
+    consolidado["observacoes_gerais"] = (
+        f"Consolidação local de {len(parciais)} partes com {len(consolidado['pleitos_e_verbas'])} verbas."
+    )
+    return consolidado
+
+
+def instalar_modelo_local(latencia_ms=0.0):
+    """
+    Troca o GenerativeModel do extrator pelo modelo local, desliga o cache de
+    prompt no servidor e a pausa fixa entre chunks (só a latência simulada conta).
+    """
+    import extrator
+
+    ModeloLocal.latencia_s = latencia_ms / 1000
+    os.environ["GEMINI_CACHE_PROMPT"] = "0"
+    extrator.genai.GenerativeModel = ModeloLocal
+    extrator.PAUSA_ENTRE_CHAMADAS = 0
+    return extrator
+
+
+# --- CORPUS ---
+
+def carregar_corpus():
+    """Chunks de app/logs em ordem numérica."""
+    diretorio = os.path.join(DIR_APP, "logs")
+    arquivos = [a for a in os.listdir(diretorio) if re.fullmatch(r"chunk_\d+\.txt", a)]
+    arquivos.sort(key=lambda a: int(re.search(r"\d+", a).group(0)))
+    chunks = []
+    for arquivo in arquivos:
+        with open(os.path.join(diretorio, arquivo), encoding="utf-8") as f:
+            chunks.append(f.read())
+    return chunks
+
+
+def gerar_planilha(nomes, linhas, semente):
+    """Planilha sintética ("Verbas Resumidas") com variações dos nomes de verbas encontrados."""
+    variacoes = ["{}", "Diferenças de {}", "Reflexos de {} em FGTS", "{} - período 01/2020 a 12/2021",
+                 "Integração de {} sobre férias + 1/3", "{} + 40%", "Repercussão de {} no 13º"]
+    aleatorio = random.Random(semente)
+    return {"Verbas Resumidas": [
+        {"verba": aleatorio.choice(variacoes).format(aleatorio.choice(nomes)), "valor": round(aleatorio.uniform(100, 10000), 2)}
+        for _ in range(linhas)
+    ]}
+
+
+# --- MEDIÇÃO ---
+
+def medir(executar, repeticoes, preparar=None):
+    """Aquece uma vez e mede `repeticoes` execuções; `preparar()` (fora do tempo) gera o argumento de cada uma."""
+    executar(preparar() if preparar else None)
+    tempos = []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        executar(argumento)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _sem_saida(funcao):
+    """Executa `funcao` descartando os prints (o extrator registra cada chunk)."""
+    def executar(argumento):
+        saida = sys.stdout
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")
+        try:
+            return funcao(argumento)
+        finally:
+            sys.stdout.close()
+            sys.stdout = saida
+    return executar
+
+
+class Suite:
+    """Registra e executa as etapas, montando o resultado em JSON."""
+
+    def __init__(self, repeticoes, apenas=None):
+        self.repeticoes = repeticoes
+        self.apenas = set(apenas or [])
+        self.resultados = {}
+
+    def etapa(self, nome, montar, itens=1, repeticoes=None):
+        """`montar()` devolve `(executar, preparar)`; falhas de importação marcam a etapa como indisponível."""
+        if self.apenas and nome not in self.apenas:
+            return
+        try:
+            executar, preparar = montar()
+            tempos = medir(executar, repeticoes or self.repeticoes, preparar)
+        except ImportError as e:
+            self.resultados[nome] = {"status": "indisponivel", "erro": f"{type(e).__name__}: {e}"}
+            print(f"⚠️ {nome}: dependência ausente ({e}).")
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self.resultados[nome] = {"status": "erro", "erro": f"{type(e).__name__}: {e}"}
+            print(f"❌ {nome}: {e}")
+            return
+        mediana = statistics.median(tempos)
+        self.resultados[nome] = {
+            "status": "ok",
+            "repeticoes": len(tempos),
+            "melhor_s": round(min(tempos), 6),
+            "mediana_s": round(mediana, 6),
+            "media_s": round(statistics.fmean(tempos), 6),
+            "itens": itens,
+            "itens_por_s": round(itens / mediana, 2) if mediana else None,
+        }
+        print(f"⏱️ {nome:<32} mediana {mediana * 1000:10.2f} ms  melhor {min(tempos) * 1000:10.2f} ms  ({itens} itens)")
+
+
+def executar_suite(repeticoes=5, apenas=None, latencia_llm_ms=0.0, chunks_extracao=40):
+    chunks = carregar_corpus()
+    if not chunks:
+        raise SystemExit("❌ Nenhum chunk encontrado em app/logs.")
+    texto = "\n".join(chunks)
+    print(f"📚 Corpus: {len(chunks)} chunks, {len(texto):,} caracteres.")
+    suite = Suite(repeticoes, apenas)
+    area = tempfile.mkdtemp(prefix="benchmarks_")
+    contexto = {}
+
+    def analisador():
+        if "analisador" not in contexto:
+            from analise_verbas import AnalisadorVerbasAvancado
+            contexto["analisador"] = AnalisadorVerbasAvancado()
+        return contexto["analisador"]
+
+    def extrator():
+        if "extrator" not in contexto:
+            contexto["extrator"] = instalar_modelo_local(latencia_llm_ms)
+        return contexto["extrator"]
+
+    def consolidado_bruto():
+        if "consolidado" not in contexto:
+            contexto["consolidado"] = consolidar_localmente([extrair_localmente(chunk) for chunk in chunks])
+        return contexto["consolidado"]
+
+    def dados_interface():
+        if "interface" not in contexto:
+            with open(os.devnull, "w", encoding="utf-8") as nulo:
+                saida, sys.stdout = sys.stdout, nulo
+                try:
+                    contexto["interface"] = extrator().adaptar_formato_para_interface(copy.deepcopy(consolidado_bruto()))
+                finally:
+                    sys.stdout = saida
+        return contexto["interface"]
+
+    # 1. Divisão do texto em chunks
+    suite.etapa("chunking", lambda: (lambda _: extrator().dividir_em_chunks(texto), None), itens=len(texto))
+
+    # 2. Detecção de verbas por regex (corpus inteiro)
+    suite.etapa("deteccao_verbas", lambda: (lambda _: analisador().detectar_verbas(texto), None), itens=len(texto))
+
+    # 3. Correlação por similaridade (verbas do corpus x planilha sintética)
+    def montar_correlacao():
+        verbas_texto = [
+            {"verba": analisador()._obter_nome_padronizado(categoria), "categoria": categoria, "matches": matches}
+            for categoria, matches in analisador().detectar_verbas(texto).items()
+        ]
+        nomes = [verba["verba"] for verba in verbas_texto] or [nome for nome, _, _ in GLOSSARIO_VERBAS]
+        planilha = gerar_planilha(nomes, 500, semente=42)["Verbas Resumidas"]
+        contexto["planilha"] = {"Verbas Resumidas": planilha}
+        return (lambda _: analisador().correlacionar_verbas(verbas_texto, planilha)), None
+    suite.etapa("correlacao_similaridade", montar_correlacao, itens=500)
+
+    # 4. Análise avançada completa (detecção, correlação, reflexos e relatório)
+    def montar_analise_avancada():
+        planilha = contexto.get("planilha") or gerar_planilha([nome for nome, _, _ in GLOSSARIO_VERBAS], 500, semente=42)
+        return (lambda _: analisador().analisar_processo_avancado(texto, planilha)), None
+    suite.etapa("analise_avancada", montar_analise_avancada, itens=len(texto))
+
+    # 5. Extração com o modelo local (agendamento, prompts, parsing e saturação)
+    amostra = chunks[:chunks_extracao]
+    def montar_extracao():
+        modulo = extrator()
+        diretorio_logs = os.path.join(area, "logs")
+        return _sem_saida(lambda _: modulo.extrair_dados_parciais(amostra, diretorio_logs=diretorio_logs)), None
+    suite.etapa("extracao_modelo_local", montar_extracao, itens=len(amostra))
+
+    # 6. Consolidação com o modelo local (inclui adaptação e relatório gravado em disco)
+    def montar_consolidacao():
+        modulo = extrator()
+        parciais = [extrair_localmente(chunk) for chunk in amostra]
+        diretorio_relatorios = os.path.join(area, "relatorios")
+        return _sem_saida(lambda _: modulo.consolidar_resultados(parciais, diretorio_relatorios=diretorio_relatorios)), None
+    suite.etapa("consolidacao_modelo_local", montar_consolidacao, itens=len(amostra))
+
+    # 7. Adaptação para a interface (recebe uma cópia nova a cada repetição)
+    suite.etapa("adaptar_formato_para_interface", lambda: (
+        _sem_saida(extrator().adaptar_formato_para_interface), lambda: copy.deepcopy(consolidado_bruto())
+    ))
+
+    # 8. Relatório formatado
+    suite.etapa("relatorio_formatado", lambda: (lambda _: extrator().gerar_relatorio_formatado(dados_interface()), None))
+
+    # 9. Exportadores, sem o cache LRU
+    def montar_exportador(formato):
+        def montar():
+            from cache_exportacao import GERADORES
+            gerar, _ = GERADORES[formato]
+            dados = dados_interface()
+            return _sem_saida(lambda _: gerar(dados, texto)), None
+        return montar
+
+    try:
+        from cache_exportacao import GERADORES
+        formatos = list(GERADORES)
+    except ImportError as e:
+        print(f"⚠️ Exportadores indisponíveis ({e}).")
+        formatos = []
+    for formato in formatos:
+        suite.etapa(f"exportacao_{formato}", montar_exportador(formato))
+
+    return {
+        "gerado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+        "ambiente": _ambiente(),
+        "corpus": {
+            "chunks": len(chunks),
+            "caracteres": len(texto),
+            "sha256": hashlib.sha256(texto.encode("utf-8")).hexdigest(),
+        },
+        "configuracao": {
+            "repeticoes": repeticoes,
+            "latencia_llm_ms": latencia_llm_ms,
+            "chunks_extracao": len(amostra),
+        },
+        "benchmarks": suite.resultados,
+    }
+
+
+def _ambiente():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=DIR_APP, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+# --- COMPARAÇÃO COM A LINHA DE BASE ---
+
+def comparar(atual, base, tolerancia):
+    """Imprime a razão atual/base das medianas. Retorna as etapas que pioraram além da tolerância."""
+    if atual["corpus"]["sha256"] != base.get("corpus", {}).get("sha256"):
+        print("⚠️ O corpus mudou desde a linha de base; a comparação é apenas indicativa.")
+    regressoes = []
+    print(f"\n📊 Comparação com a linha de base ({base.get('gerado_em', '?')}, commit {base.get('ambiente', {}).get('commit', '?')}):")
+    for nome, resultado in atual["benchmarks"].items():
+        anterior = base.get("benchmarks", {}).get(nome)
+        if resultado.get("status") != "ok" or not anterior or anterior.get("status") != "ok":
+            continue
+        razao = resultado["mediana_s"] / anterior["mediana_s"] if anterior["mediana_s"] else 1.0
+        piorou = razao > 1 + tolerancia
+        if piorou:
+            regressoes.append(nome)
+        print(f"   {'❌' if piorou else '✅'} {nome:<32} {anterior['mediana_s'] * 1000:10.2f} ms -> "
+              f"{resultado['mediana_s'] * 1000:10.2f} ms  ({razao:.2f}x)")
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline sobre o corpus de app/logs.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", help="JSON de resultado (padrão: benchmarks/resultados/benchmarks_<data>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior usado como linha de base")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita na mediana (0.25 = 25%%)")
+    parser.add_argument("--apenas", help="lista de etapas separadas por vírgula")
+    parser.add_argument("--latencia-llm", type=float, default=0.0, help="latência simulada por chamada ao modelo local (ms)")
+    parser.add_argument("--chunks-extracao", type=int, default=40, help="chunks usados na extração e consolidação")
+    args = parser.parse_args(argv)
+
+    # Lida antes da execução: a saída pode sobrescrever o mesmo arquivo
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+
+    resultado = executar_suite(
+        args.repeticoes, args.apenas.split(",") if args.apenas else None, args.latencia_llm, args.chunks_extracao
+    )
+    saida = args.saida or os.path.join(
+        DIR_RESULTADOS, f"benchmarks_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"💾 Resultado gravado em {saida}")
+
+    if base is not None:
+        regressoes = comparar(resultado, base, args.tolerancia)
+        if regressoes:
+            print(f"❌ Regressões acima de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+            return 1
+    falhas = [nome for nome, r in resultado["benchmarks"].items() if r["status"] == "erro"]
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# ===================================================================
+# app/cache_casos.py (CACHE DE RESULTADOS POR PROCESSO)
+#
+# Funcionalidades:
+# - CHAVE: SHA-256 do PDF + versão do pipeline (versão manual, modelo e
+#   hash dos prompts de extração/consolidação) + uso do RAG. Alterar um
+#   prompt ou o modelo invalida automaticamente as entradas antigas.
+# - ARMAZENAMENTO: Índice em SQLite e o resultado completo
+#   (`texto_processo`, `log_detalhado`, `dados_completos`, `avisos`) em
+#   arquivos JSON compactados (gzip).
+# - INVALIDAÇÃO: Remoção de um processo específico ou de todo o cache,
+#   acionadas pela interface.
+# - MÉTRICAS: Acertos e faltas das consultas no endpoint /metrics.
+# ===================================================================
+
+import os
+import gzip
+import json
+import sqlite3
+import hashlib
+import datetime
+import threading
+
+import metricas
+from area_trabalho import temporario_atomico
+
+DIR_CACHE_CASOS = os.getenv("CACHE_CASOS_DIR", os.path.join("export", "cache_casos"))
+
+# Incrementar ao mudar a lógica do pipeline de forma que resultados antigos fiquem inválidos
+VERSAO_LOGICA_PIPELINE = "1"
+
+# --- SINGLETON ---
+_cache_casos = None
+_lock_cache_casos = threading.Lock()
+
+_CONSULTAS = metricas.contador("cache_casos_consultas_total", "Consultas ao cache de casos por resultado", ("resultado",))
+
+
+def versao_pipeline(rag_ativo):
+    """
+    Versão que compõe a chave do cache: versão da lógica, modelo e hash
+    dos prompts, além do uso (ou não) da base de conhecimento.
+    """
+    from extrator import PROMPT_EXTRACAO, PROMPT_CONSOLIDACAO, MODELO_ANALISE
+
+    hash_prompts = hashlib.sha256((PROMPT_EXTRACAO + PROMPT_CONSOLIDACAO).encode("utf-8")).hexdigest()[:12]
+    return f"v{VERSAO_LOGICA_PIPELINE}-{MODELO_ANALISE}-{hash_prompts}-rag{int(bool(rag_ativo))}"
+
+
+def hash_arquivo(caminho):
+    """SHA-256 (hex) do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+class CacheCasos:
+    """Armazena o resultado completo da análise de cada PDF."""
+
+    def __init__(self, diretorio=DIR_CACHE_CASOS):
+        self.diretorio = diretorio
+        self.diretorio_blobs = os.path.join(diretorio, "blobs")
+        os.makedirs(self.diretorio_blobs, exist_ok=True)
+        self.caminho_db = os.path.join(diretorio, "casos.sqlite3")
+        self._lock = threading.Lock()
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS casos (
+                    hash_pdf TEXT NOT NULL,
+                    versao TEXT NOT NULL,
+                    arquivo TEXT NOT NULL,
+                    numero_processo TEXT,
+                    tamanho_bytes INTEGER,
+                    criado_em TEXT NOT NULL,
+                    acessos INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (hash_pdf, versao)
+                )
+            """)
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho_db, timeout=30)
+        conexao.row_factory = sqlite3.Row
+        return conexao
+
+    def obter(self, hash_pdf, versao):
+        """Retorna o resultado armazenado ou None (entrada ausente ou blob corrompido)."""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT arquivo FROM casos WHERE hash_pdf = ? AND versao = ?", (hash_pdf, versao)
+            ).fetchone()
+        if linha is None:
+            _CONSULTAS.inc(resultado="falta")
+            return None
+
+        caminho = os.path.join(self.diretorio_blobs, linha["arquivo"])
+        try:
+            with gzip.open(caminho, "rt", encoding="utf-8") as f:
+                resultado = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Entrada do cache de casos ilegível ({e}). Removendo.")
+            self.invalidar(hash_pdf, versao)
+            _CONSULTAS.inc(resultado="falta")
+            return None
+
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(
+                "UPDATE casos SET acessos = acessos + 1 WHERE hash_pdf = ? AND versao = ?", (hash_pdf, versao)
+            )
+        _CONSULTAS.inc(resultado="acerto")
+        print(f"⚡ Cache de casos: resultado reutilizado para o PDF {hash_pdf[:12]}.")
+        return resultado
+
+    def contem(self, hash_pdf, versao):
+        """Indica se há resultado armazenado, sem carregá-lo."""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT 1 FROM casos WHERE hash_pdf = ? AND versao = ?", (hash_pdf, versao)
+            ).fetchone()
+        return linha is not None
+
+    def salvar(self, hash_pdf, versao, resultado):
+        """Grava o resultado (JSON gzip) e registra a entrada no índice."""
+        arquivo = f"{hash_pdf}_{hashlib.sha256(versao.encode('utf-8')).hexdigest()[:12]}.json.gz"
+        caminho = os.path.join(self.diretorio_blobs, arquivo)
+        with temporario_atomico(caminho) as temporario, gzip.open(temporario, "wt", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, default=str)
+
+        dados = resultado.get("dados_completos") or {}
+        numero_processo = (dados.get("informacoes_pjecalc") or {}).get("numero_processo", "")
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO casos (hash_pdf, versao, arquivo, numero_processo, tamanho_bytes, criado_em, acessos) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (hash_pdf, versao, arquivo, numero_processo, os.path.getsize(caminho),
+                 datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+        print(f"💾 Cache de casos: resultado armazenado para o PDF {hash_pdf[:12]}.")
+
+    def invalidar(self, hash_pdf, versao=None):
+        """Remove as entradas de um PDF (de uma versão ou de todas). Retorna quantas foram removidas."""
+        with self._lock, self._conectar() as conexao:
+            if versao is None:
+                linhas = conexao.execute("SELECT arquivo FROM casos WHERE hash_pdf = ?", (hash_pdf,)).fetchall()
+                conexao.execute("DELETE FROM casos WHERE hash_pdf = ?", (hash_pdf,))
+            else:
+                linhas = conexao.execute(
+                    "SELECT arquivo FROM casos WHERE hash_pdf = ? AND versao = ?", (hash_pdf, versao)
+                ).fetchall()
+                conexao.execute("DELETE FROM casos WHERE hash_pdf = ? AND versao = ?", (hash_pdf, versao))
+        for linha in linhas:
+            self._remover_blob(linha["arquivo"])
+        return len(linhas)
+
+    def limpar(self):
+        """Remove todas as entradas do cache. Retorna quantas foram removidas."""
+        with self._lock, self._conectar() as conexao:
+            linhas = conexao.execute("SELECT arquivo FROM casos").fetchall()
+            conexao.execute("DELETE FROM casos")
+        for linha in linhas:
+            self._remover_blob(linha["arquivo"])
+        print(f"🧹 Cache de casos limpo ({len(linhas)} entradas).")
+        return len(linhas)
+
+    def estatisticas(self):
+        """Quantidade de entradas, tamanho total e acessos."""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT COUNT(*) AS entradas, COALESCE(SUM(tamanho_bytes), 0) AS bytes, "
+                "COALESCE(SUM(acessos), 0) AS acessos FROM casos"
+            ).fetchone()
+        return dict(linha)
+
+    def _remover_blob(self, arquivo):
+        try:
+            os.remove(os.path.join(self.diretorio_blobs, arquivo))
+        except FileNotFoundError:
+            pass
+
+
+def obter_cache_casos():
+    """Retorna o cache de casos do processo (criado na primeira chamada)."""
+    global _cache_casos
+    if _cache_casos is not None:
+        return _cache_casos
+    with _lock_cache_casos:
+        if _cache_casos is None:
+            _cache_casos = CacheCasos()
+    return _cache_casos
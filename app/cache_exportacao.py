@@ -0,0 +1,109 @@
+# ===================================================================
+# app/cache_exportacao.py (EXPORTAÇÕES SOB DEMANDA E MEMORIZADAS)
+#
+# Funcionalidades:
+# - GERAÇÃO ÚNICA: JSON, XML PJe-Calc, DOCX e Excel são gerados uma vez
+#   por conteúdo de `dados_completos` e servidos da memória nos reruns
+#   seguintes do Streamlit (inclusive ao clicar nos botões de download).
+# - CHAVE POR CONTEÚDO: Hash SHA-256 do JSON canônico dos dados (e do
+#   texto do processo, no caso do Excel, que depende da análise de verbas).
+# - SOB DEMANDA: Cada formato só é gerado quando solicitado.
+# - PERFIL: Cada geração (não as leituras do cache) é medida no perfil ativo
+#   e nas métricas (duração e bytes por formato; acertos no cache LRU).
+# ===================================================================
+
+import os
+import json
+import hashlib
+import tempfile
+from cache_lru import CacheLRU
+from instrumentacao import medir
+import metricas
+
+# Quantidade de artefatos mantidos em memória (todas as sessões do processo)
+_cache_artefatos = CacheLRU(max_entradas=int(os.getenv("CACHE_EXPORTACAO_MAX", "64")), nome="exportacoes")
+
+_DURACAO_GERACAO = metricas.histograma(
+    "exportacao_geracao_segundos", "Tempo de geração dos artefatos exportados", ("formato", "resultado")
+)
+_BYTES_GERADOS = metricas.contador("exportacao_bytes_total", "Bytes dos artefatos exportados gerados", ("formato",))
+
+
+def hash_dados(dados, texto_processo=None):
+    """Hash estável do conteúdo (chaves ordenadas), usado como chave do cache."""
+    digest = hashlib.sha256(json.dumps(dados, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    if texto_processo:
+        digest.update(b"\0")
+        digest.update(texto_processo.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _gerar_json(dados, texto_processo):
+    from json_generator import gerar_json_bytes
+    return gerar_json_bytes(dados)
+
+
+def _gerar_via_arquivo(gerador, sufixo):
+    """Executa um gerador que grava em arquivo e devolve os bytes gerados."""
+    def gerar(dados, texto_processo):
+        with tempfile.TemporaryDirectory(prefix="exportacao_") as diretorio:
+            caminho = os.path.join(diretorio, f"saida{sufixo}")
+            gerador()(dados, caminho)
+            with open(caminho, "rb") as f:
+                return f.read()
+    return gerar
+
+
+def _gerador_xml():
+    from xml_generator import gerar_xml_pjecalc
+    return gerar_xml_pjecalc
+
+
+def _gerador_docx():
+    from exportador_docx import gerar_docx_resumo
+    return gerar_docx_resumo
+
+
+def _gerar_excel(dados, texto_processo):
+    from exportadores_completo import gerar_excel_processo
+    return gerar_excel_processo(dados, texto_processo).getvalue()
+
+
+# Formato -> (função geradora, depende do texto do processo)
+GERADORES = {
+    "json": (_gerar_json, False),
+    "xml": (_gerar_via_arquivo(_gerador_xml, ".xml"), False),
+    "docx": (_gerar_via_arquivo(_gerador_docx, ".docx"), False),
+    "excel": (_gerar_excel, True),
+}
+
+
+def _chave(formato, dados, texto_processo):
+    usa_texto = GERADORES[formato][1]
+    return (formato, hash_dados(dados, texto_processo if usa_texto else None))
+
+
+def _gerar_medido(formato, dados, texto_processo):
+    gerar, _ = GERADORES[formato]
+    with medir(f"exportacao.{formato}") as span, _DURACAO_GERACAO.cronometrar(formato=formato):
+        conteudo = gerar(dados, texto_processo)
+        span.registrar(bytes=len(conteudo))
+    _BYTES_GERADOS.inc(len(conteudo), formato=formato)
+    return conteudo
+
+
+def obter_exportacao(formato, dados, texto_processo=None):
+    """Retorna os bytes do artefato, gerando-o apenas na primeira solicitação."""
+    return _cache_artefatos.obter_ou_gerar(
+        _chave(formato, dados, texto_processo),
+        lambda: _gerar_medido(formato, dados, texto_processo),
+    )
+
+
+def exportacao_disponivel(formato, dados, texto_processo=None):
+    """Indica se o artefato já foi gerado para esses dados."""
+    return _cache_artefatos.contem(_chave(formato, dados, texto_processo))
+
+
+def estatisticas():
+    return _cache_artefatos.estatisticas()
@@ -0,0 +1,105 @@
+# ===================================================================
+# app/cache_lru.py (CACHE LRU EM MEMÓRIA, SEGURO PARA THREADS)
+#
+# Funcionalidades:
+# - LIMITE DE ENTRADAS: Mantém no máximo `max_entradas` itens, descartando
+#   o usado há mais tempo.
+# - SEGURO PARA THREADS: Acesso protegido por lock (reruns do Streamlit e
+#   jobs em background compartilham o mesmo processo).
+# - ESTATÍSTICAS: Acertos, faltas e taxa de acerto para diagnóstico.
+# - MÉTRICAS: Todas as instâncias vivas aparecem no endpoint /metrics
+#   (acertos, faltas e entradas por nome de cache).
+# ===================================================================
+
+import weakref
+import threading
+from collections import OrderedDict
+
+import metricas
+
+_AUSENTE = object()
+_instancias = weakref.WeakSet()
+
+
+class CacheLRU:
+    """Dicionário limitado com descarte do item menos recentemente usado."""
+
+    def __init__(self, max_entradas=32, nome="cache"):
+        self.max_entradas = max_entradas
+        self.nome = nome
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        _instancias.add(self)
+
+    def obter(self, chave, padrao=None):
+        """Retorna o valor da chave (marcando-o como recente) ou `padrao`."""
+        with self._lock:
+            valor = self._itens.get(chave, _AUSENTE)
+            if valor is _AUSENTE:
+                self.faltas += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def contem(self, chave):
+        """Verifica a presença da chave sem alterar a ordem nem as estatísticas."""
+        with self._lock:
+            return chave in self._itens
+
+    def guardar(self, chave, valor):
+        """Armazena o valor, descartando os itens mais antigos acima do limite."""
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_entradas:
+                self._itens.popitem(last=False)
+
+    def obter_ou_gerar(self, chave, gerar):
+        """
+        Retorna o valor em cache ou chama `gerar()` e armazena o resultado.
+        A geração ocorre fora do lock; em disputa, o último resultado prevalece.
+        """
+        valor = self.obter(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = gerar()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "nome": self.nome,
+                "entradas": len(self._itens),
+                "max_entradas": self.max_entradas,
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": (self.acertos / total) if total else 0.0,
+            }
+
+
+def _coletar_metricas():
+    # Instâncias com o mesmo nome (ex: um classificador por análise) são somadas
+    por_nome = {}
+    for cache in list(_instancias):
+        estatisticas = cache.estatisticas()
+        soma = por_nome.setdefault(estatisticas["nome"], {"acertos": 0, "faltas": 0, "entradas": 0})
+        for campo in soma:
+            soma[campo] += estatisticas[campo]
+    return [
+        ("cache_consultas_total", "counter", "Consultas aos caches em memória por resultado",
+         [({"cache": nome, "resultado": "acerto"}, soma["acertos"]) for nome, soma in por_nome.items()]
+         + [({"cache": nome, "resultado": "falta"}, soma["faltas"]) for nome, soma in por_nome.items()]),
+        ("cache_entradas", "gauge", "Entradas armazenadas em cada cache em memória",
+         [({"cache": nome}, soma["entradas"]) for nome, soma in por_nome.items()]),
+    ]
+
+
+metricas.registrar_coletor("cache_lru", _coletar_metricas)
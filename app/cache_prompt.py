@@ -0,0 +1,145 @@
+# ===================================================================
+# app/cache_prompt.py (REUTILIZAÇÃO DO PREFIXO ESTÁTICO DO PROMPT)
+#
+# Funcionalidades:
+# - CACHE NO SERVIDOR: Registra o `PROMPT_EXTRACAO` uma única vez por
+#   execução como conteúdo em cache do Gemini (`CachedContent`). Cada
+#   requisição passa a enviar apenas o texto do chunk.
+# - FALLBACK LOCAL: Quando o cache do servidor não está disponível
+#   (modelo sem suporte, prompt abaixo do mínimo de tokens, SDK antigo),
+#   o prefixo é montado uma única vez e concatenado a cada chunk, como
+#   antes, mas o módulo mede quantos bytes e tokens do prefixo estático
+#   são reenviados — isto é, quanto o cache economizaria.
+# - ESTATÍSTICAS: `estatisticas()` devolve o modo usado e a economia
+#   (real ou potencial) em bytes e tokens.
+# ===================================================================
+
+import os
+import datetime
+import google.generativeai as genai
+
+# Heurística usada quando a contagem de tokens da API não está disponível
+# (~4 caracteres por token para textos em português).
+BYTES_POR_TOKEN_ESTIMADO = 4
+
+
+class CachePromptExtracao:
+    """
+    Mantém o prefixo estático do prompt de extração registrado uma vez por
+    execução e monta o conteúdo de cada requisição a partir dele.
+    """
+
+    def __init__(self, prompt_estatico, modelo, generation_config=None, ttl_minutos=60):
+        self.prompt_estatico = prompt_estatico.strip()
+        self.prefixo_local = self.prompt_estatico + "\n"
+        self.modelo = modelo
+        self.generation_config = generation_config
+        self.ttl_minutos = ttl_minutos
+
+        self.modo = "local"
+        self.conteudo_cacheado = None
+        self.modelo_cacheado = None
+
+        self.bytes_prefixo = len(self.prefixo_local.encode("utf-8"))
+        self.tokens_prefixo = None
+        self.tokens_estimados = True
+        self.requisicoes = 0
+        self.bytes_enviados = 0
+
+    def iniciar(self):
+        """
+        Tenta registrar o prompt estático como conteúdo em cache no servidor.
+        Em caso de falha, mantém o modo local (prefixo concatenado a cada chunk).
+        """
+        self._contar_tokens_prefixo()
+
+        if os.getenv("GEMINI_CACHE_PROMPT", "1") == "0":
+            print("ℹ️ Cache de prompt desativado por GEMINI_CACHE_PROMPT=0. Usando prefixo local.")
+            return self
+
+        try:
+            from google.generativeai import caching
+
+            self.conteudo_cacheado = caching.CachedContent.create(
+                model=self.modelo,
+                display_name="prompt_extracao_pjecalc",
+                system_instruction=self.prompt_estatico,
+                ttl=datetime.timedelta(minutes=self.ttl_minutos),
+            )
+            self.modelo_cacheado = genai.GenerativeModel.from_cached_content(
+                cached_content=self.conteudo_cacheado,
+                generation_config=self.generation_config,
+            )
+            self.modo = "cache_servidor"
+            print(f"✅ Prompt de extração registrado em cache no servidor ({self.bytes_prefixo} bytes).")
+        except Exception as e:
+            self.conteudo_cacheado = None
+            self.modelo_cacheado = None
+            self.modo = "local"
+            print(f"⚠️ Cache de prompt no servidor indisponível ({e}). Usando prefixo local.")
+
+        return self
+
+    def _contar_tokens_prefixo(self):
+        """Conta os tokens do prefixo uma única vez (API ou estimativa)."""
+        try:
+            contagem = genai.GenerativeModel(self.modelo).count_tokens(self.prefixo_local)
+            self.tokens_prefixo = int(contagem.total_tokens)
+            self.tokens_estimados = False
+        except Exception:
+            self.tokens_prefixo = max(1, self.bytes_prefixo // BYTES_POR_TOKEN_ESTIMADO)
+            self.tokens_estimados = True
+
+    def preparar(self, chunk):
+        """
+        Retorna `(modelo, conteudo)` para a requisição de um chunk.
+        `modelo` é None no modo local (o chamador usa o modelo padrão).
+        """
+        texto_chunk = chunk.strip()
+        self.requisicoes += 1
+
+        if self.modelo_cacheado is not None:
+            conteudo = texto_chunk
+            self.bytes_enviados += len(conteudo.encode("utf-8"))
+            return self.modelo_cacheado, conteudo
+
+        conteudo = self.prefixo_local + texto_chunk
+        self.bytes_enviados += len(conteudo.encode("utf-8"))
+        return None, conteudo
+
+    def estatisticas(self):
+        """
+        Resumo da reutilização do prefixo. No modo local, os campos de
+        economia indicam o que o cache no servidor deixaria de enviar.
+        """
+        # O prefixo precisa ser enviado ao menos uma vez (registro do cache).
+        reenvios = max(self.requisicoes - 1, 0)
+        return {
+            "modo": self.modo,
+            "requisicoes": self.requisicoes,
+            "bytes_prefixo": self.bytes_prefixo,
+            "tokens_prefixo": self.tokens_prefixo,
+            "tokens_estimados": self.tokens_estimados,
+            "bytes_enviados": self.bytes_enviados,
+            "economia_bytes": reenvios * self.bytes_prefixo,
+            "economia_tokens": reenvios * (self.tokens_prefixo or 0),
+            "economia_efetiva": self.modo == "cache_servidor",
+        }
+
+    def encerrar(self):
+        """Remove o conteúdo em cache do servidor, se houver."""
+        if self.conteudo_cacheado is not None:
+            try:
+                self.conteudo_cacheado.delete()
+            except Exception as e:
+                print(f"⚠️ Não foi possível remover o cache de prompt do servidor: {e}")
+        self.conteudo_cacheado = None
+        self.modelo_cacheado = None
+
+        stats = self.estatisticas()
+        rotulo = "economizados" if stats["economia_efetiva"] else "economizáveis com cache"
+        print(
+            f"📦 Prompt de extração ({stats['modo']}): {stats['requisicoes']} requisições, "
+            f"{stats['economia_bytes']} bytes / {stats['economia_tokens']} tokens {rotulo}."
+        )
+        return stats
@@ -0,0 +1,675 @@
+# ===================================================================
+# app/calculo_verbas.py (MOTOR DE CÁLCULO DAS VERBAS RESCISÓRIAS)
+#
+# Funcionalidades:
+# - LINHA DO TEMPO MENSAL: O contrato vira vetores NumPy por competência
+#   (dias no contrato, dias afastados, dias trabalhados, salário vigente,
+#   remuneração e FGTS), montados de uma vez mesmo para contratos de décadas.
+# - AVOS: 13º por ano civil e férias por período aquisitivo (mês com 15
+#   dias ou mais trabalhados), com a projeção do aviso prévio indenizado.
+# - VERBAS: Saldo de salário, aviso prévio proporcional (Lei 12.506/2011),
+#   13º proporcional, férias vencidas/proporcionais + 1/3, FGTS + 40% e
+#   multas dos arts. 477 e 467 da CLT, conforme o tipo de rescisão.
+# - ARREDONDAMENTO EXATO: Valores em centavos (int64) e divisões com
+#   arredondamento "half up" em inteiros: mesmo resultado do Decimal
+#   com ROUND_HALF_UP, sem ponto flutuante.
+# - MEMÓRIA DE CÁLCULO: Cada verba traz a fórmula com os valores usados,
+#   e a linha do tempo pode ser exportada competência a competência.
+# ===================================================================
+
+import re
+import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import numpy as np
+from normalizacao import normalizar_texto
+
+# Rescisões reconhecidas (as demais descrições caem em "sem_justa_causa")
+TIPOS_RESCISAO = ("sem_justa_causa", "rescisao_indireta", "pedido_demissao", "justa_causa")
+
+# Mês que conta como avo (Lei 4.090/62, art. 1º, §2º; CLT, art. 146, parágrafo único)
+DIAS_MINIMOS_AVO = 15
+
+# Afastamento previdenciário acima disto no período aquisitivo faz perder as férias (CLT, art. 133, IV)
+DIAS_MAXIMOS_AFASTAMENTO_FERIAS = 180
+
+ALIQUOTA_FGTS = 8
+MULTA_FGTS = 40
+DIAS_AVISO_BASE = 30
+DIAS_AVISO_POR_ANO = 3
+DIAS_AVISO_MAXIMO = 90
+
+# Afastamentos em que os depósitos do FGTS continuam devidos (Lei 8.036/90, art. 15, §5º)
+_PADRAO_MANTEM_FGTS = re.compile(r"acidente|b\s*-?\s*91|militar")
+_PADRAO_DATA = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+# Pleitos derivados de outra parcela (reflexos, diferenças, repercussões, projeções,
+# integrações, incidências): não recebem o valor da principal
+_PADRAO_PARCELA_DERIVADA = re.compile(
+    r"\breflexos?\b|\breflet\w*|\bdiferencas?\b|\bincidencias?\b|\brepercuss\w*|\bprojec\w*|"
+    r"\bintegra(?:cao|coes|r|m|ndo|da|do|das|dos)?\b"
+)
+# Pleito que aponta uma segunda verba ("... sobre o aviso", "... no 13º", "... nas férias",
+# "... no FGTS") também é derivado, exceto nas multas e no terço ("multa de 40% sobre o FGTS")
+_PADRAO_SEGUNDA_VERBA = re.compile(
+    r"\bsobre\b|\b(?:no|na|nos|nas|em)\s+(?:(?:o|a|os|as)\s+)?"
+    r"(?:13|decimo|gratificac|ferias|fgts|aviso|multa|dsr|repouso|verbas?)"
+)
+_PADRAO_BASE_EXPLICITA = re.compile(r"(multa|1/3|terco)\b")
+# Pleito só do acessório (o terço ou a multa de 40%); os demais que citam o acessório
+# somam as duas partes ("férias + 1/3", "acrescidas de 1/3", "FGTS + 40%")
+_PADRAO_SO_ACESSORIO = re.compile(r"(1/3|terco|adicional de ferias|multa|indenizacao de 40|40\s*%)")
+
+
+# --- CONVERSÕES ---
+
+def converter_data(valor):
+    """Converte date/datetime, "dd/mm/aaaa" ou "aaaa-mm-dd" em `datetime.date` (None se inválido)."""
+    if isinstance(valor, datetime.datetime):
+        return valor.date()
+    if isinstance(valor, datetime.date):
+        return valor
+    if not isinstance(valor, str) or not valor.strip():
+        return None
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(valor.strip(), formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def converter_centavos(valor):
+    """
+    Converte um valor monetário (número, Decimal ou texto como "R$ 1.518,00")
+    em centavos inteiros, arredondando meio centavo para cima. None se inválido.
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        if isinstance(valor, str):
+            texto = valor.replace("R$", "").replace(" ", "").strip()
+            if "," in texto:
+                texto = texto.replace(".", "").replace(",", ".")
+            elif re.fullmatch(r"\d{1,3}(\.\d{3})+", texto):
+                texto = texto.replace(".", "")
+            decimal = Decimal(texto)
+        else:
+            decimal = Decimal(str(valor))
+    except (InvalidOperation, ValueError):
+        return None
+    if not decimal.is_finite():
+        return None
+    return int((decimal * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def centavos_para_decimal(centavos):
+    return (Decimal(int(centavos)) / 100).quantize(Decimal("0.01"))
+
+
+def formatar_brl(centavos):
+    """Centavos -> "R$ 1.518,00"."""
+    return f"R$ {centavos_para_decimal(centavos):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _dividir(numerador, divisor):
+    """Divisão com arredondamento half up para valores não negativos (int ou arrays int64)."""
+    return (2 * numerador + divisor) // (2 * divisor)
+
+
+def _percentual(centavos, percentual):
+    return _dividir(centavos * percentual, 100)
+
+
+def _sobreposicao(inicios, fins, inicio, fim):
+    """Dias de [inicio, fim) dentro de cada intervalo [inicios, fins) (vetorizado)."""
+    dias = (np.minimum(fins, fim) - np.maximum(inicios, inicio)).astype(np.int64)
+    return np.maximum(dias, 0)
+
+
+def _unir_intervalos(intervalos):
+    """Une intervalos [inicio, fim) sobrepostos (evita contar o mesmo dia duas vezes)."""
+    unidos = []
+    for inicio, fim in sorted(intervalos):
+        if unidos and inicio <= unidos[-1][1]:
+            unidos[-1][1] = max(unidos[-1][1], fim)
+        else:
+            unidos.append([inicio, fim])
+    return unidos
+
+
+def converter_afastamentos(valor, motivos=None):
+    """
+    Lista de afastamentos `{"inicio", "fim", "motivo"}` a partir de uma lista
+    de dicionários ou do texto "dd/mm/aaaa a dd/mm/aaaa; ..." usado na interface.
+    """
+    if not valor:
+        return []
+    if isinstance(valor, str):
+        lista_motivos = (motivos or "").split(";") if isinstance(motivos, str) else []
+        afastamentos = []
+        for indice, trecho in enumerate(valor.split(";")):
+            datas = _PADRAO_DATA.findall(trecho)
+            if len(datas) >= 2:
+                afastamentos.append({
+                    "inicio": "/".join(datas[0]),
+                    "fim": "/".join(datas[1]),
+                    "motivo": lista_motivos[indice].strip() if indice < len(lista_motivos) else "",
+                })
+        return afastamentos
+    return [a for a in valor if isinstance(a, dict)]
+
+
+def identificar_tipo_rescisao(descricao):
+    """Tipo de rescisão (um de TIPOS_RESCISAO) a partir da descrição livre."""
+    texto = normalizar_texto(descricao or "")
+    if "indireta" in texto:
+        return "rescisao_indireta"
+    if "pedido" in texto or "demissao a pedido" in texto:
+        return "pedido_demissao"
+    if "justa causa" in texto and "sem justa causa" not in texto:
+        return "justa_causa"
+    return "sem_justa_causa"
+
+
+# --- LINHA DO TEMPO ---
+
+class LinhaDoTempoContrato:
+    """
+    Vetores mensais do contrato, da competência da admissão até a do fim
+    projetado (demissão + aviso prévio indenizado). Datas em datetime64[D],
+    valores em centavos (int64).
+    """
+
+    def __init__(self, admissao, demissao, salarios, afastamentos=(), fim_projetado=None):
+        if demissao < admissao:
+            raise ValueError(f"Data de demissão ({demissao:%d/%m/%Y}) anterior à admissão ({admissao:%d/%m/%Y}).")
+        self.admissao = admissao
+        self.demissao = demissao
+        self.fim_projetado = max(fim_projetado or demissao, demissao)
+
+        inicio_contrato = np.datetime64(admissao, "D")
+        fim_contrato = np.datetime64(demissao, "D") + 1
+        fim_projecao = np.datetime64(self.fim_projetado, "D") + 1
+
+        self.competencias = np.arange(np.datetime64(admissao, "M"), np.datetime64(self.fim_projetado, "M") + 1)
+        inicios = self.competencias.astype("datetime64[D]")
+        fins = (self.competencias + 1).astype("datetime64[D]")
+        self.dias_mes = (fins - inicios).astype(np.int64)
+        self.anos = self.competencias.astype("datetime64[Y]").astype(np.int64) + 1970
+
+        # Afastamentos unidos (todos) e só os que mantêm os depósitos do FGTS
+        todos, com_fgts = [], []
+        for afastamento in afastamentos:
+            inicio = converter_data(afastamento.get("inicio"))
+            fim = converter_data(afastamento.get("fim"))
+            if not inicio or not fim or fim < inicio:
+                continue
+            intervalo = (np.datetime64(inicio, "D"), np.datetime64(fim, "D") + 1)
+            todos.append(intervalo)
+            if _PADRAO_MANTEM_FGTS.search(normalizar_texto(afastamento.get("motivo", ""))):
+                com_fgts.append(intervalo)
+        self.afastamentos = _unir_intervalos(todos)
+        self._afastamentos_com_fgts = _unir_intervalos(com_fgts)
+
+        self.dias_contrato = _sobreposicao(inicios, fins, inicio_contrato, fim_contrato)
+        self.dias_projetados = _sobreposicao(inicios, fins, inicio_contrato, fim_projecao)
+        self.dias_afastados = self._dias_afastados(inicios, fins, self.afastamentos, inicio_contrato, fim_contrato)
+        dias_afastados_projecao = self._dias_afastados(inicios, fins, self.afastamentos, inicio_contrato, fim_projecao)
+        dias_com_fgts = self._dias_afastados(inicios, fins, self._afastamentos_com_fgts, inicio_contrato, fim_contrato)
+
+        self.dias_trabalhados = self.dias_contrato - self.dias_afastados
+        self.dias_trabalhados_projecao = self.dias_projetados - dias_afastados_projecao
+        dias_base_fgts = self.dias_trabalhados + dias_com_fgts
+
+        # Salário vigente em cada competência (alterações valem a partir do mês da vigência)
+        vigencias = sorted(salarios)
+        meses_vigencia = np.array([np.datetime64(data, "M") for data, _ in vigencias])
+        valores = np.array([valor for _, valor in vigencias], dtype=np.int64)
+        indices = np.maximum(np.searchsorted(meses_vigencia, self.competencias, side="right") - 1, 0)
+        self.salario = valores[indices]
+
+        self.remuneracao = self._proporcional(self.salario, self.dias_trabalhados)
+        self.base_fgts = self._proporcional(self.salario, dias_base_fgts)
+        self.fgts = _percentual(self.base_fgts, ALIQUOTA_FGTS)
+
+    @staticmethod
+    def _dias_afastados(inicios, fins, afastamentos, inicio, fim):
+        dias = np.zeros(len(inicios), dtype=np.int64)
+        for inicio_af, fim_af in afastamentos:
+            dias += _sobreposicao(inicios, fins, max(inicio_af, inicio), min(fim_af, fim))
+        return dias
+
+    def _proporcional(self, salario, dias):
+        """Mês integral = salário cheio; mês parcial = salário ÷ 30 × dias (mês comercial)."""
+        parcial = _dividir(salario * np.minimum(dias, 30), 30)
+        return np.where(dias >= self.dias_mes, salario, parcial)
+
+    def avos_13_por_ano(self):
+        """{ano: (avos, salário do último mês do ano na projeção)} do 13º salário."""
+        conta = (self.dias_trabalhados_projecao >= DIAS_MINIMOS_AVO).astype(np.int64)
+        anos, primeiros = np.unique(self.anos, return_index=True)
+        avos = np.add.reduceat(conta, primeiros)
+        ultimos = np.append(primeiros[1:], len(self.anos)) - 1
+        return {int(ano): (int(a), int(self.salario[u])) for ano, a, u in zip(anos, avos, ultimos)}
+
+    def _meses_aquisitivos(self):
+        """
+        "Meses" aquisitivos (admissão + k meses, dia limitado ao fim do mês):
+        inícios, dias afastados e avos de cada um, e o índice do mês que
+        contém o fim projetado.
+        """
+        quantidade = len(self.competencias) + 13
+        meses = np.datetime64(self.admissao, "M") + np.arange(quantidade + 1)
+        primeiros = meses.astype("datetime64[D]")
+        dias_no_mes = ((meses + 1).astype("datetime64[D]") - primeiros).astype(np.int64)
+        limites = primeiros + (np.minimum(self.admissao.day, dias_no_mes) - 1)
+        inicios, fins = limites[:-1], limites[1:]
+
+        inicio_contrato = np.datetime64(self.admissao, "D")
+        fim_projecao = np.datetime64(self.fim_projetado, "D") + 1
+        dias = _sobreposicao(inicios, fins, inicio_contrato, fim_projecao)
+        afastados = self._dias_afastados(inicios, fins, self.afastamentos, inicio_contrato, fim_projecao)
+        avos = ((dias - afastados) >= DIAS_MINIMOS_AVO).astype(np.int64)
+        ultimo_mes = int(np.searchsorted(inicios, fim_projecao, side="left")) - 1
+        return inicios, afastados, avos, ultimo_mes
+
+    def ferias_periodo_atual(self):
+        """
+        Período aquisitivo em curso no fim projetado: (início, fim, avos,
+        períodos completos anteriores, dias afastados no período).
+        """
+        inicios, afastados, avos, ultimo_mes = self._meses_aquisitivos()
+        periodo = ultimo_mes // 12
+        faixa = slice(periodo * 12, periodo * 12 + 12)
+        inicio_periodo = inicios[periodo * 12].astype(datetime.date)
+        fim_periodo = (inicios[periodo * 12 + 12] - 1).astype(datetime.date)
+        return inicio_periodo, fim_periodo, int(avos[faixa].sum()), periodo, int(afastados[faixa].sum())
+
+    def ferias_periodo_projetado(self):
+        """
+        Período aquisitivo completado depois da demissão, dentro da projeção do
+        aviso prévio: (início, fim, dias afastados no período), ou None.
+        """
+        inicios, afastados, _, ultimo_mes = self._meses_aquisitivos()
+        periodo = ultimo_mes // 12 - 1
+        if periodo < 0:
+            return None
+        fim_periodo = (inicios[periodo * 12 + 12] - 1).astype(datetime.date)
+        if fim_periodo <= self.demissao:
+            return None
+        faixa = slice(periodo * 12, periodo * 12 + 12)
+        return inicios[periodo * 12].astype(datetime.date), fim_periodo, int(afastados[faixa].sum())
+
+    def indice_competencia(self, data):
+        return int(np.datetime64(data, "M") - self.competencias[0])
+
+    def tabela(self):
+        """Linha do tempo competência a competência (para exibição e conferência)."""
+        return [
+            {
+                "competencia": f"{str(competencia)[5:7]}/{str(competencia)[:4]}",
+                "dias_trabalhados": int(trabalhados),
+                "dias_afastados": int(afastados),
+                "salario": formatar_brl(salario),
+                "remuneracao": formatar_brl(remuneracao),
+                "fgts": formatar_brl(fgts),
+            }
+            for competencia, trabalhados, afastados, salario, remuneracao, fgts, contrato in zip(
+                self.competencias, self.dias_trabalhados, self.dias_afastados,
+                self.salario, self.remuneracao, self.fgts, self.dias_contrato,
+            )
+            if contrato
+        ]
+
+
+# --- CÁLCULO DAS VERBAS ---
+
+def _item(chave, verba, centavos, base, periodo, quantidade, memoria):
+    return {
+        "chave": chave,
+        "verba": verba,
+        "centavos": int(centavos),
+        "valor": centavos_para_decimal(centavos),
+        "valor_formatado": formatar_brl(centavos),
+        "base_formatada": formatar_brl(base),
+        "periodo": periodo,
+        "quantidade": quantidade,
+        "memoria": memoria,
+    }
+
+
+def _normalizar_salarios(salario):
+    """Salário único ou lista de {"inicio", "valor"} -> [(date, centavos)] ordenada."""
+    if isinstance(salario, (list, tuple)):
+        vigencias = []
+        for item in salario:
+            inicio = converter_data(item.get("inicio")) if isinstance(item, dict) else None
+            valor = converter_centavos(item.get("valor")) if isinstance(item, dict) else None
+            if inicio and valor is not None:
+                vigencias.append((inicio, valor))
+        return sorted(vigencias)
+    valor = converter_centavos(salario)
+    return [(datetime.date.min, valor)] if valor is not None else []
+
+
+def calcular_verbas_rescisorias(admissao, demissao, salario, afastamentos=(), tipo_rescisao="sem_justa_causa",
+                                aviso_indenizado=True, ferias_vencidas=0, ferias_vencidas_em_dobro=0,
+                                fgts_depositado=None, multa_477=False, multa_467=False):
+    """
+    Calcula as verbas rescisórias de um contrato.
+
+    Args:
+        admissao, demissao: Datas (date ou "dd/mm/aaaa")
+        salario: Último salário, ou lista de {"inicio", "valor"} com a evolução salarial
+        afastamentos: Lista de {"inicio", "fim", "motivo"}
+        tipo_rescisao: Um de TIPOS_RESCISAO
+        aviso_indenizado: Se o aviso prévio é indenizado (projeta o contrato)
+        ferias_vencidas: Períodos aquisitivos completos até a demissão, não gozados nem pagos
+            (o período completado na projeção do aviso é somado automaticamente)
+        ferias_vencidas_em_dobro: Quantos desses já passaram do período concessivo (CLT, art. 137)
+        fgts_depositado: Total já depositado na conta vinculada; None (padrão) ou valor
+            ilegível quando desconhecido: o FGTS fica "a apurar" e fora do total
+        multa_477, multa_467: Incluir as multas dos arts. 477, §8º e 467 da CLT
+
+    Returns:
+        Dict com "verbas" (valor Decimal, valor formatado e memória de cálculo
+        de cada uma), "total", "linha_do_tempo" e os parâmetros usados.
+    """
+    data_admissao, data_demissao = converter_data(admissao), converter_data(demissao)
+    if not data_admissao or not data_demissao:
+        raise ValueError(f"Datas do contrato inválidas: {admissao!r} a {demissao!r}.")
+    vigencias = _normalizar_salarios(salario)
+    if not vigencias:
+        raise ValueError(f"Salário inválido: {salario!r}.")
+    if tipo_rescisao not in TIPOS_RESCISAO:
+        tipo_rescisao = identificar_tipo_rescisao(tipo_rescisao)
+
+    dispensa = tipo_rescisao in ("sem_justa_causa", "rescisao_indireta")
+    anos_completos = _anos_completos(data_admissao, data_demissao)
+    dias_aviso = min(DIAS_AVISO_BASE + DIAS_AVISO_POR_ANO * anos_completos, DIAS_AVISO_MAXIMO)
+    projeta_aviso = dispensa and aviso_indenizado
+    fim_projetado = data_demissao + datetime.timedelta(days=dias_aviso) if projeta_aviso else data_demissao
+
+    linha = LinhaDoTempoContrato(
+        data_admissao, data_demissao, vigencias, converter_afastamentos(afastamentos), fim_projetado
+    )
+    ultimo = linha.indice_competencia(data_demissao)
+    salario_final = int(linha.salario[ultimo])
+    salario_fmt = formatar_brl(salario_final)
+    verbas = []
+
+    # Saldo de salário: dias trabalhados no mês da demissão (mês comercial de 30 dias)
+    dias_saldo = int(linha.dias_trabalhados[ultimo])
+    saldo = int(linha.remuneracao[ultimo])
+    dias_exibidos = 30 if dias_saldo >= linha.dias_mes[ultimo] else min(dias_saldo, 30)
+    verbas.append(_item(
+        "saldo_salario", "Saldo de Salário", saldo, salario_final,
+        f"{dias_saldo} dias (mês com {int(linha.dias_mes[ultimo])} dias)", f"{dias_saldo} dias",
+        f"{salario_fmt} ÷ 30 × {dias_exibidos} dias = {formatar_brl(saldo)}",
+    ))
+
+    # Aviso prévio proporcional (Lei 12.506/2011): 30 dias + 3 por ano completo, até 90
+    aviso = 0
+    if projeta_aviso:
+        aviso = _dividir(salario_final * dias_aviso, 30)
+        verbas.append(_item(
+            "aviso_previo", "Aviso Prévio Indenizado", aviso, salario_final,
+            f"30 dias + {dias_aviso - DIAS_AVISO_BASE} dias (proporcional a {anos_completos} anos)", f"{dias_aviso} dias",
+            f"{salario_fmt} ÷ 30 × {dias_aviso} dias = {formatar_brl(aviso)} "
+            f"(projeção até {fim_projetado:%d/%m/%Y})",
+        ))
+
+    # 13º salário: anos civis da demissão (e da projeção do aviso), por avos
+    decimos = 0
+    avos_por_ano = linha.avos_13_por_ano()
+    if tipo_rescisao != "justa_causa":
+        partes, avos_texto = [], []
+        for ano in range(data_demissao.year, fim_projetado.year + 1):
+            avos, salario_ano = avos_por_ano.get(ano, (0, salario_final))
+            valor = _dividir(salario_ano * avos, 12)
+            decimos += valor
+            partes.append(f"{ano}: {formatar_brl(salario_ano)} × {avos}/12 = {formatar_brl(valor)}")
+            avos_texto.append(f"{avos}/12")
+        verbas.append(_item(
+            "decimo_terceiro", "13º Salário Proporcional", decimos, salario_final,
+            " + ".join(f"{a} avos" for a in avos_texto), " + ".join(avos_texto), "; ".join(partes),
+        ))
+
+    # Férias vencidas (simples e em dobro) + 1/3, pelo último salário. O período aquisitivo
+    # completado dentro da projeção do aviso entra como mais um período simples (CLT, art. 487, §1º)
+    ferias = 0
+    projetado = linha.ferias_periodo_projetado() if tipo_rescisao != "justa_causa" else None
+    if projetado and projetado[2] > DIAS_MAXIMOS_AFASTAMENTO_FERIAS:
+        projetado = None
+    periodos_vencidos = ferias_vencidas + (1 if projetado else 0)
+    if periodos_vencidos:
+        em_dobro = min(ferias_vencidas_em_dobro, ferias_vencidas)
+        simples = periodos_vencidos - em_dobro
+        valor_vencidas = salario_final * (simples + 2 * em_dobro)
+        terco_vencidas = _dividir(valor_vencidas, 3)
+        ferias += valor_vencidas + terco_vencidas
+        observacao = (
+            f" (inclui o período {projetado[0]:%d/%m/%Y} a {projetado[1]:%d/%m/%Y}, completado na projeção do aviso)"
+            if projetado else ""
+        )
+        verbas.append(_item(
+            "ferias_vencidas", "Férias Vencidas", valor_vencidas, salario_final,
+            f"{periodos_vencidos} período(s) de 30 dias" + (f" ({em_dobro} em dobro)" if em_dobro else ""),
+            f"{periodos_vencidos * 30} dias",
+            f"{salario_fmt} × ({simples} simples + 2 × {em_dobro} em dobro) = {formatar_brl(valor_vencidas)}{observacao}",
+        ))
+        verbas.append(_item(
+            "terco_ferias_vencidas", "1/3 sobre Férias Vencidas", terco_vencidas, valor_vencidas,
+            "Integra as Férias Vencidas", "1/3",
+            f"{formatar_brl(valor_vencidas)} ÷ 3 = {formatar_brl(terco_vencidas)}",
+        ))
+
+    # Férias proporcionais + 1/3 do período aquisitivo em curso (não devidas na justa causa)
+    inicio_periodo, fim_periodo, avos_ferias, periodos_completos, afastados_periodo = linha.ferias_periodo_atual()
+    if tipo_rescisao != "justa_causa":
+        observacao = ""
+        if afastados_periodo > DIAS_MAXIMOS_AFASTAMENTO_FERIAS:
+            observacao = f" (sem direito: {afastados_periodo} dias de afastamento no período, CLT art. 133, IV)"
+            avos_ferias = 0
+        valor_proporcionais = _dividir(salario_final * avos_ferias, 12)
+        terco_proporcionais = _dividir(valor_proporcionais, 3)
+        ferias += valor_proporcionais + terco_proporcionais
+        periodo_texto = f"período aquisitivo {inicio_periodo:%d/%m/%Y} a {fim_periodo:%d/%m/%Y}"
+        verbas.append(_item(
+            "ferias_proporcionais", "Férias Proporcionais", valor_proporcionais, salario_final,
+            f"{avos_ferias}/12 avos + 1/3", f"{avos_ferias}/12",
+            f"{salario_fmt} × {avos_ferias}/12 = {formatar_brl(valor_proporcionais)} ({periodo_texto}){observacao}",
+        ))
+        verbas.append(_item(
+            "terco_ferias_proporcionais", "1/3 sobre Férias Proporcionais", terco_proporcionais, valor_proporcionais,
+            f"{avos_ferias}/12 avos", f"{avos_ferias}/12",
+            f"{formatar_brl(valor_proporcionais)} ÷ 3 = {formatar_brl(terco_proporcionais)}",
+        ))
+
+    # FGTS: 8% sobre as remunerações mensais, os 13º de cada ano e o aviso indenizado (Súmula 305 do TST)
+    base_mensal = int(linha.base_fgts.sum())
+    fgts_mensal = int(linha.fgts.sum())
+    fgts_13 = sum(
+        _percentual(_dividir(salario_ano * avos, 12) if ano < data_demissao.year else 0, ALIQUOTA_FGTS)
+        for ano, (avos, salario_ano) in avos_por_ano.items()
+    ) + _percentual(decimos, ALIQUOTA_FGTS)
+    fgts_aviso = _percentual(aviso, ALIQUOTA_FGTS)
+    fgts_devido = fgts_mensal + fgts_13 + fgts_aviso
+    depositado = converter_centavos(fgts_depositado)
+    memoria_fgts = (
+        f"{ALIQUOTA_FGTS}% × {formatar_brl(base_mensal)} (remunerações) = {formatar_brl(fgts_mensal)}; "
+        f"sobre 13º = {formatar_brl(fgts_13)}; sobre aviso = {formatar_brl(fgts_aviso)}; "
+    )
+    if depositado is None:
+        # Sem o extrato da conta vinculada não há como saber o que falta depositar
+        item_fgts = _item(
+            "fgts", "FGTS (depósitos não realizados)", 0, base_mensal,
+            f"{int((linha.dias_contrato > 0).sum())} competências + 13º + aviso", f"{ALIQUOTA_FGTS}%",
+            memoria_fgts + f"devido {formatar_brl(fgts_devido)} − depositado (a apurar pelo extrato da conta vinculada)",
+        )
+        item_fgts.update(valor=None, valor_formatado="A apurar", a_apurar=True)
+    else:
+        fgts_a_depositar = max(fgts_devido - depositado, 0)
+        item_fgts = _item(
+            "fgts", "FGTS (depósitos não realizados)", fgts_a_depositar, base_mensal,
+            f"{int((linha.dias_contrato > 0).sum())} competências + 13º + aviso", f"{ALIQUOTA_FGTS}%",
+            memoria_fgts + f"devido {formatar_brl(fgts_devido)} − depositado {formatar_brl(depositado)} "
+            f"= {formatar_brl(fgts_a_depositar)}",
+        )
+    verbas.append(item_fgts)
+
+    # Multa de 40% sobre todos os depósitos do contrato (dispensa sem justa causa ou rescisão indireta)
+    multa_fgts = 0
+    if dispensa:
+        multa_fgts = _percentual(fgts_devido, MULTA_FGTS)
+        verbas.append(_item(
+            "multa_fgts", "Multa de 40% do FGTS", multa_fgts, fgts_devido, "Sobre os depósitos do contrato", f"{MULTA_FGTS}%",
+            f"{MULTA_FGTS}% × {formatar_brl(fgts_devido)} = {formatar_brl(multa_fgts)}",
+        ))
+
+    if multa_477:
+        verbas.append(_item(
+            "multa_477", "Multa do art. 477 da CLT", salario_final, salario_final, "1 salário base", "1 salário",
+            f"1 × {salario_fmt} (art. 477, §8º da CLT) = {salario_fmt}",
+        ))
+
+    if multa_467:
+        incontroversas = saldo + aviso + decimos + ferias + multa_fgts
+        valor_467 = _percentual(incontroversas, 50)
+        verbas.append(_item(
+            "multa_467", "Multa do art. 467 da CLT", valor_467, incontroversas, "50% das verbas incontroversas", "50%",
+            f"50% × {formatar_brl(incontroversas)} (saldo, aviso, 13º, férias + 1/3 e multa do FGTS) "
+            f"= {formatar_brl(valor_467)}",
+        ))
+
+    total = sum(item["centavos"] for item in verbas)
+    return {
+        "verbas": verbas,
+        "total": centavos_para_decimal(total),
+        "total_formatado": formatar_brl(total),
+        "linha_do_tempo": linha,
+        "parametros": {
+            "admissao": data_admissao,
+            "demissao": data_demissao,
+            "fim_projetado": fim_projetado,
+            "tipo_rescisao": tipo_rescisao,
+            "salario_final": centavos_para_decimal(salario_final),
+            "anos_completos": anos_completos,
+            "dias_aviso": dias_aviso if projeta_aviso else 0,
+            "periodos_aquisitivos_completos": periodos_completos,
+            "fgts_depositado": None if depositado is None else centavos_para_decimal(depositado),
+        },
+    }
+
+
+def _anos_completos(inicio, fim):
+    anos = fim.year - inicio.year
+    if (fim.month, fim.day) < (inicio.month, inicio.day):
+        anos -= 1
+    return max(anos, 0)
+
+
+# --- INTEGRAÇÃO COM OS DADOS DO PROCESSO ---
+
+def calcular_verbas_processo(dados_processo):
+    """
+    Calcula as verbas a partir de `dados_processo` no formato da interface
+    (`dados_pessoais` com datas, último salário, afastamentos, tipo de
+    rescisão e FGTS já depositado, se conhecido). Retorna None quando faltam
+    datas ou salário.
+    """
+    dados_pessoais = (dados_processo or {}).get("dados_pessoais", {})
+    admissao = converter_data(dados_pessoais.get("data_admissao"))
+    demissao = converter_data(dados_pessoais.get("data_demissao"))
+    salario = dados_pessoais.get("ultimo_salario")
+    if not admissao or not demissao or not converter_centavos(salario) or demissao < admissao:
+        return None
+
+    nomes = [normalizar_texto(v.get("verba", "")) for v in dados_processo.get("verbas_pleiteadas", []) if isinstance(v, dict)]
+    return calcular_verbas_rescisorias(
+        admissao, demissao, salario,
+        fgts_depositado=dados_pessoais.get("fgts_depositado"),
+        afastamentos=converter_afastamentos(
+            dados_pessoais.get("periodo_afastamento"), dados_pessoais.get("motivo_afastamento")
+        ),
+        tipo_rescisao=identificar_tipo_rescisao(dados_pessoais.get("tipo_rescisao", "")),
+        multa_477=any("477" in nome for nome in nomes),
+        multa_467=any("467" in nome for nome in nomes),
+    )
+
+
+def _chaves_da_verba(nome):
+    """
+    Chaves do motor correspondentes a um nome de verba já normalizado, pela
+    categoria do classificador de verbas (analise_verbas): uma, ou duas quando
+    o pleito soma a verba ao seu terço ou à multa de 40%. None sem correspondência.
+    """
+    if _PADRAO_PARCELA_DERIVADA.search(nome):
+        return None
+    if _PADRAO_SEGUNDA_VERBA.search(nome) and not _PADRAO_BASE_EXPLICITA.match(nome):
+        return None
+
+    from analise_verbas import obter_registro_padroes
+    categoria = obter_registro_padroes().classificador.classificar(nome)
+    so_acessorio = bool(_PADRAO_SO_ACESSORIO.match(nome))
+    if categoria == "salario":
+        return ("saldo_salario",) if "saldo" in nome else None
+    if categoria == "ferias":
+        if "vencid" in nome:
+            principal, terco = "ferias_vencidas", "terco_ferias_vencidas"
+        elif "proporc" in nome:
+            principal, terco = "ferias_proporcionais", "terco_ferias_proporcionais"
+        else:
+            return None
+        if so_acessorio:
+            return (terco,)
+        menciona_terco = "1/3" in nome or "terco" in nome
+        return (principal, terco) if menciona_terco else (principal,)
+    if categoria == "13_salario":
+        return ("decimo_terceiro",)
+    if categoria in ("aviso_previo", "multa_477", "multa_467"):
+        return (categoria,)
+    if categoria == "fgts":
+        if so_acessorio:
+            return ("multa_fgts",)
+        menciona_multa = "40" in nome or "multa" in nome
+        return ("fgts", "multa_fgts") if menciona_multa else ("fgts",)
+    return None
+
+
+def _somar_itens(itens):
+    """Item único com a soma das partes de um pleito composto (ex: férias + 1/3)."""
+    a_apurar = any(item.get("a_apurar") for item in itens)
+    centavos = sum(item["centavos"] for item in itens)
+    soma = dict(
+        itens[0],
+        verba=" + ".join(item["verba"] for item in itens),
+        centavos=centavos,
+        valor=None if a_apurar else centavos_para_decimal(centavos),
+        valor_formatado=f"{formatar_brl(centavos)} + a apurar" if a_apurar else formatar_brl(centavos),
+        memoria="; ".join(item["memoria"] for item in itens),
+        componentes=list(itens),
+    )
+    if a_apurar:
+        soma["a_apurar"] = True
+    return soma
+
+
+def verba_calculada(resultado, nome_verba):
+    """
+    Item de `resultado["verbas"]` correspondente a um nome de verba livre (ou
+    None). Pleitos derivados (reflexos, diferenças, repercussões, projeções,
+    incidências ou uma verba aplicada sobre outra) não casam com a principal.
+    Pleitos compostos ("férias proporcionais + 1/3", "FGTS + 40%") recebem a
+    soma das partes; as partes ficam em `componentes`.
+    """
+    if not resultado:
+        return None
+    chaves = _chaves_da_verba(normalizar_texto(nome_verba))
+    if not chaves:
+        return None
+    por_chave = {item["chave"]: item for item in resultado["verbas"]}
+    itens = [por_chave[chave] for chave in chaves if chave in por_chave]
+    if not itens:
+        return None
+    return itens[0] if len(itens) == 1 else _somar_itens(itens)
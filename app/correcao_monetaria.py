@@ -0,0 +1,341 @@
+# ===================================================================
+# app/correcao_monetaria.py (CORREÇÃO MONETÁRIA E JUROS - ADC 58)
+#
+# Funcionalidades:
+# - TABELAS LOCAIS: Índices mensais (IPCA-E, SELIC, TR) lidos de CSVs em
+#   app/tabelas (formato do SGS do Banco Central: "data;valor") para
+#   vetores NumPy contínuos por competência, com somas e produtos
+#   acumulados pré-calculados. Recarregados quando o arquivo muda.
+# - FATORES EM LOTE: O fator de qualquer intervalo de competências é a
+#   razão (ou diferença) entre dois acumulados, então centenas de parcelas
+#   são corrigidas com poucas operações vetorizadas.
+# - ADC 58 (STF): Fase pré-judicial com IPCA-E (e os juros do art. 39,
+#   caput, da Lei 8.177/91 pela TR, quando a tabela existe) e fase
+#   judicial com a SELIC (correção e juros), a partir do ajuizamento.
+# - LINHA DO TEMPO: `corrigir_calculo` transforma o resultado do
+#   `calculo_verbas` em parcelas (FGTS mês a mês e verbas rescisórias na
+#   competência da demissão) e devolve os valores atualizados.
+# - ATUALIZAÇÃO: `python correcao_monetaria.py --atualizar` baixa as
+#   séries do SGS/BCB para app/tabelas.
+# ===================================================================
+
+import os
+import sys
+import datetime
+import threading
+import urllib.request
+import numpy as np
+from calculo_verbas import converter_data, formatar_brl
+
+DIR_TABELAS = os.getenv("CORRECAO_TABELAS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tabelas"))
+
+# Séries do SGS (Banco Central) usadas por cada tabela
+SERIES_SGS = {
+    "ipca_e": 10764,  # IPCA-E - variação mensal (%)
+    "selic": 4390,    # Taxa SELIC acumulada no mês (% a.m.)
+    "tr": 226,        # TR - primeiro dia do mês (% a.m.)
+}
+URL_SGS = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}/dados?formato=csv"
+
+# --- SINGLETON ---
+_tabelas = {}
+_lock_tabelas = threading.Lock()
+
+
+def _competencias(valores):
+    """Datas, textos "dd/mm/aaaa" ou datetime64 -> vetor datetime64[M]."""
+    if isinstance(valores, np.ndarray) and np.issubdtype(valores.dtype, np.datetime64):
+        return valores.astype("datetime64[M]")
+    return np.array([np.datetime64(converter_data(v) if isinstance(v, str) else v, "M") for v in valores])
+
+
+class TabelaIndice:
+    """
+    Série mensal contínua de taxas (fração ao mês) a partir de `inicio`.
+    Competências sem taxa ficam como NaN e invalidam os intervalos que as usam.
+    """
+
+    def __init__(self, nome, inicio, taxas):
+        self.nome = nome
+        self.inicio = np.datetime64(inicio, "M")
+        self.taxas = np.asarray(taxas, dtype=np.float64)
+        self.fim = self.inicio + len(self.taxas)  # primeira competência sem dados
+
+        validas = np.nan_to_num(self.taxas)
+        self._produtos = np.concatenate(([1.0], np.cumprod(1.0 + validas)))
+        self._somas = np.concatenate(([0.0], np.cumsum(validas)))
+        self._faltantes = np.concatenate(([0], np.cumsum(np.isnan(self.taxas))))
+
+    @classmethod
+    def de_percentuais(cls, nome, percentuais_por_competencia):
+        """Monta a tabela a partir de {datetime64[M]: percentual ao mês}."""
+        if not percentuais_por_competencia:
+            return cls(nome, np.datetime64("1970-01"), [])
+        inicio = min(percentuais_por_competencia)
+        taxas = np.full(int(max(percentuais_por_competencia) - inicio) + 1, np.nan)
+        for competencia, percentual in percentuais_por_competencia.items():
+            taxas[int(competencia - inicio)] = percentual / 100.0
+        return cls(nome, inicio, taxas)
+
+    def __len__(self):
+        return len(self.taxas)
+
+    def _indices(self, inicios, fins):
+        """Posições nos acumulados de cada intervalo [inicio, fim) de competências."""
+        inicios, fins = _competencias(inicios), _competencias(fins)
+        fins = np.maximum(fins, inicios)
+        vazios = fins == inicios
+        a = (inicios - self.inicio).astype(np.int64)
+        b = (fins - self.inicio).astype(np.int64)
+        fora = ~vazios & ((a < 0) | (b > len(self.taxas)))
+        a_seguro = np.clip(a, 0, len(self.taxas))
+        b_seguro = np.clip(b, 0, len(self.taxas))
+        faltando = ~vazios & (fora | (self._faltantes[b_seguro] - self._faltantes[a_seguro] > 0))
+        if faltando.any():
+            primeiro = int(np.argmax(faltando))
+            raise ValueError(
+                f"Tabela '{self.nome}' sem dados para o intervalo {inicios[primeiro]} a {fins[primeiro] - 1} "
+                f"(disponível: {self.inicio} a {self.fim - 1}, sem lacunas)."
+            )
+        return np.where(vazios, 0, a_seguro), np.where(vazios, 0, b_seguro)
+
+    def fator_composto(self, inicios, fins):
+        """Produto de (1 + taxa) nas competências [inicio, fim) de cada intervalo."""
+        a, b = self._indices(inicios, fins)
+        return self._produtos[b] / self._produtos[a]
+
+    def fator_simples(self, inicios, fins):
+        """1 + soma das taxas nas competências [inicio, fim) (SELIC acumulada simples)."""
+        a, b = self._indices(inicios, fins)
+        return 1.0 + (self._somas[b] - self._somas[a])
+
+
+def _ler_csv(caminho):
+    """Lê "data;valor" (SGS/BCB, com ou sem aspas, vírgula decimal). Séries diárias: usa o dia 1º."""
+    percentuais = {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            campos = [campo.strip().strip('"') for campo in linha.split(";")]
+            if len(campos) < 2:
+                continue
+            data = converter_data(campos[0]) or converter_data(f"{campos[0]}-01")
+            try:
+                valor = float(campos[1].replace(",", "."))
+            except ValueError:
+                continue  # cabeçalho
+            if data is None:
+                continue
+            competencia = np.datetime64(data, "M")
+            if data.day == 1 or competencia not in percentuais:
+                percentuais[competencia] = valor
+    return percentuais
+
+
+def carregar_tabela(nome, diretorio=None):
+    """Tabela `nome` (ipca_e, selic, tr) de `diretorio`/<nome>.csv, memorizada até o arquivo mudar."""
+    caminho = os.path.join(diretorio or DIR_TABELAS, f"{nome}.csv")
+    modificacao = os.path.getmtime(caminho)
+    em_cache = _tabelas.get(caminho)
+    if em_cache is not None and em_cache[0] == modificacao:
+        return em_cache[1]
+    with _lock_tabelas:
+        em_cache = _tabelas.get(caminho)
+        if em_cache is None or em_cache[0] != modificacao:
+            tabela = TabelaIndice.de_percentuais(nome, _ler_csv(caminho))
+            _tabelas[caminho] = (modificacao, tabela)
+            if len(tabela):
+                print(f"📈 Tabela '{nome}' carregada: {len(tabela)} competências ({tabela.inicio} a {tabela.fim - 1}).")
+            else:
+                print(f"⚠️ Tabela '{nome}' vazia em {caminho} (use --atualizar).")
+        return _tabelas[caminho][1]
+
+
+def carregar_tabelas(diretorio=None):
+    """{nome: TabelaIndice} das tabelas disponíveis (as ausentes ou vazias são omitidas)."""
+    tabelas = {}
+    for nome in SERIES_SGS:
+        try:
+            tabela = carregar_tabela(nome, diretorio)
+        except FileNotFoundError:
+            continue
+        if len(tabela):
+            tabelas[nome] = tabela
+    return tabelas
+
+
+# --- CORREÇÃO DAS PARCELAS ---
+
+class CorrecaoParcelas:
+    """
+    Resultado da atualização de um lote de parcelas (vetores alinhados por
+    parcela, valores em centavos) pelo regime da ADC 58.
+    """
+
+    def __init__(self, competencias, valores, fator_ipca, juros_pre, fator_selic, ajuizamento, liquidacao):
+        self.competencias = competencias
+        self.valores = valores
+        self.fator_ipca = fator_ipca
+        self.juros_pre = juros_pre
+        self.fator_selic = fator_selic
+        self.ajuizamento = ajuizamento
+        self.liquidacao = liquidacao
+
+        corrigido = valores * fator_ipca
+        self.corrigidos = np.floor(corrigido + 0.5).astype(np.int64)
+        self.juros_pre_judiciais = np.floor(corrigido * juros_pre + 0.5).astype(np.int64)
+        self.atualizados = np.floor((corrigido * (1.0 + juros_pre)) * fator_selic + 0.5).astype(np.int64)
+
+        self.total_original = int(valores.sum())
+        self.total_atualizado = int(self.atualizados.sum())
+
+    def tabela(self):
+        """Memória de cálculo parcela a parcela."""
+        return [
+            {
+                "competencia": f"{str(competencia)[5:7]}/{str(competencia)[:4]}",
+                "valor": formatar_brl(valor),
+                "fator_ipca_e": f"{ipca:.8f}",
+                "juros_pre_judiciais": formatar_brl(juros),
+                "fator_selic": f"{selic:.8f}",
+                "valor_atualizado": formatar_brl(atualizado),
+            }
+            for competencia, valor, ipca, juros, selic, atualizado in zip(
+                self.competencias, self.valores, self.fator_ipca,
+                self.juros_pre_judiciais, self.fator_selic, self.atualizados,
+            )
+        ]
+
+    def resumo(self):
+        return (
+            f"ADC 58: IPCA-E até {self.ajuizamento:%m/%Y} (ajuizamento) e SELIC até {self.liquidacao:%m/%Y}; "
+            f"{len(self.valores)} parcelas, {formatar_brl(self.total_original)} → {formatar_brl(self.total_atualizado)}"
+        )
+
+
+def corrigir_parcelas(competencias, valores, ajuizamento, liquidacao, tabelas=None, juros_pre_judiciais=True):
+    """
+    Atualiza parcelas pelo regime da ADC 58 (STF).
+
+    Cada parcela vence no mês seguinte à competência (Súmula 381 do TST).
+    - Fase pré-judicial: IPCA-E do vencimento até o mês anterior ao ajuizamento,
+      mais os juros da TR acumulada (art. 39, caput, da Lei 8.177/91) quando a
+      tabela "tr" existe e `juros_pre_judiciais` é verdadeiro.
+    - Fase judicial: SELIC acumulada (simples), do ajuizamento (ou do vencimento,
+      se posterior) até o mês anterior ao da liquidação, sem juros adicionais.
+
+    Args:
+        competencias: Competências das parcelas (datas ou datetime64)
+        valores: Valores em centavos (mesma ordem)
+        ajuizamento, liquidacao: Datas do ajuizamento e da liquidação
+        tabelas: {nome: TabelaIndice}; por padrão, as de app/tabelas
+
+    Returns:
+        CorrecaoParcelas
+    """
+    tabelas = carregar_tabelas() if tabelas is None else tabelas
+    for nome in ("ipca_e", "selic"):
+        if nome not in tabelas:
+            raise ValueError(f"Tabela '{nome}' indisponível em {DIR_TABELAS} (use --atualizar).")
+    data_ajuizamento, data_liquidacao = converter_data(ajuizamento), converter_data(liquidacao)
+    if not data_ajuizamento or not data_liquidacao:
+        raise ValueError(f"Datas de ajuizamento/liquidação inválidas: {ajuizamento!r}, {liquidacao!r}.")
+
+    competencias = _competencias(competencias)
+    valores = np.asarray(valores, dtype=np.int64)
+    vencimentos = competencias + 1
+    mes_ajuizamento = np.datetime64(data_ajuizamento, "M")
+    mes_liquidacao = np.datetime64(data_liquidacao, "M")
+
+    fim_pre = np.maximum(vencimentos, mes_ajuizamento)
+    fator_ipca = tabelas["ipca_e"].fator_composto(vencimentos, fim_pre)
+    juros_pre = np.zeros(len(valores))
+    if juros_pre_judiciais and "tr" in tabelas:
+        juros_pre = tabelas["tr"].fator_composto(vencimentos, fim_pre) - 1.0
+    fator_selic = tabelas["selic"].fator_simples(fim_pre, np.maximum(fim_pre, mes_liquidacao))
+
+    return CorrecaoParcelas(
+        competencias, valores, fator_ipca, juros_pre, fator_selic, data_ajuizamento, data_liquidacao
+    )
+
+
+def parcelas_do_calculo(resultado_calculo, chaves=None):
+    """
+    Parcelas (competências, centavos) de um resultado de `calcular_verbas_rescisorias`:
+    o FGTS mês a mês (abatido o já depositado, das competências mais antigas
+    para as mais recentes) e as demais verbas na competência da demissão.
+    FGTS "a apurar" (depósitos desconhecidos) não gera parcelas. Com `chaves`,
+    só entram as verbas indicadas (ex: as pleiteadas no processo).
+    """
+    linha = resultado_calculo["linha_do_tempo"]
+    parametros = resultado_calculo["parametros"]
+    depositado = parametros.get("fgts_depositado", 0)
+
+    no_contrato = linha.dias_contrato > 0
+    competencias_fgts = linha.competencias[no_contrato]
+    fgts_mensal = linha.fgts[no_contrato]
+    if depositado is None or (chaves is not None and "fgts" not in chaves):
+        fgts_pendente = np.zeros_like(fgts_mensal)
+    else:
+        pendente_acumulado = np.maximum(np.cumsum(fgts_mensal) - int(depositado * 100), 0)
+        fgts_pendente = np.diff(pendente_acumulado, prepend=0)
+
+    mes_demissao = np.datetime64(parametros["demissao"], "M")
+    rescisorias = 0
+    for item in resultado_calculo["verbas"]:
+        if chaves is not None and item["chave"] not in chaves:
+            continue
+        if item["chave"] == "fgts":
+            # FGTS sobre 13º e aviso (e o que sobrar após as competências mensais)
+            rescisorias += item["centavos"] - int(fgts_pendente.sum())
+        else:
+            rescisorias += item["centavos"]
+
+    competencias = np.append(competencias_fgts, mes_demissao)
+    valores = np.append(fgts_pendente, rescisorias).astype(np.int64)
+    com_valor = valores > 0
+    return competencias[com_valor], valores[com_valor]
+
+
+def corrigir_calculo(resultado_calculo, ajuizamento, liquidacao=None, tabelas=None, chaves=None):
+    """
+    Atualiza pelo regime da ADC 58 as parcelas de um resultado do `calculo_verbas`
+    (apenas as verbas de `chaves`, quando informadas).
+    """
+    tabelas = carregar_tabelas() if tabelas is None else tabelas
+    if liquidacao is None:
+        # Última competência com SELIC publicada (sem passar de hoje)
+        ultima = tabelas["selic"].fim.astype(datetime.date) if "selic" in tabelas else datetime.date.today()
+        liquidacao = min(ultima, datetime.date.today())
+    competencias, valores = parcelas_do_calculo(resultado_calculo, chaves)
+    return corrigir_parcelas(competencias, valores, ajuizamento, liquidacao, tabelas)
+
+
+# --- ATUALIZAÇÃO DAS TABELAS ---
+
+def atualizar_tabelas(diretorio=None, timeout=30):
+    """Baixa as séries do SGS/BCB e regrava app/tabelas/<nome>.csv."""
+    diretorio = diretorio or DIR_TABELAS
+    os.makedirs(diretorio, exist_ok=True)
+    for nome, codigo in SERIES_SGS.items():
+        try:
+            with urllib.request.urlopen(URL_SGS.format(codigo=codigo), timeout=timeout) as resposta:
+                conteudo = resposta.read().decode("utf-8")
+        except Exception as e:
+            print(f"❌ Falha ao baixar '{nome}' (série SGS {codigo}): {e}")
+            continue
+        caminho = os.path.join(diretorio, f"{nome}.csv")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(f"# Fonte: SGS/BCB, série {codigo}. Baixado em {datetime.date.today():%d/%m/%Y}.\n")
+            arquivo.write(conteudo)
+        print(f"✅ Tabela '{nome}' atualizada em {caminho}.")
+
+
+if __name__ == "__main__":
+    if "--atualizar" in sys.argv:
+        atualizar_tabelas()
+    else:
+        for nome, tabela in carregar_tabelas().items():
+            print(f"{nome}: {len(tabela)} competências ({tabela.inicio} a {tabela.fim - 1})")
@@ -0,0 +1,309 @@
+# ===================================================================
+# app/correlacao_lote.py (CORRELAÇÃO DE VERBAS EM LOTE)
+#
+# Funcionalidades:
+# - PERFIL ÚNICO POR VERBA: Cada nome é normalizado, tokenizado e expandido
+#   com sinônimos uma só vez (e não a cada par comparado).
+# - MATRIZES NUMPY: Sobreposição de tokens (simples e expandida), bônus de
+#   artigos e um limite superior da similaridade de sequência (quick_ratio,
+#   via contagem de caracteres) são calculados para todos os pares de uma vez.
+# - RESULTADO IDÊNTICO: O `SequenceMatcher` exato só roda nos pares cujo
+#   limite superior ainda pode superar a melhor pontuação da linha; a
+#   pontuação final usa a mesma fórmula de `calcular_similaridade`.
+# - ÍNDICE INVERTIDO: Tokens expandidos e trigramas de caracteres -> nomes,
+#   para gerar só os pares plausíveis (similares ou contidos um no outro)
+#   em vez de comparar todas as verbas da planilha entre si.
+# - ÍNDICE DE CORRELAÇÕES: Conjuntos por nome de verba sobre o resultado
+#   da correlação, para mesclar as correspondências por dicionário e
+#   apurar as verbas adicionais sem varrer as listas a cada consulta.
+# ===================================================================
+
+import re
+import difflib
+from collections import defaultdict
+import numpy as np
+
+# Mesmo padrão usado por `calcular_similaridade` para o bônus de artigos
+PADRAO_ARTIGOS = re.compile(r'art\.?\s*\d+|4[67][0-9]|13[ºo]')
+BONUS_ARTIGOS = 0.15
+
+# Tamanho dos n-gramas de caracteres usados no índice de substrings
+TAMANHO_NGRAMA = 3
+
+# Linhas processadas por bloco ao montar a matriz de caracteres (limita memória)
+LINHAS_POR_BLOCO = 64
+
+
+class MotorCorrelacao:
+    """
+    Calcula, para cada verba do texto, a verba da planilha com maior
+    pontuação de similaridade, com o mesmo resultado (valor e desempate)
+    do laço par a par de `CorrelacaoParcialMixin.correlacionar_verbas`.
+    """
+
+    def __init__(self, analisador):
+        self.analisador = analisador
+        self._perfis = {}
+        self.pares_exatos = 0
+
+    def perfil(self, nome):
+        """Normalização, tokens, tokens expandidos e presença de artigos de um nome."""
+        perfil = self._perfis.get(nome)
+        if perfil is None:
+            normalizado = self.analisador.normalizar_para_comparacao(nome)
+            perfil = {
+                "normalizado": normalizado,
+                "tokens": frozenset(normalizado.split()),
+                "expandidos": frozenset(self.analisador.expandir_sinonimos(normalizado).split()),
+                "artigos": bool(PADRAO_ARTIGOS.search(nome)),
+            }
+            self._perfis[nome] = perfil
+        return perfil
+
+    @staticmethod
+    def _matriz_binaria(conjuntos, vocabulario):
+        matriz = np.zeros((len(conjuntos), len(vocabulario)), dtype=np.int32)
+        for linha, conjunto in enumerate(conjuntos):
+            for termo in conjunto:
+                matriz[linha, vocabulario[termo]] = 1
+        return matriz
+
+    def _intersecoes_uniao(self, conjuntos_a, conjuntos_b):
+        """Matrizes (interseção, união) de tamanhos de conjuntos para todos os pares."""
+        vocabulario = {}
+        for conjunto in (*conjuntos_a, *conjuntos_b):
+            for termo in conjunto:
+                vocabulario.setdefault(termo, len(vocabulario))
+        a = self._matriz_binaria(conjuntos_a, vocabulario)
+        b = self._matriz_binaria(conjuntos_b, vocabulario)
+        intersecao = a @ b.T
+        uniao = a.sum(axis=1)[:, None] + b.sum(axis=1)[None, :] - intersecao
+        return intersecao, uniao
+
+    @staticmethod
+    def _limite_sequencia(textos_a, textos_b):
+        """
+        Matriz de `SequenceMatcher.quick_ratio()` (contagem de caracteres em
+        comum), que é sempre maior ou igual a `ratio()`.
+        """
+        alfabeto = {}
+        for texto in (*textos_a, *textos_b):
+            for caractere in texto:
+                alfabeto.setdefault(caractere, len(alfabeto))
+
+        def contagens(textos):
+            matriz = np.zeros((len(textos), max(len(alfabeto), 1)), dtype=np.int32)
+            for linha, texto in enumerate(textos):
+                for caractere in texto:
+                    matriz[linha, alfabeto[caractere]] += 1
+            return matriz
+
+        ca, cb = contagens(textos_a), contagens(textos_b)
+        comuns = np.empty((len(textos_a), len(textos_b)), dtype=np.int64)
+        for inicio in range(0, len(textos_a), LINHAS_POR_BLOCO):
+            bloco = ca[inicio:inicio + LINHAS_POR_BLOCO]
+            comuns[inicio:inicio + LINHAS_POR_BLOCO] = np.minimum(bloco[:, None, :], cb[None, :, :]).sum(axis=2)
+
+        total = ca.sum(axis=1)[:, None] + cb.sum(axis=1)[None, :]
+        limite = np.ones(comuns.shape, dtype=np.float64)  # ratio("", "") == 1.0
+        np.divide(2.0 * comuns, total, out=limite, where=total > 0)
+        return limite
+
+    def melhores_correspondencias(self, nomes_texto, nomes_planilha):
+        """
+        Para cada nome do texto, retorna `(indice_planilha, pontuacao)` da melhor
+        correspondência, ou `(None, 0)` quando nenhuma pontuação é positiva.
+        """
+        if not nomes_texto:
+            return []
+        if not nomes_planilha:
+            return [(None, 0)] * len(nomes_texto)
+
+        perfis_a = [self.perfil(nome) for nome in nomes_texto]
+        perfis_b = [self.perfil(nome) for nome in nomes_planilha]
+
+        inter_tok, uniao_tok = self._intersecoes_uniao([p["tokens"] for p in perfis_a], [p["tokens"] for p in perfis_b])
+        inter_exp, uniao_exp = self._intersecoes_uniao([p["expandidos"] for p in perfis_a], [p["expandidos"] for p in perfis_b])
+        com_uniao = uniao_tok > 0
+        sim_tok = np.divide(inter_tok, uniao_tok, out=np.zeros(inter_tok.shape), where=com_uniao)
+        sim_exp = np.divide(inter_exp, uniao_exp, out=np.zeros(inter_exp.shape), where=com_uniao)
+
+        artigos_a = np.array([p["artigos"] for p in perfis_a])
+        artigos_b = np.array([p["artigos"] for p in perfis_b])
+        bonus = np.where(artigos_a[:, None] & artigos_b[None, :], BONUS_ARTIGOS, 0.0)
+
+        limite_seq = self._limite_sequencia([p["normalizado"] for p in perfis_a], [p["normalizado"] for p in perfis_b])
+        # Mesma ordem de operações da pontuação exata: o arredondamento preserva o limite
+        limite = np.minimum(1.0, 0.3 * limite_seq + 0.3 * sim_tok + 0.3 * sim_exp + bonus)
+
+        resultados = []
+        for i, perfil_a in enumerate(perfis_a):
+            melhor_indice, melhor_pontuacao = None, 0
+            for j in np.argsort(-limite[i], kind="stable"):
+                if limite[i, j] < melhor_pontuacao:
+                    break
+                pontuacao = self._pontuacao_exata(
+                    perfil_a, perfis_b[j],
+                    int(inter_tok[i, j]), int(uniao_tok[i, j]),
+                    int(inter_exp[i, j]), int(uniao_exp[i, j]),
+                )
+                # Desempate igual ao laço original: vence o primeiro índice da planilha
+                if pontuacao > melhor_pontuacao or (
+                    pontuacao == melhor_pontuacao and melhor_indice is not None and j < melhor_indice
+                ):
+                    melhor_indice, melhor_pontuacao = int(j), pontuacao
+            resultados.append((melhor_indice, melhor_pontuacao))
+        return resultados
+
+    def _pontuacao_exata(self, perfil_a, perfil_b, inter_tok, uniao_tok, inter_exp, uniao_exp):
+        """Mesma fórmula de `calcular_similaridade`, a partir dos perfis já calculados."""
+        self.pares_exatos += 1
+        similaridade_sequencia = difflib.SequenceMatcher(None, perfil_a["normalizado"], perfil_b["normalizado"]).ratio()
+        return self._pontuacao(perfil_a, perfil_b, similaridade_sequencia, inter_tok, uniao_tok, inter_exp, uniao_exp)
+
+    @staticmethod
+    def _pontuacao(perfil_a, perfil_b, similaridade_sequencia, inter_tok, uniao_tok, inter_exp, uniao_exp):
+        """Composição ponderada da pontuação (mesma ordem de operações do original)."""
+        if uniao_tok == 0:
+            similaridade_tokens = 0
+            similaridade_tokens_expandida = 0
+        else:
+            similaridade_tokens = inter_tok / uniao_tok
+            similaridade_tokens_expandida = inter_exp / uniao_exp
+        bonus_artigos = BONUS_ARTIGOS if perfil_a["artigos"] and perfil_b["artigos"] else 0
+        pontuacao = (
+            0.3 * similaridade_sequencia +
+            0.3 * similaridade_tokens +
+            0.3 * similaridade_tokens_expandida +
+            bonus_artigos
+        )
+        return min(1.0, pontuacao)
+
+    def similaridade_acima(self, texto1, texto2, limiar):
+        """
+        Equivale a `calcular_similaridade(texto1, texto2) > limiar`, descartando
+        antes pelos limites de comprimento e de caracteres do `SequenceMatcher`.
+        """
+        perfil_a, perfil_b = self.perfil(texto1), self.perfil(texto2)
+        contagens = (
+            len(perfil_a["tokens"] & perfil_b["tokens"]), len(perfil_a["tokens"] | perfil_b["tokens"]),
+            len(perfil_a["expandidos"] & perfil_b["expandidos"]), len(perfil_a["expandidos"] | perfil_b["expandidos"]),
+        )
+        matcher = difflib.SequenceMatcher(None, perfil_a["normalizado"], perfil_b["normalizado"])
+        for limite_sequencia in (matcher.real_quick_ratio, matcher.quick_ratio):
+            if self._pontuacao(perfil_a, perfil_b, limite_sequencia(), *contagens) <= limiar:
+                return False
+        self.pares_exatos += 1
+        return self._pontuacao(perfil_a, perfil_b, matcher.ratio(), *contagens) > limiar
+
+
+def _ngramas(texto):
+    return {texto[i:i + TAMANHO_NGRAMA] for i in range(len(texto) - TAMANHO_NGRAMA + 1)}
+
+
+class IndiceVerbas:
+    """
+    Índice invertido sobre nomes de verbas (distintos) para gerar apenas os
+    pares que podem ser similares ou em que um nome contém o outro.
+    """
+
+    def __init__(self, nomes, motor):
+        self.motor = motor
+        self.nomes = list(dict.fromkeys(nomes))
+
+        # Token expandido -> nomes (quem não compartilha nenhum token expandido
+        # pontua no máximo 0.3 * sequência + bônus de artigos)
+        self.por_token = defaultdict(set)
+        self.com_artigos = set()
+        for nome in self.nomes:
+            perfil = motor.perfil(nome)
+            for token in perfil["expandidos"]:
+                self.por_token[token].add(nome)
+            if perfil["artigos"]:
+                self.com_artigos.add(nome)
+
+        # N-grama mais raro de cada nome -> nomes (se A está contido em B, todos
+        # os n-gramas de A aparecem em B); nomes curtos são sempre verificados
+        frequencia = defaultdict(int)
+        ngramas_por_nome = {nome: _ngramas(nome) for nome in self.nomes}
+        for ngramas in ngramas_por_nome.values():
+            for ngrama in ngramas:
+                frequencia[ngrama] += 1
+        self.por_ngrama = defaultdict(set)
+        self.curtos = set()
+        for nome, ngramas in ngramas_por_nome.items():
+            if ngramas:
+                self.por_ngrama[min(ngramas, key=lambda n: (frequencia[n], n))].add(nome)
+            else:
+                self.curtos.add(nome)
+
+    def candidatos_similares(self, nome):
+        """Nomes que podem ter similaridade acima de 0.3 com `nome` (superconjunto)."""
+        perfil = self.motor.perfil(nome)
+        candidatos = set()
+        for token in perfil["expandidos"]:
+            candidatos |= self.por_token.get(token, set())
+        if perfil["artigos"]:
+            candidatos |= self.com_artigos
+        return candidatos
+
+    def candidatos_contidos(self, nome):
+        """Nomes que podem estar contidos em `nome` (superconjunto)."""
+        candidatos = set(self.curtos)
+        for ngrama in _ngramas(nome):
+            candidatos |= self.por_ngrama.get(ngrama, set())
+        return candidatos
+
+
+class IndiceCorrelacoes:
+    """
+    Índices por nome de verba sobre o resultado de `correlacionar_verbas`,
+    para as consultas "já tem correspondência forte?" e "esta verba da
+    planilha já foi correspondida?" em O(1) durante as mesclagens.
+    """
+
+    TIPOS_CORRESPONDENCIA = ("correspondencias_fortes", "correspondencias_provaveis", "correspondencias_possiveis")
+
+    def __init__(self, correlacoes):
+        self.correlacoes = correlacoes
+        self.textos_fortes = {
+            item["verba_texto"]["verba"] for item in correlacoes["correspondencias_fortes"]
+        }
+        self.planilha_correspondidas = {
+            item["verba_planilha"].get("verba")
+            for tipo in self.TIPOS_CORRESPONDENCIA
+            for item in correlacoes[tipo]
+        }
+
+    def tem_forte(self, nome_texto):
+        return nome_texto in self.textos_fortes
+
+    def planilha_correspondida(self, nome_planilha):
+        return nome_planilha in self.planilha_correspondidas
+
+    def adicionar_fortes(self, correspondencias):
+        """
+        Acrescenta às fortes as correspondências cuja verba do texto ainda não
+        tem nenhuma, retirando a primeira entrada de mesmo nome das sem
+        correspondência (uma única passada na lista, preservando a ordem).
+        """
+        fortes = self.correlacoes["correspondencias_fortes"]
+        remover = set()
+        for corr in correspondencias:
+            nome = corr["verba_texto"]["verba"]
+            if nome in self.textos_fortes:
+                continue
+            fortes.append(corr)
+            self.textos_fortes.add(nome)
+            self.planilha_correspondidas.add(corr["verba_planilha"].get("verba"))
+            remover.add(nome)
+
+        if remover:
+            restantes = []
+            for item in self.correlacoes["sem_correspondencia"]:
+                nome = item["verba_texto"]["verba"]
+                if nome in remover:
+                    remover.discard(nome)
+                    continue
+                restantes.append(item)
+            self.correlacoes["sem_correspondencia"][:] = restantes
@@ -0,0 +1,154 @@
+# ===================================================================
+# app/deteccao_paralela.py (DETECÇÃO DE VERBAS EM PARALELO)
+#
+# Funcionalidades:
+# - JANELAS: O texto normalizado é dividido em uma janela por processo. Cada
+#   tarefa recebe o texto a partir do início da sua janela (mais uma margem
+#   à esquerda para \b e lookbehinds), de modo que matches que começam na
+#   janela e terminam depois dela são encontrados por inteiro.
+# - POOL DE PROCESSOS: As janelas são varridas com o `EscanerPadroes` em
+#   um ProcessPoolExecutor persistente (contexto "spawn" por padrão, seguro
+#   com as threads do Streamlit e dos jobs).
+# - RESULTADO IDÊNTICO: Na junção, as ocorrências de cada padrão são
+#   encadeadas por posição absoluta; quando um match de uma janela invade
+#   a seguinte, a varredura é refeita a partir do fim dele até reencontrar
+#   a cadeia da janela, exatamente como o `re.finditer` serial faria.
+# - ATIVAÇÃO: Só para textos grandes (DETECCAO_PARALELA_MIN_CHARS) e com
+#   mais de um worker; DETECCAO_PARALELA=0 desativa. Em caso de falha do
+#   pool, a varredura serial é usada.
+# ===================================================================
+
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from escaner_padroes import EscanerPadroes
+
+DETECCAO_PARALELA = os.getenv("DETECCAO_PARALELA", "1") == "1"
+TAMANHO_MINIMO_PARALELO = int(os.getenv("DETECCAO_PARALELA_MIN_CHARS", "1000000"))
+WORKERS_DETECCAO = int(os.getenv("DETECCAO_PARALELA_WORKERS", str(os.cpu_count() or 1)))
+CONTEXTO_PROCESSOS = os.getenv("DETECCAO_PARALELA_CONTEXTO", "spawn")
+
+# Caracteres anteriores à janela enviados junto (lookbehinds têm largura fixa)
+MARGEM_ESQUERDA = 256
+
+# --- SINGLETON ---
+_executor = None
+_lock_executor = threading.Lock()
+
+# No processo filho: definição dos padrões -> escaner já montado
+_escaneres_trabalhador = {}
+
+
+def _obter_executor():
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _lock_executor:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=WORKERS_DETECCAO,
+                mp_context=multiprocessing.get_context(CONTEXTO_PROCESSOS),
+            )
+    return _executor
+
+
+def _descartar_executor():
+    """Descarta um pool quebrado; o próximo uso cria outro."""
+    global _executor
+    with _lock_executor:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _varrer_janela(definicao_padroes, trecho, deslocamento, inicio, fim):
+    """
+    Executado no processo filho: varre `trecho[inicio:fim]` (matches podem
+    terminar depois de `fim`) e devolve as posições absolutas por padrão.
+    """
+    escaner = _escaneres_trabalhador.get(definicao_padroes)
+    if escaner is None:
+        escaner = EscanerPadroes([re.compile(padrao, flags) for padrao, flags in definicao_padroes])
+        _escaneres_trabalhador[definicao_padroes] = escaner
+    return [
+        [(match.start() + deslocamento, match.end() + deslocamento) for match in lista]
+        for lista in escaner.varrer(trecho, inicio, fim)
+    ]
+
+
+def _encadear(padrao, texto, janelas, listas):
+    """
+    Junta as listas de um padrão (uma por janela) na mesma sequência que
+    `padrao.finditer(texto)` produziria sobre o texto inteiro.
+    """
+    resultado = []
+    fim_anterior = 0
+    for (inicio_janela, fim_janela), lista in zip(janelas, listas):
+        proximo = 0
+        if fim_anterior > inicio_janela:
+            # Um match anterior invadiu a janela: refaz a cadeia serial a partir
+            # do fim dele até reencontrar um início já calculado pela janela
+            inicios = {inicio: indice for indice, (inicio, _) in enumerate(lista)}
+            proximo = len(lista)
+            for match in padrao.finditer(texto, fim_anterior):
+                if match.start() >= fim_janela:
+                    break
+                if match.start() in inicios:
+                    proximo = inicios[match.start()]
+                    break
+                resultado.append(match.span())
+                fim_anterior = match.end()
+        for inicio, fim in lista[proximo:]:
+            resultado.append((inicio, fim))
+            fim_anterior = fim
+    return resultado
+
+
+def usar_paralelo(tamanho_texto):
+    """Indica se a detecção paralela compensa para um texto deste tamanho."""
+    return DETECCAO_PARALELA and WORKERS_DETECCAO > 1 and tamanho_texto >= TAMANHO_MINIMO_PARALELO
+
+
+def varrer_posicoes_paralelo(escaner_categorias, texto, workers=None):
+    """
+    Mesmo resultado de `escaner_categorias.varrer_posicoes(texto)`, com as
+    janelas do texto varridas em processos separados.
+    """
+    if not texto:
+        return escaner_categorias.varrer_posicoes(texto)
+    escaner = escaner_categorias.escaner
+    workers = workers or WORKERS_DETECCAO
+    tamanho_janela = -(-len(texto) // workers)
+    # A última janela vai até len + 1 para incluir um eventual match vazio no fim do texto
+    janelas = [(inicio, inicio + tamanho_janela) for inicio in range(0, len(texto), tamanho_janela)]
+    janelas[-1] = (janelas[-1][0], len(texto) + 1)
+    definicao_padroes = tuple((padrao.pattern, padrao.flags) for padrao in escaner.padroes)
+
+    futuros = []
+    executor = _obter_executor()
+    for inicio, fim in janelas:
+        deslocamento = max(0, inicio - MARGEM_ESQUERDA)
+        futuros.append(executor.submit(
+            _varrer_janela, definicao_padroes, texto[deslocamento:], deslocamento,
+            inicio - deslocamento, fim - deslocamento,
+        ))
+    por_janela = [futuro.result() for futuro in futuros]
+
+    por_padrao = [
+        _encadear(padrao, texto, janelas, [resultado[indice] for resultado in por_janela])
+        for indice, padrao in enumerate(escaner.padroes)
+    ]
+    return escaner_categorias.agrupar(por_padrao)
+
+
+def varrer_posicoes(escaner_categorias, texto):
+    """Varredura paralela para textos grandes e serial nos demais casos (ou em falha)."""
+    if usar_paralelo(len(texto)):
+        try:
+            return varrer_posicoes_paralelo(escaner_categorias, texto)
+        except Exception as e:
+            print(f"⚠️ Detecção paralela indisponível ({e}). Usando a varredura serial.")
+            _descartar_executor()
+    return escaner_categorias.varrer_posicoes(texto)
@@ -0,0 +1,255 @@
+# ===================================================================
+# app/escaner_padroes.py (VARREDURA ÚNICA DE MÚLTIPLOS PADRÕES)
+#
+# Funcionalidades:
+# - PREFIXOS LITERAIS: Extrai de cada regex o conjunto de prefixos
+#   literais com que qualquer ocorrência obrigatoriamente começa
+#   (expandindo classes pequenas como [aá] e alternativas).
+# - PRÉ-FILTRO ÚNICO: Todos os prefixos viram uma única alternância em
+#   forma de trie, varrida uma só vez sobre o texto para achar as posições
+#   candidatas de cada padrão.
+# - RESULTADO IDÊNTICO: Em cada candidata, o padrão compilado é testado
+#   com `match`, encadeando as ocorrências como o `re.finditer` faz (sem
+#   sobreposição). Padrões sem prefixo literal seguro (ou que aceitam
+#   texto vazio) usam `finditer` diretamente.
+# ===================================================================
+
+import re
+from collections import defaultdict
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# Limites da extração de prefixos
+TAMANHO_MAXIMO_PREFIXO = 8
+MAXIMO_PREFIXOS_POR_PADRAO = 64
+MAXIMO_CHARS_CLASSE = 8
+
+
+def _caracteres_classe(itens):
+    """Expande uma classe [..] pequena em caracteres; None se não for expansível."""
+    caracteres = []
+    for op, valor in itens:
+        if op is sre_constants.LITERAL:
+            caracteres.append(chr(valor))
+        elif op is sre_constants.RANGE and valor[1] - valor[0] < MAXIMO_CHARS_CLASSE:
+            caracteres.extend(chr(c) for c in range(valor[0], valor[1] + 1))
+        else:
+            return None
+    if len(caracteres) > MAXIMO_CHARS_CLASSE:
+        return None
+    return caracteres
+
+
+def _combinar(prefixos, sufixos):
+    combinados = {p + s for p in prefixos for s in sufixos}
+    if len(combinados) > MAXIMO_PREFIXOS_POR_PADRAO:
+        return None
+    return combinados
+
+
+def _prefixos_sequencia(sequencia, prefixos):
+    """
+    Estende `prefixos` com os itens iniciais de `sequencia`. Retorna
+    `(prefixos, completo)`, onde `completo` indica que a sequência inteira
+    foi consumida (e a extensão pode continuar após ela).
+    """
+    for op, valor in sequencia:
+        if min(len(p) for p in prefixos) >= TAMANHO_MAXIMO_PREFIXO:
+            return prefixos, False
+
+        if op is sre_constants.LITERAL:
+            prefixos = {p + chr(valor) for p in prefixos}
+        elif op is sre_constants.IN:
+            caracteres = _caracteres_classe(valor)
+            novos = _combinar(prefixos, caracteres) if caracteres else None
+            if novos is None:
+                return prefixos, False
+            prefixos = novos
+        elif op is sre_constants.AT:
+            # Âncoras (\b, ^) não consomem caracteres
+            continue
+        elif op is sre_constants.SUBPATTERN:
+            if valor[1] & (re.IGNORECASE | re.VERBOSE):
+                return prefixos, False
+            sub_prefixos, completo = _prefixos_sequencia(valor[-1], prefixos)
+            prefixos = sub_prefixos
+            if not completo:
+                return prefixos, False
+        elif op is sre_constants.BRANCH:
+            unidos = set()
+            todos_completos = True
+            for alternativa in valor[1]:
+                alt_prefixos, completo = _prefixos_sequencia(alternativa, {""})
+                unidos |= alt_prefixos
+                todos_completos = todos_completos and completo
+            novos = _combinar(prefixos, unidos)
+            if novos is None:
+                return prefixos, False
+            prefixos = novos
+            if not todos_completos:
+                return prefixos, False
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            minimo, _, item = valor
+            if minimo == 0:
+                return prefixos, False
+            item_prefixos, _ = _prefixos_sequencia(item, {""})
+            novos = _combinar(prefixos, item_prefixos)
+            return (novos if novos is not None else prefixos), False
+        else:
+            return prefixos, False
+    return prefixos, True
+
+
+def prefixos_literais(padrao):
+    """
+    Conjunto de prefixos literais com que toda ocorrência de `padrao` começa,
+    ou None quando não é possível garantir um prefixo não vazio.
+    """
+    if padrao.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+    try:
+        arvore = sre_parse.parse(padrao.pattern, padrao.flags)
+    except Exception:
+        return None
+    prefixos, _ = _prefixos_sequencia(list(arvore), {""})
+    if not prefixos or "" in prefixos:
+        return None
+    return prefixos
+
+
+def _regex_trie(prefixos):
+    """Monta uma alternância em forma de trie (um ramo por caractere inicial)."""
+    trie = {}
+    for prefixo in prefixos:
+        no = trie
+        for caractere in prefixo:
+            no = no.setdefault(caractere, {})
+        no[""] = {}
+
+    def montar(no):
+        ramos = []
+        terminal = "" in no
+        for caractere in sorted(c for c in no if c):
+            ramos.append(re.escape(caractere) + montar(no[caractere]))
+        if not ramos:
+            return ""
+        if len(ramos) == 1 and not terminal:
+            return ramos[0]
+        corpo = "|".join(ramos)
+        # Um prefixo terminal aqui é suficiente para a posição ser candidata
+        return f"(?:{corpo})?" if terminal else f"(?:{corpo})"
+
+    return montar(trie)
+
+
+class EscanerPadroes:
+    """
+    Conjunto fixo de padrões compilado uma vez; `varrer(texto)` devolve,
+    para cada padrão, a mesma lista de matches que `re.finditer` daria.
+    """
+
+    def __init__(self, padroes):
+        self.padroes = [p if isinstance(p, re.Pattern) else re.compile(p) for p in padroes]
+        self.indices_finditer = []
+        prefixo_para_indices = defaultdict(list)
+
+        for indice, padrao in enumerate(self.padroes):
+            prefixos = prefixos_literais(padrao)
+            # Padrões que aceitam texto vazio seguem o caminho direto do finditer
+            if prefixos is None or padrao.fullmatch("") is not None:
+                self.indices_finditer.append(indice)
+                continue
+            for prefixo in prefixos:
+                prefixo_para_indices[prefixo].append(indice)
+
+        self.prefixo_para_indices = dict(prefixo_para_indices)
+        self.tamanhos_prefixo = sorted({len(p) for p in self.prefixo_para_indices})
+        self.prefiltro = None
+        if self.prefixo_para_indices:
+            self.prefiltro = re.compile(f"(?=({_regex_trie(self.prefixo_para_indices)}))")
+
+    def posicoes_candidatas(self, texto, inicio=0, fim=None):
+        """Posições candidatas de cada padrão em [inicio, fim), numa única varredura do texto."""
+        candidatas = defaultdict(list)
+        if self.prefiltro is None:
+            return candidatas
+        fim = len(texto) if fim is None else fim
+        mapa = self.prefixo_para_indices
+        tamanhos = self.tamanhos_prefixo
+        for achado in self.prefiltro.finditer(texto, inicio):
+            posicao = achado.start()
+            if posicao >= fim:
+                break
+            # O prefiltro devolve um prefixo por posição; consulta todos os tamanhos
+            for tamanho in tamanhos:
+                indices = mapa.get(texto[posicao:posicao + tamanho])
+                if indices:
+                    for indice in indices:
+                        candidatas[indice].append(posicao)
+        return candidatas
+
+    def varrer(self, texto, inicio=0, fim=None):
+        """
+        Lista de matches por padrão (mesma ordem e conteúdo do `re.finditer`).
+        Com `inicio`/`fim`, equivale a `finditer(texto, inicio)` limitado aos
+        matches que começam antes de `fim` (podendo terminar depois dele).
+        Sem `fim`, inclui o match vazio no fim do texto, como o `finditer`.
+        """
+        fim = len(texto) + 1 if fim is None else fim
+        resultado = [[] for _ in self.padroes]
+        candidatas = self.posicoes_candidatas(texto, inicio, fim)
+
+        for indice, posicoes in candidatas.items():
+            casar = self.padroes[indice].match
+            lista = resultado[indice]
+            fim_anterior = inicio
+            for posicao in posicoes:
+                if posicao < fim_anterior:
+                    continue
+                match = casar(texto, posicao)
+                if match is not None:
+                    lista.append(match)
+                    fim_anterior = match.end()
+
+        for indice in self.indices_finditer:
+            lista = resultado[indice]
+            for match in self.padroes[indice].finditer(texto, inicio):
+                if match.start() >= fim:
+                    break
+                lista.append(match)
+
+        return resultado
+
+
+class EscanerCategorias:
+    """
+    Agrupa os padrões por categoria (mesma estrutura de `categorias_verbas`)
+    e devolve `{categoria: [matches na ordem padrão a padrão]}`.
+    """
+
+    def __init__(self, categorias):
+        self.categorias = [(categoria, len(padroes)) for categoria, padroes in categorias.items()]
+        self.escaner = EscanerPadroes([p for padroes in categorias.values() for p in padroes])
+
+    def agrupar(self, por_padrao):
+        """Junta as listas por padrão em {categoria: [itens na ordem padrão a padrão]}."""
+        resultado = {}
+        inicio = 0
+        for categoria, quantidade in self.categorias:
+            itens = [item for lista in por_padrao[inicio:inicio + quantidade] for item in lista]
+            inicio += quantidade
+            if itens:
+                resultado[categoria] = itens
+        return resultado
+
+    def varrer(self, texto):
+        return self.agrupar(self.escaner.varrer(texto))
+
+    def varrer_posicoes(self, texto):
+        """Como `varrer`, mas com tuplas (início, fim) no lugar dos objetos match."""
+        return self.agrupar([[m.span() for m in lista] for lista in self.escaner.varrer(texto)])
@@ -10,6 +10,14 @@ import google.generativeai as genai
 import re
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from rag_manager import consultar_rag # Importa a função de consulta RAG
+from cache_prompt import CachePromptExtracao
+from saturacao import RastreadorSaturacao
+from agendador_chunks import ordenar_por_prioridade, max_concorrencia
+from limitador_gemini import obter_limitador
+from instrumentacao import medir, propagar_contexto
+from perfilador import perfilar_thread
+import metricas
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Configuração global de autenticação
 
@@ -19,6 +27,8 @@ AUTH_METHOD = configure_gemini_auth()
 # --- Configuração do Modelo ---
 
 MODELO_ANALISE = os.getenv("GEMINI_MODEL", "gemini-1.5-pro-latest")
+# Pausa (segundos) após cada chunk enviado; o limite de taxa fica com limitador_gemini.py
+PAUSA_ENTRE_CHAMADAS = float(os.getenv("GEMINI_PAUSA_ENTRE_CHAMADAS", "1"))
 
 generation_config = {
     "temperature": 0.1,
@@ -139,6 +149,7 @@ Retorne OBRIGATORIAMENTE um JSON estruturado seguindo exatamente este padrão:
     "funcao": "string",
     "salario_base": "string",
     "jornada": "string",
+    "fgts_depositado": "string",
     "periodos_afastamento": [
       {"inicio": "string", "fim": "string", "motivo": "string"}
     ]
@@ -265,6 +276,7 @@ Além da estrutura JSON, seu resultado final DEVE conter estas seções claramen
     "data_demissao_rescisao_indireta": "...",
     "funcao": "...",
     "salario_base": "...",
+    "fgts_depositado": "...",
     "periodos_afastamento": []
   },
   "pleitos_e_verbas": [
@@ -437,16 +449,28 @@ def _retry_on_exception(retries=3, delay=5, backoff=2):
         return wrapper
     return decorator
 
+_LATENCIA_GEMINI = metricas.histograma(
+    "gemini_chamada_segundos", "Latência das chamadas generate_content ao Gemini", ("resultado",)
+)
+_CHAMADAS_GEMINI_EM_ANDAMENTO = metricas.medidor("gemini_chamadas_em_andamento", "Chamadas ao Gemini aguardando resposta")
+
+
 @_retry_on_exception()
 def _call_gemini_api(model, prompt_completo):
     """Função encapsulada para chamar a API do Gemini, com retentativas."""
     try:
         # Aqui NÃO precisa configurar autenticacao!
-        model_instance = genai.GenerativeModel(MODELO_ANALISE)
-        response = model_instance.generate_content(
-            prompt_completo,
-            generation_config=generation_config
-        )
+        # Usa o modelo recebido (ex: modelo com prompt em cache) ou o modelo padrão
+        model_instance = model if model is not None else genai.GenerativeModel(MODELO_ANALISE)
+        # Vaga no limite compartilhado por todas as análises do processo (cada tentativa conta)
+        with medir("gemini.chamada") as span, obter_limitador().reservar():
+            # Latência e concorrência medidas só na chamada (a espera do limitador tem métrica própria)
+            with _CHAMADAS_GEMINI_EM_ANDAMENTO.em_andamento(), _LATENCIA_GEMINI.cronometrar():
+                response = model_instance.generate_content(
+                    prompt_completo,
+                    generation_config=generation_config
+                )
+            span.registrar(bytes=len(str(prompt_completo).encode("utf-8")))
         import json
         try:
             return json.loads(response.text)
@@ -465,7 +489,86 @@ def dividir_em_chunks(texto):
     )
     return splitter.split_text(texto)
 
-def extrair_dados_parciais(text_chunks, st_progress_bar=None):
+def _extrair_chunk(i, chunk, modelo_chunk, prompt_completo, diretorio_logs="logs"):
+    """
+    Envia um chunk ao Gemini e devolve a entrada de log correspondente
+    ("Sucesso" com o JSON recebido ou "Falha" com o erro). Executada nas
+    threads do agendador.
+    """
+    # D) DEBUG DO TEXTO ENVIADO
+    print(f"🔍 Chunk {i+1}: Enviando {len(chunk)} caracteres para Gemini.")
+    print("Primeiros 500 chars do chunk:", chunk[:500])
+
+    try:
+        resposta = _call_gemini_api(modelo_chunk, prompt_completo)
+        texto_resposta = resposta.text if hasattr(resposta, 'text') else str(resposta)
+        texto_limpo = texto_resposta.strip()
+
+        # A) Tratamento da resposta vazia
+        if not texto_limpo:
+            print(f"❌ Chunk {i+1}: Gemini retornou texto vazio!")
+            # E) Fallback: salva chunk para análise posterior
+            with open(os.path.join(diretorio_logs, f"fallback_chunk_vazio_{i}.txt"), "w", encoding="utf-8") as f:
+                f.write(chunk)
+            return {
+                "status": "Falha",
+                "chunk": i + 1,
+                "erro": "Resposta vazia do Gemini",
+                "resposta_bruta": ""
+            }
+
+        # Limpeza de markdown do retorno Gemini
+        texto_limpo = re.sub(r"^```(?:json)?\s*|```$", "", texto_limpo, flags=re.IGNORECASE | re.MULTILINE).strip()
+        texto_limpo = re.sub(r"^```.*?```$", "", texto_limpo, flags=re.DOTALL | re.MULTILINE).strip()
+
+        # Pega só do primeiro '{' para garantir que o JSON começa corretamente
+        if '{' in texto_limpo:
+            texto_limpo = texto_limpo[texto_limpo.find('{'):]
+
+        # Parsing e registro de sucesso/falha
+        try:
+            resultado_json = json.loads(texto_limpo)
+            entrada = {
+                "status": "Sucesso",
+                "chunk": i + 1,
+                "resultado_recebido": resultado_json
+            }
+        except (json.JSONDecodeError, Exception) as e:
+            print(f"❌ Chunk {i+1}: Erro ao converter para JSON: {e}")
+            print(f"🔎 Chunk {i+1}: Resposta recebida para debug:\n{texto_limpo[:1000]}")
+            entrada = {
+                "status": "Falha",
+                "chunk": i + 1,
+                "erro": str(e),
+                "resposta_bruta": texto_limpo
+            }
+
+    except Exception as e:
+        print(f"❌ Chunk {i+1}: Erro geral: {e}")
+        entrada = {
+            "status": "Falha",
+            "chunk": i + 1,
+            "erro": str(e),
+            "resposta_bruta": "Erro na chamada da API"
+        }
+
+    # Pausa entre chamadas para não sobrecarregar a API
+    if PAUSA_ENTRE_CHAMADAS:
+        time.sleep(PAUSA_ENTRE_CHAMADAS)
+    return entrada
+
+def _extrair_chunk_medido(i, secao, chunk, modelo_chunk, prompt_completo, diretorio_logs="logs"):
+    """
+    `_extrair_chunk` dentro de um span do perfil da execução (tempo, bytes e
+    status por chunk) e, com o perfilador ligado, na sessão do perfilador.
+    """
+    with perfilar_thread(), medir("extracao.chunk", chunk=i + 1, secao=secao) as span:
+        entrada = _extrair_chunk(i, chunk, modelo_chunk, prompt_completo, diretorio_logs)
+        span.registrar(bytes=len(chunk.encode("utf-8")), itens=1, status=entrada["status"])
+    return entrada
+
+def extrair_dados_parciais(text_chunks, st_progress_bar=None, cache_prompt=None, rastreador=None,
+                           ao_previa=None, previa_top_k=3, diretorio_logs="logs"):
     """
     FASE 1: Coleta dados brutos de cada chunk de forma flexível.
     Inclui:
@@ -475,94 +578,112 @@ def extrair_dados_parciais(text_chunks, st_progress_bar=None):
     - Registro de erro ao converter JSON e debug da resposta recebida
     - Pausa entre chamadas para não sobrecarregar a API
     - Resumo visual da sequência recomendada (debug, prompt, chamada, tratamento resposta, fallback, parsing, registro, pausa)
+    - Prompt estático registrado uma única vez por execução (cache no servidor ou prefixo local)
+    - Parada antecipada: após a saturação dos campos obrigatórios, chunks de baixa
+      relevância são registrados como "Ignorado" e não são enviados ao Gemini
+    - Agendamento por prioridade: petição inicial, sentença e acórdão são enviados
+      primeiro, com até GEMINI_MAX_CONCORRENCIA chamadas simultâneas
+    - Prévia: `ao_previa(resultados_sucesso, visao_consolidada)` é chamado uma vez,
+      assim que os `previa_top_k` chunks de maior prioridade forem concluídos
+    - Logs de chunks gravados em `diretorio_logs` (um diretório por job em análises simultâneas)
+    O log retornado segue a ordem original dos chunks.
     """
-    import re
-    import json
-    import os
-    import time
-
     log_detalhado = []
     total_chunks = len(text_chunks)
 
     # Salvar todos os chunks para debug
-    os.makedirs("logs", exist_ok=True)
+    os.makedirs(diretorio_logs, exist_ok=True)
     for i, chunk in enumerate(text_chunks):
-        with open(f"logs/chunk_{i}.txt", "w", encoding="utf-8") as f:
+        with open(os.path.join(diretorio_logs, f"chunk_{i}.txt"), "w", encoding="utf-8") as f:
             f.write(chunk)
 
-    # Processamento de cada chunk
-    for i, chunk in enumerate(text_chunks):
-        # D) DEBUG DO TEXTO ENVIADO
-        print(f"🔍 Chunk {i+1}: Enviando {len(chunk)} caracteres para Gemini.")
-        print("Primeiros 500 chars do chunk:", chunk[:500])
-
-        if st_progress_bar:
-            st_progress_bar.progress((i + 1) / total_chunks, text=f"Analisando parte {i+1} de {total_chunks}...")
+    # Registra o prompt estático uma única vez para toda a execução
+    cache_proprio = cache_prompt is None
+    if cache_proprio:
+        cache_prompt = CachePromptExtracao(PROMPT_EXTRACAO, MODELO_ANALISE, generation_config).iniciar()
+
+    # Acompanha a saturação dos campos obrigatórios do PJe-Calc
+    if rastreador is None:
+        rastreador = RastreadorSaturacao()
+
+    # Ordem de processamento: chunks de maior valor primeiro
+    ordem, secoes = ordenar_por_prioridade(text_chunks)
+    limite = max_concorrencia()
+    print(f"🗂️ Ordem de processamento por prioridade: {[i + 1 for i in ordem[:10]]}{'...' if total_chunks > 10 else ''}")
+
+    pendentes = list(ordem)
+    em_andamento = {}
+    concluidos = 0
+    previa_enviada = ao_previa is None
+
+    with ThreadPoolExecutor(max_workers=limite) as executor:
+        while pendentes or em_andamento:
+            # Mantém até `limite` chamadas em andamento; a decisão de pular um
+            # chunk é tomada no envio, com a saturação já conhecida até ali
+            while pendentes and len(em_andamento) < limite:
+                i = pendentes.pop(0)
+                chunk = text_chunks[i]
+                if not rastreador.deve_processar(chunk):
+                    print(f"⏭️ Chunk {i+1}: Ignorado (campos obrigatórios já saturados, baixa relevância).")
+                    log_detalhado.append({
+                        "status": "Ignorado",
+                        "chunk": i + 1,
+                        "secao": secoes[i],
+                        "motivo": "Campos obrigatórios já saturados; chunk de baixa relevância"
+                    })
+                    concluidos += 1
+                    continue
+
+                # Montagem do prompt (apenas o chunk quando o prompt estático está em cache)
+                modelo_chunk, prompt_completo = cache_prompt.preparar(chunk)
+                futuro = executor.submit(
+                    propagar_contexto(_extrair_chunk_medido), i, secoes[i], chunk, modelo_chunk, prompt_completo, diretorio_logs
+                )
+                em_andamento[futuro] = i
+
+            if not em_andamento:
+                continue
 
-        # Montagem do prompt
-        prompt_completo = PROMPT_EXTRACAO.strip() + "\n" + chunk.strip()
+            finalizados, _ = wait(list(em_andamento), return_when=FIRST_COMPLETED)
+            for futuro in finalizados:
+                i = em_andamento.pop(futuro)
+                entrada = futuro.result()
+                entrada["secao"] = secoes[i]
+                if entrada["status"] == "Sucesso":
+                    rastreador.registrar(entrada["resultado_recebido"])
+                log_detalhado.append(entrada)
+                concluidos += 1
+
+            if st_progress_bar:
+                st_progress_bar.progress(concluidos / total_chunks, text=f"Analisadas {concluidos} de {total_chunks} partes...")
+
+            # Prévia da consolidação após os chunks de maior prioridade
+            if not previa_enviada and concluidos >= min(previa_top_k, total_chunks):
+                previa_enviada = True
+                sucessos = [e["resultado_recebido"] for e in log_detalhado if e["status"] == "Sucesso"]
+                try:
+                    ao_previa(sucessos, rastreador.visao_consolidada())
+                except Exception as e:
+                    print(f"⚠️ Falha ao gerar a prévia da consolidação: {e}")
 
-        try:
-            resposta = _call_gemini_api(None, prompt_completo)
-            texto_resposta = resposta.text if hasattr(resposta, 'text') else str(resposta)
-            texto_limpo = texto_resposta.strip()
-
-            # A) Tratamento da resposta vazia
-            if not texto_limpo:
-                print(f"❌ Chunk {i+1}: Gemini retornou texto vazio!")
-                # E) Fallback: salva chunk para análise posterior
-                with open(f"logs/fallback_chunk_vazio_{i}.txt", "w", encoding="utf-8") as f:
-                    f.write(chunk)
-                log_detalhado.append({
-                    "status": "Falha",
-                    "chunk": i + 1,
-                    "erro": "Resposta vazia do Gemini",
-                    "resposta_bruta": ""
-                })
-                continue  # pula para o próximo chunk
+    if st_progress_bar and total_chunks:
+        st_progress_bar.progress(1.0, text=f"Analisadas {total_chunks} de {total_chunks} partes.")
 
-            # Limpeza de markdown do retorno Gemini
-            texto_limpo = re.sub(r"^```(?:json)?\s*|```$", "", texto_limpo, flags=re.IGNORECASE | re.MULTILINE).strip()
-            texto_limpo = re.sub(r"^```.*?```$", "", texto_limpo, flags=re.DOTALL | re.MULTILINE).strip()
+    if cache_proprio:
+        cache_prompt.encerrar()
 
-            # Pega só do primeiro '{' para garantir que o JSON começa corretamente
-            if '{' in texto_limpo:
-                texto_limpo = texto_limpo[texto_limpo.find('{'):]
-
-            # Parsing e registro de sucesso/falha
-            try:
-                resultado_json = json.loads(texto_limpo)
-                log_detalhado.append({
-                    "status": "Sucesso",
-                    "chunk": i + 1,
-                    "resultado_recebido": resultado_json
-                })
-            except (json.JSONDecodeError, Exception) as e:
-                print(f"❌ Chunk {i+1}: Erro ao converter para JSON: {e}")
-                print(f"🔎 Chunk {i+1}: Resposta recebida para debug:\n{texto_limpo[:1000]}")
-                log_detalhado.append({
-                    "status": "Falha",
-                    "chunk": i + 1,
-                    "erro": str(e),
-                    "resposta_bruta": texto_limpo
-                })
-
-        except Exception as e:
-            print(f"❌ Chunk {i+1}: Erro geral: {e}")
-            log_detalhado.append({
-                "status": "Falha",
-                "chunk": i + 1,
-                "erro": str(e),
-                "resposta_bruta": "Erro na chamada da API"
-            })
-
-        # Pausa entre chamadas para não sobrecarregar a API
-        time.sleep(1)
+    if rastreador.chunks_ignorados:
+        print(f"⏭️ {rastreador.chunks_ignorados} de {total_chunks} chunks ignorados após a saturação dos campos obrigatórios.")
 
+    # Devolve o log na ordem original dos chunks
+    log_detalhado.sort(key=lambda entrada: entrada["chunk"])
     return log_detalhado
 
-def consolidar_resultados(resultados_parciais_sucesso, rag_context=""):
-    """FASE 2: Consolida, limpa e estrutura os dados usando o contexto RAG."""
+def consolidar_resultados(resultados_parciais_sucesso, rag_context="", diretorio_relatorios=None):
+    """
+    FASE 2: Consolida, limpa e estrutura os dados usando o contexto RAG.
+    O relatório é salvo em `diretorio_relatorios` (padrão: ./relatorios).
+    """
     if not resultados_parciais_sucesso:
         print("⚠️ Nenhum resultado parcial de sucesso foi recebido para consolidação.")
         return None
@@ -621,7 +742,8 @@ def consolidar_resultados(resultados_parciais_sucesso, rag_context=""):
             resultado_final_json["observacoes_gerais"] = "Análise automática do processo. Verifique os detalhes."
             
         # Adaptar o formato se necessário
-        resultado_adaptado = adaptar_formato_para_interface(resultado_final_json)
+        with medir("consolidacao.adaptar"):
+            resultado_adaptado = adaptar_formato_para_interface(resultado_final_json)
         
         # NOVO: Gerar relatório formatado com os dados atuais
         from datetime import datetime
@@ -636,11 +758,14 @@ def consolidar_resultados(resultados_parciais_sucesso, rag_context=""):
         }
         
         # Gerar o relatório formatado
-        relatorio_formatado = gerar_relatorio_formatado(resultado_adaptado)
+        with medir("consolidacao.relatorio") as span:
+            relatorio_formatado = gerar_relatorio_formatado(resultado_adaptado)
+            span.registrar(bytes=len(relatorio_formatado.encode("utf-8")))
         
         # Salvar o relatório em arquivo
         import os
-        diretorio_relatorios = os.path.join(os.getcwd(), "relatorios")
+        if diretorio_relatorios is None:
+            diretorio_relatorios = os.path.join(os.getcwd(), "relatorios")
         os.makedirs(diretorio_relatorios, exist_ok=True)
         
         # Criar nome de arquivo baseado no número do processo (se disponível)
@@ -846,6 +971,22 @@ def adaptar_formato_para_interface(dados):
         except Exception as e:
             print(f"Erro ao calcular tempo de serviço: {e}")
     
+    # Cálculo numérico das verbas pela linha do tempo do contrato (quando há datas e salário)
+    calculo = None
+    try:
+        from calculo_verbas import calcular_verbas_processo, verba_calculada
+        # FGTS já depositado só quando o processo informa (extrato); senão o FGTS fica "a apurar"
+        fgts_depositado = (dados.get("contrato_trabalho") or {}).get("fgts_depositado")
+        calculo = calcular_verbas_processo({
+            "dados_pessoais": {**dados_interface["dados_pessoais"], "fgts_depositado": fgts_depositado},
+            "verbas_pleiteadas": dados.get("pleitos_e_verbas", []) if isinstance(dados.get("pleitos_e_verbas"), list) else [],
+        })
+    except Exception as e:
+        print(f"⚠️ Cálculo numérico das verbas indisponível: {e}")
+    
+    # Itens do cálculo numérico efetivamente pleiteados (chave -> item)
+    itens_pleiteados = {}
+    
     # Mapeia pleitos_e_verbas → verbas_pleiteadas com cálculos específicos
     if "pleitos_e_verbas" in dados and isinstance(dados["pleitos_e_verbas"], list):
         for pleito in dados["pleitos_e_verbas"]:
@@ -964,6 +1105,17 @@ def adaptar_formato_para_interface(dados):
                 "reflexos": reflexos
             }
             
+            # Parâmetros e valor calculados a partir do contrato substituem os estimados
+            item_calculado = verba_calculada(calculo, nome_verba) if calculo else None
+            if item_calculado:
+                for componente in item_calculado.get("componentes", [item_calculado]):
+                    itens_pleiteados.setdefault(componente["chave"], componente)
+                verba_pleiteada["periodo"] = item_calculado["periodo"]
+                verba_pleiteada["percentual_quantidade"] = item_calculado["quantidade"]
+                verba_pleiteada["valor_calculado"] = item_calculado["valor_formatado"]
+                if item_calculado["chave"] == "multa_fgts":
+                    verba_pleiteada["valor_base"] = item_calculado["base_formatada"]
+            
             dados_interface["verbas_pleiteadas"].append(verba_pleiteada)
     
     # Mapeia parametros_calculo → bases_tecnicas_calculo
@@ -990,6 +1142,11 @@ def adaptar_formato_para_interface(dados):
                 tem_fgts = True
                 dados_interface["verbas_fgts"] = verba["periodo"]
     
+    # Memória de cálculo das verbas pleiteadas (exibida junto às fórmulas das bases técnicas)
+    if itens_pleiteados:
+        formulas = dados_interface["bases_tecnicas_calculo"].setdefault("formulas", [])
+        formulas.extend({"verba": item["verba"], "formula": item["memoria"]} for item in itens_pleiteados.values())
+    
     # MAPEIA BLOCOS ESPECÍFICOS DO PJE-CALC - CORRIGIDO COM TODOS OS CAMPOS
     dados_interface["pjecalc_blocos"] = {
         "bloco1_dados_cadastrais": {
@@ -1084,13 +1241,32 @@ def adaptar_formato_para_interface(dados):
             "liquido_devido_reclamante": formatar_valor_br(dados["valores_calculo"].get("valor_liquido", valor_causa * 0.85))
         }
     else:
-        # Usar valores realistas com base no valor da causa
-        valor_total_estimado = valor_causa
-        descontos_estimados = valor_causa * 0.15  # Estimativa aproximada
-        valor_liquido = valor_causa - descontos_estimados
-        
+        # Com o cálculo numérico e as tabelas de índices, atualiza pela ADC 58 as verbas
+        # pleiteadas; senão (ou sem verba pleiteada calculada), usa o valor da causa
+        correcao = None
+        data_ajuizamento = (dados.get("dados_processuais") or {}).get("data_ajuizamento", "")
+        chaves_corrigidas = {chave for chave, item in itens_pleiteados.items() if not item.get("a_apurar")}
+        if chaves_corrigidas and data_ajuizamento:
+            try:
+                from correcao_monetaria import corrigir_calculo
+                correcao = corrigir_calculo(calculo, data_ajuizamento, chaves=chaves_corrigidas)
+                dados_interface["bases_tecnicas_calculo"].setdefault("formulas", []).append(
+                    {"verba": "Correção monetária e juros", "formula": correcao.resumo()}
+                )
+            except Exception as e:
+                print(f"⚠️ Correção monetária indisponível: {e}")
+
+        if correcao is not None:
+            valor_total_estimado = correcao.total_atualizado / 100
+            origem_valor = " (verbas pleiteadas calculadas, atualizadas pela ADC 58)"
+        else:
+            valor_total_estimado = valor_causa
+            origem_valor = " (estimativa baseada no processo)"
+        descontos_estimados = valor_total_estimado * 0.15  # Estimativa aproximada
+        valor_liquido = valor_total_estimado - descontos_estimados
+
         dados_interface["resultado_liquidacao"] = {
-            "valor_bruto_total": formatar_valor_br(valor_total_estimado) + " (estimativa baseada no processo)",
+            "valor_bruto_total": formatar_valor_br(valor_total_estimado) + origem_valor,
             "descontos_ir_inss": formatar_valor_br(descontos_estimados) + " (estimativa aproximada)",
             "liquido_devido_reclamante": formatar_valor_br(valor_liquido) + " (estimativa líquida)"
         }
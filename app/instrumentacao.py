@@ -0,0 +1,239 @@
+# ===================================================================
+# app/instrumentacao.py (TEMPOS POR ETAPA E PERFIL DE EXECUÇÃO)
+#
+# Funcionalidades:
+# - SPANS: `medir("nome")` é um context manager que registra o tempo de
+#   relógio e de CPU (da thread) de um trecho, além de bytes, itens e
+#   atributos livres. Spans aninhados guardam o span pai.
+# - PERFIL DA EXECUÇÃO: `iniciar_perfil(...)` ativa um `PerfilExecucao`
+#   no contexto atual; fora de um perfil, `medir` não registra nada (custo
+#   desprezível). As threads do extrator recebem o contexto do chamador.
+# - PERSISTÊNCIA: Ao final, o perfil é gravado em JSON (um arquivo por
+#   execução) e devolvido junto com o resultado do pipeline.
+# - CASCATA: `grafico_cascata` desenha os spans no tempo (matplotlib) e
+#   `resumo_por_etapa` agrega tempos, bytes e itens por nome de span.
+# ===================================================================
+
+import os
+import json
+import time
+import uuid
+import datetime
+import threading
+import contextvars
+from contextlib import contextmanager
+
+DIR_PERFIS = os.getenv("PERFIS_DIR", os.path.join("export", "perfis"))
+
+_perfil_atual = contextvars.ContextVar("perfil_execucao", default=None)
+_span_atual = contextvars.ContextVar("span_atual", default=None)
+
+
+class Span:
+    """Trecho medido; `registrar` acumula bytes/itens e define atributos durante a medição."""
+
+    __slots__ = ("id", "nome", "pai", "thread", "inicio_ms", "duracao_ms", "cpu_ms", "bytes", "itens", "atributos")
+
+    def __init__(self, nome, pai, inicio_ms, atributos):
+        self.id = uuid.uuid4().hex[:8]
+        self.nome = nome
+        self.pai = pai
+        self.thread = threading.current_thread().name
+        self.inicio_ms = inicio_ms
+        self.duracao_ms = 0.0
+        self.cpu_ms = 0.0
+        self.bytes = 0
+        self.itens = 0
+        self.atributos = atributos
+
+    def registrar(self, bytes=0, itens=0, **atributos):
+        self.bytes += bytes
+        self.itens += itens
+        self.atributos.update(atributos)
+
+    def para_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class _SpanInativo:
+    """Span devolvido fora de um perfil: aceita as mesmas chamadas e não guarda nada."""
+
+    def registrar(self, bytes=0, itens=0, **atributos):
+        pass
+
+
+_SPAN_INATIVO = _SpanInativo()
+
+
+class PerfilExecucao:
+    """Spans de uma execução (thread-safe), com o instante inicial como referência."""
+
+    def __init__(self, nome, inicio=None, spans=None, metadados=None, id_perfil=None):
+        self.id = id_perfil or uuid.uuid4().hex[:12]
+        self.nome = nome
+        self.inicio = inicio or time.time()
+        self.spans = list(spans or [])
+        self.metadados = dict(metadados or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói um perfil gravado (ex: para acrescentar os spans das exportações)."""
+        return cls(dados.get("nome", ""), dados.get("inicio"), dados.get("spans"), dados.get("metadados"), dados.get("id"))
+
+    def instante_ms(self):
+        return (time.time() - self.inicio) * 1000
+
+    def adicionar(self, span):
+        with self._lock:
+            self.spans.append(span.para_dict())
+
+    def para_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["inicio_ms"])
+        fim_ms = max((span["inicio_ms"] + span["duracao_ms"] for span in spans), default=0.0)
+        return {
+            "id": self.id,
+            "nome": self.nome,
+            "inicio": self.inicio,
+            "inicio_iso": datetime.datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+            "duracao_ms": round(fim_ms, 1),
+            "metadados": self.metadados,
+            "spans": spans,
+        }
+
+    def salvar(self, diretorio=None):
+        """Grava o perfil em `diretorio` (padrão: PERFIS_DIR) e retorna o caminho."""
+        diretorio = diretorio or DIR_PERFIS
+        os.makedirs(diretorio, exist_ok=True)
+        momento = datetime.datetime.fromtimestamp(self.inicio).strftime("%Y%m%d_%H%M%S")
+        caminho = os.path.join(diretorio, f"perfil_{momento}_{self.id}.json")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.para_dict(), f, ensure_ascii=False, indent=2, default=str)
+        return caminho
+
+
+@contextmanager
+def medir(nome, **atributos):
+    """Mede um trecho no perfil ativo. Uso: `with medir("ocr.pagina", pagina=3) as span: span.registrar(bytes=n)`."""
+    perfil = _perfil_atual.get()
+    if perfil is None:
+        yield _SPAN_INATIVO
+        return
+    pai = _span_atual.get()
+    span = Span(nome, pai.id if pai is not None else None, perfil.instante_ms(), atributos)
+    token = _span_atual.set(span)
+    inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield span
+    except BaseException as e:
+        span.atributos["erro"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.duracao_ms = round((time.perf_counter() - inicio) * 1000, 3)
+        span.cpu_ms = round((time.thread_time() - inicio_cpu) * 1000, 3)
+        span.inicio_ms = round(span.inicio_ms, 3)
+        _span_atual.reset(token)
+        perfil.adicionar(span)
+
+
+@contextmanager
+def ativar_perfil(perfil):
+    """Torna `perfil` o perfil ativo no contexto atual (sem gravá-lo ao final)."""
+    token_perfil = _perfil_atual.set(perfil)
+    token_span = _span_atual.set(None)
+    try:
+        yield perfil
+    finally:
+        _span_atual.reset(token_span)
+        _perfil_atual.reset(token_perfil)
+
+
+@contextmanager
+def iniciar_perfil(nome, diretorio=None, **metadados):
+    """Cria e ativa um perfil; ao sair, grava o JSON em `diretorio` (padrão: PERFIS_DIR)."""
+    perfil = PerfilExecucao(nome, metadados=metadados)
+    try:
+        with ativar_perfil(perfil):
+            yield perfil
+    finally:
+        try:
+            caminho = perfil.salvar(diretorio)
+            print(f"⏱️ Perfil da execução '{nome}' gravado em {caminho}.")
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar o perfil da execução: {e}")
+
+
+def perfil_ativo():
+    return _perfil_atual.get()
+
+
+def propagar_contexto(funcao):
+    """
+    Envolve `funcao` para rodar, em outra thread, com o perfil e o span do
+    chamador. Chamar uma vez por tarefa: um contexto não pode ser usado por
+    duas threads ao mesmo tempo.
+    """
+    contexto = contextvars.copy_context()
+    return lambda *args, **kwargs: contexto.run(funcao, *args, **kwargs)
+
+
+# --- RELATÓRIOS ---
+
+def resumo_por_etapa(perfil):
+    """Por nome de span: quantidade, tempo total/máximo, CPU, bytes e itens (ordem da primeira ocorrência)."""
+    resumo = {}
+    for span in perfil.get("spans", []):
+        etapa = resumo.setdefault(span["nome"], {
+            "etapa": span["nome"], "spans": 0, "inicio_ms": span["inicio_ms"], "total_ms": 0.0,
+            "max_ms": 0.0, "cpu_ms": 0.0, "bytes": 0, "itens": 0,
+        })
+        etapa["spans"] += 1
+        etapa["total_ms"] += span["duracao_ms"]
+        etapa["max_ms"] = max(etapa["max_ms"], span["duracao_ms"])
+        etapa["cpu_ms"] += span["cpu_ms"]
+        etapa["bytes"] += span["bytes"]
+        etapa["itens"] += span["itens"]
+    linhas = sorted(resumo.values(), key=lambda etapa: etapa["inicio_ms"])
+    for etapa in linhas:
+        for campo in ("inicio_ms", "total_ms", "max_ms", "cpu_ms"):
+            etapa[campo] = round(etapa[campo], 1)
+    return linhas
+
+
+def grafico_cascata(perfil, max_spans=80):
+    """
+    Figura matplotlib com um span por linha (barra do início ao fim, com a
+    CPU sobreposta). Com mais de `max_spans` spans, só os de topo e os mais
+    longos são desenhados, para manter o gráfico legível.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    spans = perfil.get("spans", [])
+    if len(spans) > max_spans:
+        # Mantém os spans de topo e os mais longos, na ordem temporal
+        topo = [span for span in spans if span["pai"] is None]
+        demais = sorted((s for s in spans if s["pai"] is not None), key=lambda s: -s["duracao_ms"])
+        spans = sorted(topo + demais[:max(0, max_spans - len(topo))], key=lambda s: s["inicio_ms"])
+
+    nomes = sorted({span["nome"].split(".")[0] for span in spans})
+    cores = {nome: plt.cm.tab10(indice % 10) for indice, nome in enumerate(nomes)}
+    figura, eixo = plt.subplots(figsize=(10, max(2.5, 0.28 * len(spans) + 1)))
+    for linha, span in enumerate(spans):
+        inicio, duracao = span["inicio_ms"] / 1000, span["duracao_ms"] / 1000
+        cor = cores[span["nome"].split(".")[0]]
+        eixo.barh(linha, duracao, left=inicio, color=cor, alpha=0.45, height=0.8)
+        eixo.barh(linha, min(span["cpu_ms"] / 1000, duracao), left=inicio, color=cor, height=0.35)
+    eixo.set_yticks(range(len(spans)))
+    eixo.set_yticklabels([
+        f"{span['nome']}" + (f" #{span['atributos']['chunk']}" if "chunk" in span["atributos"] else "")
+        for span in spans
+    ], fontsize=7)
+    eixo.invert_yaxis()
+    eixo.set_xlabel("segundos desde o início (barra fina = CPU)")
+    eixo.set_title(f"Perfil da execução - {perfil.get('nome', '')} ({perfil.get('duracao_ms', 0) / 1000:.1f} s)")
+    eixo.grid(axis="x", alpha=0.3)
+    figura.tight_layout()
+    return figura
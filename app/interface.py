@@ -15,11 +15,14 @@ import json
 import traceback
 import pandas as pd
 import time
-from ocr import aplicar_ocr
-from extrator import dividir_em_chunks, extrair_dados_parciais, consolidar_resultados
-from xml_generator import gerar_xml_pjecalc
-from exportador_docx import gerar_docx_resumo
-from exportadores_completo import gerar_excel_processo
+from contextlib import nullcontext
+from jobs import obter_gerenciador
+from area_trabalho import novo_id_sessao, salvar_upload, limpar_expirados
+from cache_casos import obter_cache_casos, versao_pipeline
+from cache_exportacao import obter_exportacao, exportacao_disponivel
+from instrumentacao import PerfilExecucao, ativar_perfil, grafico_cascata, resumo_por_etapa
+from metricas import iniciar_servidor_metricas
+from perfilador import definir_modo, modo_atual, modos_disponiveis, perfilar_execucao
 
 
 # A importação foi ajustada para usar a função de status correta
@@ -36,6 +39,12 @@ configure_gemini_auth()
 st.set_page_config(page_title="PJe-Calc Automático com IA", layout="wide")
 st.cache_data.clear()
 
+# Intervalo (segundos) entre as consultas ao job de análise em background
+INTERVALO_CONSULTA_JOB = 2
+
+# Endpoint /metrics do processo do Streamlit (sobe uma única vez, nos reruns não faz nada)
+iniciar_servidor_metricas()
+
 
 
 
@@ -53,152 +62,82 @@ def inicializar_estado():
         st.session_state.error_details = None
     if "pagina_atual" not in st.session_state:
         st.session_state.pagina_atual = "Analisar Processo"
+    if "sessao_id" not in st.session_state:
+        st.session_state.sessao_id = novo_id_sessao()
+    if "caminho_pdf" not in st.session_state:
+        st.session_state.caminho_pdf = None
+    if "job_id" not in st.session_state:
+        # Recupera o job após uma atualização do navegador (id na URL)
+        job_id = st.experimental_get_query_params().get("job", [None])[0]
+        st.session_state.job_id = job_id
+        if job_id:
+            st.session_state.estado_app = "processando"
 
 def reiniciar_analise():
     """Reseta a aplicação para a tela de análise inicial."""
-    keys_to_clear = ["estado_app", "dados_completos", "log_detalhado", "error_message", "error_details"]
+    keys_to_clear = ["estado_app", "dados_completos", "log_detalhado", "error_message", "error_details", "avisos_analise",
+                     "caminho_pdf", "hash_pdf", "resultado_do_cache", "perfil_execucao",
+                     "perfilador_execucao", "perfilador_verbas"]
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
-    
-    temp_pdf_path = os.path.join("export", "temp.pdf")
-    if os.path.exists(temp_pdf_path):
-        os.remove(temp_pdf_path)
-    
+
+    # O PDF fica no diretório da sessão e é removido pela limpeza automática
+    st.session_state.job_id = None
+    st.experimental_set_query_params()
     inicializar_estado()
     st.session_state.pagina_atual = "Analisar Processo"
 
 # --- FUNÇÃO DE VERIFICAÇÃO REMOVIDA ---
 # A função `verificar_conexao_rag` foi removida pois causava o erro de cache.
 
-def executar_analise_completa(caminho_pdf, rag_is_active):
-    """Orquestra todo o processo: OCR, RAG, Extração e Consolidação."""
-    try:
-        # Etapa 1: OCR (sem alterações)
-        with st.spinner("🔍 Etapa 1/4: A ler e a preparar o documento..."):
-            texto_processo = aplicar_ocr(caminho_pdf)
-            # ADICIONADO: Armazenar o texto para uso na análise de verbas
-            st.session_state.texto_processo = texto_processo
-            chunks = dividir_em_chunks(texto_processo)
-        st.success(f"✅ Documento preparado e dividido em {len(chunks)} partes.")
-
-        # Etapa 2: Consulta ao RAG (se disponível) - MODIFICAÇÃO: TRATAMENTO DE ERRO
-        contexto_rag = ""
-        if rag_is_active:
-            try:
-                with st.spinner("🧠 Etapa 2/4: A consultar a base de conhecimento (RAG)..."):
-                    # Limitando o tamanho do texto para consulta ao RAG
-                    texto_consulta = texto_processo[:5000] if len(texto_processo) > 5000 else texto_processo
-                    contexto_rag = consultar_rag(texto_consulta, n_results=3)  # Limitado a 3 resultados
-                    # Limitando tamanho do contexto RAG para evitar sobrecarga
-                    if contexto_rag and len(contexto_rag) > 8000:
-                        contexto_rag = contexto_rag[:8000] + "... (truncado para melhor desempenho)"
-                st.success("✅ Consulta à base de conhecimento finalizada.")
-            except Exception as e:
-                st.warning(f"⚠️ Erro ao consultar a base de conhecimento: {str(e)}. A análise prosseguirá sem contexto adicional.")
-                contexto_rag = ""
-        else:
-            st.warning("⚠️ Base de conhecimento (RAG) indisponível. A análise prosseguirá sem contexto adicional.", icon="🔌")
-
-        # Etapa 3: Extração de Dados Parciais - MODIFICAÇÃO: RESILIÊNCIA MELHORADA
-        progresso_extracaao = st.progress(0, text="A analisar parte 1...")
-        with st.spinner(f"🤖 Etapa 3/4: A extrair dados de cada uma das {len(chunks)} partes..."):
-            log_detalhado_chunks = extrair_dados_parciais(chunks, progresso_extracaao)
-            st.session_state.log_detalhado = log_detalhado_chunks
-            
-            resultados_parciais_sucesso = [
-                item.get("resultado_recebido")
-                for item in log_detalhado_chunks
-                if isinstance(item, dict) and item.get("status") == "Sucesso"
-            ]
-            
-            # MODIFICAÇÃO: Feedback detalhado sobre falhas
-            sucessos = len(resultados_parciais_sucesso)
-            total = len(log_detalhado_chunks)
-            falhas = total - sucessos
-            
-            if not resultados_parciais_sucesso:
-                # Mostrar detalhes dos erros para diagnóstico
-                st.error(f"❌ Falha na extração de dados. Todas as {total} partes falharam.")
-                
-                with st.expander("Detalhes dos erros (para diagnóstico técnico)"):
-                    for i, item in enumerate(log_detalhado_chunks):
-                        if item.get("status") != "Sucesso":
-                            st.markdown(f"**Falha na parte {i+1}:**")
-                            st.code(str(item.get("erro", "Erro desconhecido")))
-                            if "resposta_bruta" in item:
-                                st.text(str(item.get("resposta_bruta", ""))[:500] + "..." if len(str(item.get("resposta_bruta", ""))) > 500 else item.get("resposta_bruta", ""))
-                
-                # OPÇÃO DE CONTINUAR OU TENTAR NOVAMENTE
-                if st.button("🔄 Tentar novamente sem RAG", key="retry_without_rag"):
-                    st.warning("Reiniciando análise sem usar base de conhecimento...")
-                    # Simula um processamento sem RAG na próxima iteração
-                    st.session_state['tentativa_sem_rag'] = True
-                    st.rerun()
-                    
-                if st.button("⚠️ Forçar continuação com dados incompletos", key="force_continue"):
-                    # Tenta continuar mesmo sem sucessos - usando dados simulados mínimos
-                    st.warning("Tentando prosseguir com processamento resiliente (não recomendado)...")
-                    resultados_parciais_sucesso = [
-                        {"documento": "processo trabalhista", "observacoes": "Dados limitados devido a falhas de extração."}
-                    ]
-                else:
-                    st.warning("Tentando continuar mesmo com falhas totais. Dados simulados mínimos serão gerados.")
-                    resultados_parciais_sucesso = [
-                        {"documento": "processo trabalhista", "observacoes": "Falha geral na extração. Dados simulados adicionados."}
-                    ]
-            elif falhas > 0:
-                # Mostra estatísticas de sucesso/falha
-                print(f"⚠️ LOG: {falhas} de {total} partes tiveram erro de processamento. Continuando com {sucessos} partes válidas.")
-            else:
-                print(f"✅ Extração de dados parciais concluída com sucesso para todas as {total} partes.")
+def acompanhar_job(job_id):
+    """
+    Acompanha um job de análise em background. A página é reexecutada a
+    cada poucos segundos enquanto o job roda; ao final, o resultado é
+    carregado no estado da sessão.
+    """
+    gerenciador = obter_gerenciador()
+    job = gerenciador.obter(job_id)
+    if job is None:
+        st.session_state.estado_app = "erro"
+        st.session_state.error_message = "Análise não encontrada. Por favor, faça o upload novamente."
+        st.session_state.error_details = None
+        return
 
-        # Etapa 4: Consolidação com Inteligência Aumentada
-        with st.spinner("✨ Etapa 4/4: A consolidar dados com IA e a gerar resumo..."):
-            try:
-                dados_completos = consolidar_resultados(resultados_parciais_sucesso, contexto_rag)
-                if not dados_completos or not isinstance(dados_completos, dict):
-                    st.warning("⚠️ A consolidação produziu um resultado inesperado. Tentando formato alternativo...")
-                    # Tenta criar dados mínimos para evitar quebrar a aplicação
-                    dados_completos = {
-                        "observacoes_gerais": "Consolidação parcial. Os dados podem estar incompletos devido a limitações no processamento.",
-                        "dados_pessoais": {"reclamante": "Não identificado", "reclamada": "Não identificado"},
-                        "informacoes_pjecalc": {"numero_processo": "Não identificado"},
-                        "verbas_pleiteadas": [],
-                        "bases_tecnicas_calculo": {},
-                        "resultado_liquidacao": {}
-                    }
-            except Exception as e:
-                st.error(f"Erro na consolidação final: {str(e)}")
-                # Tenta criar dados mínimos para evitar quebrar a aplicação
-                dados_completos = {
-                    "observacoes_gerais": f"Não foi possível processar o documento completamente. Erro: {str(e)}",
-                    "dados_pessoais": {},
-                    "informacoes_pjecalc": {},
-                    "verbas_pleiteadas": [],
-                    "bases_tecnicas_calculo": {},
-                    "resultado_liquidacao": {}
-                }
-                
-            st.session_state.dados_completos = dados_completos
-        st.success("🎉 Análise finalizada!")
+    if job["status"] == "concluido":
+        resultado = gerenciador.resultado(job_id) or {}
+        st.session_state.texto_processo = resultado.get("texto_processo", "")
+        st.session_state.log_detalhado = resultado.get("log_detalhado", [])
+        st.session_state.dados_completos = resultado.get("dados_completos")
+        st.session_state.avisos_analise = resultado.get("avisos", [])
+        st.session_state.perfil_execucao = resultado.get("perfil")
+        st.session_state.perfilador_execucao = resultado.get("perfilador")
         st.session_state.estado_app = "finalizado"
+        return
 
-    except Exception as e:
+    if job["status"] == "erro":
         st.session_state.estado_app = "erro"
-        st.session_state.error_message = f"Ocorreu um erro durante o processamento: {str(e)}"
-        st.session_state.error_details = traceback.format_exc()
-        
-        # Opção para tentar novamente sem o RAG
-        if "A extração de dados parciais falhou" in str(e) and not st.session_state.get('tentativa_sem_rag', False):
-            st.info("💡 Dica: O erro pode estar relacionado à integração com o RAG (base de conhecimento).")
-            if st.button("🔄 Tentar novamente sem usar o RAG"):
-                st.session_state['tentativa_sem_rag'] = True
-                st.rerun()
+        st.session_state.error_message = job.get("mensagem") or "Ocorreu um erro durante o processamento."
+        st.session_state.error_details = job.get("erro")
+        return
+
+    # Pendente ou em execução: mostra o progresso e consulta novamente
+    st.progress(min(max(job["progresso"] or 0.0, 0.0), 1.0), text=f"🤖 {job['mensagem'] or 'Processando...'}")
+    st.caption(f"A análise continua em segundo plano (job {job_id[:8]}). Pode atualizar a página sem perder o progresso.")
+    if job.get("previa"):
+        with st.expander("👀 Prévia (partes mais relevantes já analisadas)", expanded=False):
+            st.json(job["previa"])
+    time.sleep(INTERVALO_CONSULTA_JOB)
+    st.rerun()
 
 def exibir_resultados_formatados():
     """Mostra os resultados finais de forma estruturada para o PJe-Calc."""
     st.header("✅ Análise Concluída", divider="rainbow")
+
+    # Avisos registrados pelo pipeline em background (RAG, falhas parciais, partes ignoradas)
+    for aviso in st.session_state.get("avisos_analise") or []:
+        st.warning(f"⚠️ {aviso}")
     
     dados = st.session_state.dados_completos
     
@@ -276,17 +215,22 @@ def exibir_resultados_formatados():
                 "Verbas Detalhadas": dados.get("verbas_pleiteadas", [])
             }
             
-            # Realizar análise automática
-            resultado_analise = analisar_processo_trabalhista(
-                st.session_state.texto_processo, 
-                dados_planilha
-            )
-            
-            # Gerar quadro de cálculo inteligente
-            quadro_calculo_completo = gerar_quadro_calculo_completo(
-                st.session_state.texto_processo,
-                dados
-            )
+            # Com o perfilador ligado, a primeira análise de verbas da sessão é perfilada
+            perfilar_verbas = bool(modo_atual()) and not st.session_state.get("perfilador_verbas")
+            with (perfilar_execucao("analise_verbas") if perfilar_verbas else nullcontext()) as sessao_perfilador:
+                # Realizar análise automática
+                resultado_analise = analisar_processo_trabalhista(
+                    st.session_state.texto_processo, 
+                    dados_planilha
+                )
+                
+                # Gerar quadro de cálculo inteligente
+                quadro_calculo_completo = gerar_quadro_calculo_completo(
+                    st.session_state.texto_processo,
+                    dados
+                )
+            if sessao_perfilador is not None:
+                st.session_state.perfilador_verbas = sessao_perfilador.resumo
             
             # Exibir resultado da análise
             st.markdown(resultado_analise, unsafe_allow_html=True)
@@ -344,38 +288,71 @@ def exibir_resultados_formatados():
 
 
     st.header("⬇️ Exportar Resultados", divider="rainbow")
-    try:
-        # Importar as novas funções de exportação
-        from json_generator import gerar_json_bytes
-        from xml_generator import gerar_xml_pjecalc
-        
-        # Gerar arquivos de exportação
-        json_data = gerar_json_bytes(dados)
-        caminho_xml = os.path.join("export", "saida_pjecalc.xml")
-        gerar_xml_pjecalc(dados, caminho_xml)
-        caminho_docx = os.path.join("export", "resumo_processo.docx")
-        gerar_docx_resumo(dados, caminho_docx)
-
-        # Modificado para 4 colunas
-        col1_exp, col2_exp, col3_exp, col4_exp = st.columns(4)
-        with col1_exp:
-            st.download_button("📥 Baixar JSON", json_data, "resumo.json", "application/json", use_container_width=True)
-        with col2_exp:
-            with open(caminho_xml, "rb") as f:
-                st.download_button("📥 Baixar XML PJe-Calc", f, "saida_pjecalc.xml", "application/xml", use_container_width=True)
-        with col3_exp:
-            with open(caminho_docx, "rb") as f:
-                st.download_button("📄 Baixar Resumo Word", f, "resumo.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", use_container_width=True)
-        with col4_exp:
-            # Novo botão para Excel com análise de verbas
-            with st.spinner("Gerando planilha Excel..."):
-                texto_atual = st.session_state.get("texto_processo", "")
-                excel_data = gerar_excel_processo(dados, texto_atual)
-            st.download_button("📊 Baixar Excel", excel_data, "processo_resumo.xlsx", 
-                              "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", 
-                              use_container_width=True)
-    except Exception as e:
-        st.error(f"Ocorreu um erro ao gerar os ficheiros para download: {e}")
+    # As exportações geradas nesta sessão entram no perfil da análise
+    perfil = PerfilExecucao.de_dict(st.session_state.perfil_execucao) if st.session_state.get("perfil_execucao") else None
+    with (ativar_perfil(perfil) if perfil is not None else nullcontext()):
+        try:
+            # Exportações memorizadas pelo hash dos dados: geradas uma única vez
+            # e servidas da memória nos reruns (inclusive nos cliques de download)
+            texto_atual = st.session_state.get("texto_processo", "")
+
+            col1_exp, col2_exp, col3_exp, col4_exp = st.columns(4)
+            with col1_exp:
+                st.download_button("📥 Baixar JSON", obter_exportacao("json", dados), "resumo.json", "application/json", use_container_width=True)
+            with col2_exp:
+                st.download_button("📥 Baixar XML PJe-Calc", obter_exportacao("xml", dados), "saida_pjecalc.xml", "application/xml", use_container_width=True)
+            with col3_exp:
+                st.download_button("📄 Baixar Resumo Word", obter_exportacao("docx", dados), "resumo.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", use_container_width=True)
+            with col4_exp:
+                # Excel (com análise de verbas) é o artefato mais caro: gerado só quando solicitado
+                if exportacao_disponivel("excel", dados, texto_atual) or st.button("📊 Preparar Excel", use_container_width=True):
+                    with st.spinner("Gerando planilha Excel..."):
+                        excel_data = obter_exportacao("excel", dados, texto_atual)
+                    st.download_button("📊 Baixar Excel", excel_data, "processo_resumo.xlsx", 
+                                      "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", 
+                                      use_container_width=True)
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao gerar os ficheiros para download: {e}")
+
+    if perfil is not None:
+        st.session_state.perfil_execucao = perfil.para_dict()
+        exibir_perfil_execucao(st.session_state.perfil_execucao)
+    for resumo_perfilador in (st.session_state.get("perfilador_execucao"), st.session_state.get("perfilador_verbas")):
+        if resumo_perfilador:
+            exibir_perfilador(resumo_perfilador)
+
+
+def exibir_perfil_execucao(perfil):
+    """Cascata dos tempos da análise (por etapa e por chunk) e resumo agregado."""
+    with st.expander(f"⏱️ Perfil da execução ({perfil.get('duracao_ms', 0) / 1000:.1f} s)", expanded=False):
+        if not perfil.get("spans"):
+            st.info("Nenhuma etapa medida nesta execução.")
+            return
+        try:
+            st.pyplot(grafico_cascata(perfil))
+        except Exception as e:
+            st.warning(f"Não foi possível desenhar a cascata: {e}")
+        st.dataframe(pd.DataFrame(resumo_por_etapa(perfil)), use_container_width=True, hide_index=True)
+        st.download_button(
+            "📥 Baixar perfil (JSON)", json.dumps(perfil, ensure_ascii=False, indent=2, default=str),
+            f"perfil_{perfil.get('id', 'execucao')}.json", "application/json",
+        )
+
+def exibir_perfilador(resumo):
+    """Funções mais quentes de uma execução perfilada e download do artefato do perfilador."""
+    titulo = f"🔬 Perfilador - {resumo.get('nome', '')} ({resumo.get('modo', '')}, {resumo.get('duracao_s', 0):.1f} s)"
+    with st.expander(titulo, expanded=False):
+        funcoes = resumo.get("funcoes_quentes") or []
+        if not funcoes:
+            st.info("Nenhuma amostra registrada nesta execução.")
+        else:
+            st.caption(f"{len(funcoes)} funções com maior tempo próprio, somando {resumo.get('threads', 0)} thread(s).")
+            st.dataframe(pd.DataFrame(funcoes), use_container_width=True, hide_index=True)
+        for caminho in resumo.get("arquivos", []):
+            if os.path.exists(caminho):
+                with open(caminho, "rb") as f:
+                    st.download_button(f"📥 Baixar {os.path.basename(caminho)}", f.read(), os.path.basename(caminho),
+                                       key=f"perfilador_{caminho}")
 
 # --- PÁGINAS DA APLICAÇÃO ---
 
@@ -390,6 +367,18 @@ def pagina_analise(rag_is_active):
             st.rerun()
     
     if st.session_state.estado_app == "finalizado":
+        if st.session_state.get("resultado_do_cache"):
+            col_cache, col_reprocessar = st.columns([3, 1])
+            with col_cache:
+                st.info("⚡ Este PDF já havia sido analisado com a versão atual do pipeline. Resultado recuperado do cache.")
+            with col_reprocessar:
+                if st.button("🔄 Reprocessar (ignorar cache)", use_container_width=True):
+                    # Invalida a entrada e envia o PDF novamente para análise
+                    obter_cache_casos().invalidar(st.session_state.hash_pdf, versao_pipeline(rag_is_active))
+                    st.session_state.resultado_do_cache = False
+                    st.session_state.job_id = None
+                    st.session_state.estado_app = "processando"
+                    st.rerun()
         exibir_resultados_formatados()
     elif st.session_state.estado_app == "erro":
         st.error(st.session_state.error_message, icon="🚨")
@@ -397,22 +386,38 @@ def pagina_analise(rag_is_active):
             with st.expander("Ver detalhes técnicos do erro"):
                 st.code(st.session_state.error_details, language="python")
     elif st.session_state.estado_app == "processando":
-        caminho_temp_pdf = os.path.join("export", "temp.pdf")
-        if os.path.exists(caminho_temp_pdf):
-             executar_analise_completa(caminho_temp_pdf, rag_is_active)
-             st.rerun()
-        else:
-            st.error("Ficheiro PDF não encontrado. Por favor, faça o upload novamente.")
-            reiniciar_analise()
-            st.rerun()
+        if not st.session_state.job_id:
+            caminho_pdf = st.session_state.caminho_pdf
+            if not caminho_pdf or not os.path.exists(caminho_pdf):
+                st.error("Ficheiro PDF não encontrado. Por favor, faça o upload novamente.")
+                reiniciar_analise()
+                st.rerun()
+            # A análise roda em background; a página apenas acompanha o job
+            st.session_state.job_id = obter_gerenciador().enviar(caminho_pdf, rag_is_active)
+            st.experimental_set_query_params(job=st.session_state.job_id)
+        acompanhar_job(st.session_state.job_id)
+        st.rerun()
     elif st.session_state.estado_app == "inicial":
         pdf_file = st.file_uploader(label="**Faça o upload do processo (PDF)**", type="pdf")
         if pdf_file:
-            os.makedirs("export", exist_ok=True)
-            caminho_temp_pdf = os.path.join("export", "temp.pdf")
-            with open(caminho_temp_pdf, "wb") as f:
-                f.write(pdf_file.getbuffer())
-            st.session_state.estado_app = "processando"
+            # Cada sessão grava o PDF no próprio diretório, nomeado pelo SHA-256 do conteúdo
+            caminho_pdf, hash_pdf = salvar_upload(st.session_state.sessao_id, bytes(pdf_file.getbuffer()))
+            st.session_state.caminho_pdf = caminho_pdf
+            st.session_state.hash_pdf = hash_pdf
+
+            # Mesmo PDF já analisado com a mesma versão do pipeline: exibe o resultado na hora
+            resultado = obter_cache_casos().obter(hash_pdf, versao_pipeline(rag_is_active))
+            if resultado:
+                st.session_state.texto_processo = resultado.get("texto_processo", "")
+                st.session_state.log_detalhado = resultado.get("log_detalhado", [])
+                st.session_state.dados_completos = resultado.get("dados_completos")
+                st.session_state.avisos_analise = resultado.get("avisos", [])
+                st.session_state.perfil_execucao = resultado.get("perfil")
+                st.session_state.perfilador_execucao = resultado.get("perfilador")
+                st.session_state.resultado_do_cache = True
+                st.session_state.estado_app = "finalizado"
+            else:
+                st.session_state.estado_app = "processando"
             st.rerun()
 
 def pagina_treinamento(rag_is_active: bool):
@@ -755,6 +760,8 @@ def main():
     
     # Garantir que o diretório de exportação existe
     os.makedirs("export", exist_ok=True)
+    # Remove diretórios de sessões/jobs expirados (no máximo a cada 15 minutos)
+    limpar_expirados()
     
     with st.sidebar:
         st.header("Navegação")
@@ -778,6 +785,24 @@ def main():
             st.error("RAG Desconectado", icon="🔌")
             st.caption(rag_status.get("message", "Falha na conexão."))
 
+        # Cache de resultados por PDF (invalidação manual)
+        with st.expander("⚡ Cache de processos"):
+            cache_casos = obter_cache_casos()
+            stats_cache = cache_casos.estatisticas()
+            st.caption(f"{stats_cache['entradas']} processo(s) em cache · {stats_cache['bytes'] / 1024:.0f} KB · {stats_cache['acessos']} reutilização(ões)")
+            if st.button("🧹 Limpar cache de processos", use_container_width=True):
+                removidos = cache_casos.limpar()
+                st.success(f"{removidos} entrada(s) removida(s) do cache.")
+
+        # Perfilador das análises (administração): vale para todo o servidor
+        with st.expander("🔬 Perfilador (administração)"):
+            opcoes = ["desligado"] + modos_disponiveis()
+            atual = modo_atual() or "desligado"
+            escolhido = st.selectbox("Modo", opcoes, index=opcoes.index(atual), key="modo_perfilador")
+            if escolhido != atual:
+                definir_modo("" if escolhido == "desligado" else escolhido)
+            st.caption("Vale para as próximas análises de todas as sessões. Resultados servidos do cache não são perfilados.")
+
         st.info("Projeto desenvolvido para automatizar a análise de processos trabalhistas.")
 
     # A variável agora reflete o estado real da conexão
@@ -0,0 +1,257 @@
+# ===================================================================
+# app/jobs.py (EXECUÇÃO DAS ANÁLISES EM BACKGROUND)
+#
+# Funcionalidades:
+# - TABELA PERSISTENTE: Cada análise vira um job em SQLite (status,
+#   progresso, mensagem, prévia, resultado e erro), que sobrevive aos
+#   reruns do Streamlit e à atualização do navegador.
+# - POOL DE THREADS: O pipeline roda fora da thread do script, com até
+#   JOBS_MAX_WORKERS análises simultâneas.
+# - RETOMADA: Jobs que estavam pendentes ou em execução quando o servidor
+#   caiu são reenfileirados na inicialização.
+# - MÉTRICAS: Profundidade de cada fila por status e duração dos jobs no
+#   endpoint /metrics.
+# ===================================================================
+
+import os
+import json
+import uuid
+import time
+import weakref
+import sqlite3
+import datetime
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import metricas
+
+CAMINHO_DB_JOBS = os.getenv("JOBS_DB", os.path.join("export", "jobs.sqlite3"))
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+
+# Status possíveis de um job
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+# --- SINGLETON ---
+_gerenciador = None
+_lock_gerenciador = threading.Lock()
+
+# Gerenciadores vivos no processo (interface e API usam bancos separados)
+_gerenciadores_ativos = weakref.WeakSet()
+_DURACAO_JOB = metricas.histograma(
+    "job_duracao_segundos", "Duração da execução dos jobs de análise", ("resultado",),
+    baldes=(10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+
+
+def _agora():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class GerenciadorJobs:
+    """Fila de análises em background com estado persistido em SQLite."""
+
+    def __init__(self, caminho_db=CAMINHO_DB_JOBS, max_workers=JOBS_MAX_WORKERS):
+        self.caminho_db = caminho_db
+        diretorio = os.path.dirname(caminho_db)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job_analise")
+        self._criar_tabela()
+        _gerenciadores_ativos.add(self)
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho_db, timeout=30)
+        conexao.row_factory = sqlite3.Row
+        return conexao
+
+    def _criar_tabela(self):
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    progresso REAL NOT NULL DEFAULT 0,
+                    mensagem TEXT,
+                    caminho_pdf TEXT NOT NULL,
+                    rag_ativo INTEGER NOT NULL DEFAULT 0,
+                    previa TEXT,
+                    resultado TEXT,
+                    erro TEXT,
+                    criado_em TEXT NOT NULL,
+                    iniciado_em TEXT,
+                    finalizado_em TEXT
+                )
+            """)
+
+    def _atualizar(self, job_id, **campos):
+        colunas = ", ".join(f"{coluna} = ?" for coluna in campos)
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(f"UPDATE jobs SET {colunas} WHERE id = ?", (*campos.values(), job_id))
+
+    def enviar(self, caminho_pdf, rag_ativo, job_id=None):
+        """Registra um novo job (com o id informado ou um novo) e o coloca na fila. Retorna o id do job."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(
+                "INSERT INTO jobs (id, status, progresso, mensagem, caminho_pdf, rag_ativo, criado_em) "
+                "VALUES (?, ?, 0, ?, ?, ?, ?)",
+                (job_id, PENDENTE, "Aguardando na fila...", caminho_pdf, int(bool(rag_ativo)), _agora()),
+            )
+        self._executor.submit(self._executar, job_id)
+        print(f"📥 Job {job_id} enfileirado para {caminho_pdf}.")
+        return job_id
+
+    def registrar_concluido(self, caminho_pdf, rag_ativo, resultado, mensagem="Resultado recuperado do cache.",
+                            job_id=None):
+        """Registra como concluído um job cujo resultado já existe (ex: cache de casos). Retorna o id do job."""
+        job_id = job_id or uuid.uuid4().hex
+        agora = _agora()
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(
+                "INSERT INTO jobs (id, status, progresso, mensagem, caminho_pdf, rag_ativo, resultado, "
+                "criado_em, iniciado_em, finalizado_em) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, CONCLUIDO, mensagem, caminho_pdf, int(bool(rag_ativo)),
+                 json.dumps(resultado, ensure_ascii=False, default=str), agora, agora, agora),
+            )
+        return job_id
+
+    def obter(self, job_id):
+        """Retorna o estado do job (sem o resultado completo) ou None."""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT id, status, progresso, mensagem, caminho_pdf, rag_ativo, previa, erro, "
+                "criado_em, iniciado_em, finalizado_em FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if linha is None:
+            return None
+        job = dict(linha)
+        job["previa"] = json.loads(job["previa"]) if job["previa"] else None
+        return job
+
+    def resultado(self, job_id):
+        """Retorna o resultado do pipeline de um job concluído ou None."""
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT resultado FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if linha is None or not linha["resultado"]:
+            return None
+        return json.loads(linha["resultado"])
+
+    def listar(self, limite=50):
+        """Lista os jobs mais recentes."""
+        with self._conectar() as conexao:
+            linhas = conexao.execute(
+                "SELECT id, status, progresso, mensagem, criado_em, finalizado_em FROM jobs "
+                "ORDER BY criado_em DESC LIMIT ?",
+                (limite,),
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def contar_por_status(self):
+        """Quantidade de jobs em cada status."""
+        with self._conectar() as conexao:
+            linhas = conexao.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status").fetchall()
+        return {linha["status"]: linha["total"] for linha in linhas}
+
+    def retomar_pendentes(self):
+        """Reenfileira jobs interrompidos (pendentes ou em execução) por um reinício do servidor."""
+        with self._conectar() as conexao:
+            linhas = conexao.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY criado_em", (PENDENTE, EXECUTANDO)
+            ).fetchall()
+        for linha in linhas:
+            self._atualizar(linha["id"], status=PENDENTE, progresso=0, mensagem="Retomado após reinício do servidor...")
+            self._executor.submit(self._executar, linha["id"])
+        if linhas:
+            print(f"🔁 {len(linhas)} job(s) interrompido(s) reenfileirado(s).")
+        return len(linhas)
+
+    def _executar(self, job_id):
+        """Roda o pipeline de um job e grava progresso, prévia e resultado."""
+        from pipeline import executar_pipeline
+        from area_trabalho import diretorio_job
+
+        job = self.obter(job_id)
+        if job is None:
+            return
+        self._atualizar(job_id, status=EXECUTANDO, iniciado_em=_agora(), mensagem="Iniciando análise...")
+
+        def progresso(fracao, mensagem):
+            self._atualizar(job_id, progresso=round(float(fracao), 4), mensagem=mensagem)
+
+        def ao_previa(resultados_parciais, visao_consolidada):
+            self._atualizar(job_id, previa=json.dumps(visao_consolidada, ensure_ascii=False, default=str))
+
+        inicio = time.perf_counter()
+        try:
+            resultado = executar_pipeline(
+                job["caminho_pdf"], bool(job["rag_ativo"]), progresso, ao_previa,
+                diretorio_trabalho=diretorio_job(job_id),
+            )
+            self._armazenar_no_cache(job, resultado)
+            self._atualizar(
+                job_id,
+                status=CONCLUIDO,
+                progresso=1.0,
+                mensagem="Análise finalizada!",
+                resultado=json.dumps(resultado, ensure_ascii=False, default=str),
+                finalizado_em=_agora(),
+            )
+            _DURACAO_JOB.observar(time.perf_counter() - inicio, resultado="sucesso")
+            print(f"✅ Job {job_id} concluído.")
+        except Exception as e:
+            _DURACAO_JOB.observar(time.perf_counter() - inicio, resultado="erro")
+            traceback.print_exc()
+            self._atualizar(
+                job_id,
+                status=ERRO,
+                mensagem=f"Ocorreu um erro durante o processamento: {e}",
+                erro=traceback.format_exc(),
+                finalizado_em=_agora(),
+            )
+
+    def _armazenar_no_cache(self, job, resultado):
+        """Guarda o resultado no cache de casos quando ao menos uma parte foi extraída com sucesso."""
+        from cache_casos import obter_cache_casos, versao_pipeline, hash_arquivo
+
+        if not any(item.get("status") == "Sucesso" for item in resultado.get("log_detalhado", [])):
+            return
+        try:
+            obter_cache_casos().salvar(
+                hash_arquivo(job["caminho_pdf"]), versao_pipeline(bool(job["rag_ativo"])), resultado
+            )
+        except Exception as e:
+            print(f"⚠️ Não foi possível armazenar o resultado no cache de casos: {e}")
+
+
+def obter_gerenciador():
+    """Retorna o gerenciador de jobs do processo, criando-o (e retomando jobs) na primeira chamada."""
+    global _gerenciador
+    if _gerenciador is not None:
+        return _gerenciador
+    with _lock_gerenciador:
+        if _gerenciador is None:
+            gerenciador = GerenciadorJobs()
+            gerenciador.retomar_pendentes()
+            _gerenciador = gerenciador
+    return _gerenciador
+
+
+def _coletar_metricas():
+    amostras = []
+    for gerenciador in list(_gerenciadores_ativos):
+        contagem = gerenciador.contar_por_status()
+        fila = os.path.splitext(os.path.basename(gerenciador.caminho_db))[0]
+        amostras.extend(
+            ({"fila": fila, "status": status}, contagem.get(status, 0))
+            for status in (PENDENTE, EXECUTANDO, CONCLUIDO, ERRO)
+        )
+    return [("jobs", "gauge", "Jobs por fila e status (pendente = profundidade da fila)", amostras)]
+
+
+metricas.registrar_coletor("jobs", _coletar_metricas)
@@ -0,0 +1,112 @@
+# ===================================================================
+# app/limitador_gemini.py (LIMITE COMPARTILHADO DE CHAMADAS AO GEMINI)
+#
+# Funcionalidades:
+# - POOL COMPARTILHADO: Um único limitador por processo para todas as
+#   chamadas ao Gemini (extração e consolidação), de modo que várias
+#   análises simultâneas (jobs, lote) respeitem juntas a cota da API.
+# - CONCORRÊNCIA: No máximo GEMINI_MAX_CHAMADAS_SIMULTANEAS chamadas em
+#   andamento ao mesmo tempo (0 = sem limite).
+# - TAXA: Com GEMINI_RPM > 0, as chamadas são espaçadas uniformemente para
+#   não passar de GEMINI_RPM requisições por minuto.
+# - ESTATÍSTICAS: Chamadas feitas e tempo total de espera pela vez (também
+#   como histograma no endpoint /metrics).
+# ===================================================================
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import metricas
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+GEMINI_MAX_CHAMADAS_SIMULTANEAS = int(os.getenv("GEMINI_MAX_CHAMADAS_SIMULTANEAS", "0"))
+
+# --- SINGLETON ---
+_limitador = None
+_lock_limitador = threading.Lock()
+
+_ESPERA = metricas.histograma("gemini_espera_limitador_segundos", "Espera por vaga/horário no limitador do Gemini")
+
+
+class LimitadorTaxa:
+    """Limita a concorrência e a taxa (requisições por minuto) de chamadas compartilhadas entre threads."""
+
+    def __init__(self, requisicoes_por_minuto=0, max_simultaneas=0):
+        self.requisicoes_por_minuto = requisicoes_por_minuto
+        self.max_simultaneas = max_simultaneas
+        self._intervalo = 60.0 / requisicoes_por_minuto if requisicoes_por_minuto > 0 else 0.0
+        self._semaforo = threading.BoundedSemaphore(max_simultaneas) if max_simultaneas > 0 else None
+        self._lock = threading.Lock()
+        self._proximo_horario = 0.0
+        self.chamadas = 0
+        self.espera_total = 0.0
+
+    def _aguardar_vez(self):
+        """Reserva o próximo horário livre e dorme até ele."""
+        with self._lock:
+            agora = time.monotonic()
+            horario = max(agora, self._proximo_horario)
+            self._proximo_horario = horario + self._intervalo
+            self.chamadas += 1
+        espera = horario - agora
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    @contextmanager
+    def reservar(self):
+        """Bloco de uma chamada à API: aguarda vaga e horário, libera a vaga ao sair."""
+        inicio = time.monotonic()
+        if self._semaforo is not None:
+            self._semaforo.acquire()
+        try:
+            if self._intervalo:
+                self._aguardar_vez()
+            else:
+                with self._lock:
+                    self.chamadas += 1
+            espera = time.monotonic() - inicio
+            with self._lock:
+                self.espera_total += espera
+            _ESPERA.observar(espera)
+            yield
+        finally:
+            if self._semaforo is not None:
+                self._semaforo.release()
+
+    def estatisticas(self):
+        return {
+            "requisicoes_por_minuto": self.requisicoes_por_minuto,
+            "max_simultaneas": self.max_simultaneas,
+            "chamadas": self.chamadas,
+            "espera_total_s": round(self.espera_total, 3),
+        }
+
+
+def obter_limitador():
+    """Retorna o limitador do processo, criando-o com a configuração do ambiente na primeira chamada."""
+    global _limitador
+    if _limitador is not None:
+        return _limitador
+    with _lock_limitador:
+        if _limitador is None:
+            _limitador = LimitadorTaxa(GEMINI_RPM, GEMINI_MAX_CHAMADAS_SIMULTANEAS)
+    return _limitador
+
+
+def configurar_limitador(requisicoes_por_minuto=None, max_simultaneas=None):
+    """
+    Substitui o limitador do processo (ex: pelos argumentos da linha de comando).
+    Deve ser chamado antes de iniciar as análises; valores None mantêm a configuração do ambiente.
+    """
+    global _limitador
+    with _lock_limitador:
+        _limitador = LimitadorTaxa(
+            GEMINI_RPM if requisicoes_por_minuto is None else requisicoes_por_minuto,
+            GEMINI_MAX_CHAMADAS_SIMULTANEAS if max_simultaneas is None else max_simultaneas,
+        )
+        print(f"🚦 Limite de chamadas ao Gemini: {_limitador.requisicoes_por_minuto or 'sem limite de'} req/min, "
+              f"{_limitador.max_simultaneas or 'sem limite de'} simultâneas.")
+    return _limitador
@@ -0,0 +1,276 @@
+# ===================================================================
+# app/metricas.py (MÉTRICAS NO FORMATO DO PROMETHEUS)
+#
+# Funcionalidades:
+# - REGISTRO: Contadores, medidores (gauges) e histogramas com rótulos,
+#   criados uma única vez por nome e seguros para threads. Todos os nomes
+#   recebem o prefixo METRICAS_PREFIXO ("pjecalc_").
+# - COLETORES: Funções chamadas a cada leitura para métricas calculadas
+#   na hora (acertos dos caches, profundidade das filas de jobs).
+# - FORMATO TEXTO: `gerar_texto()` produz a exposição text/plain 0.0.4
+#   do Prometheus, sem depender de `prometheus_client`.
+# - ENDPOINT: `iniciar_servidor_metricas()` sobe, uma vez por processo,
+#   um servidor HTTP em METRICAS_HOST:METRICAS_PORTA com GET /metrics
+#   (METRICAS_PORTA=0 desativa). A API (api_servico.py) também responde
+#   em /metrics na própria porta.
+# - ESCOPO: Os valores são do processo atual (workers de OCR do lote, em
+#   processos filhos, não aparecem no processo principal).
+# ===================================================================
+
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIXO = os.getenv("METRICAS_PREFIXO", "pjecalc_")
+METRICAS_HOST = os.getenv("METRICAS_HOST", "127.0.0.1")
+METRICAS_PORTA = int(os.getenv("METRICAS_PORTA", "9108"))
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) dos histogramas de latência
+BALDES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# --- SINGLETON ---
+_metricas = {}
+_coletores = {}
+_lock_registro = threading.Lock()
+_servidor = None
+_lock_servidor = threading.Lock()
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes, valores, extra=()):
+    pares = list(zip(nomes, valores)) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + "}"
+
+
+def _formatar_numero(valor):
+    if valor == math.inf:
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    """Base: nome, ajuda, nomes dos rótulos e valores por combinação de rótulos."""
+
+    tipo = ""
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos):
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"Métrica {self.nome} espera os rótulos {self.rotulos}, recebeu {tuple(rotulos)}.")
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def amostras(self):
+        """Linhas (sufixo, rótulos extras, chave, valor) para a exposição."""
+        with self._lock:
+            return [("", (), chave, valor) for chave, valor in self._valores.items()]
+
+    def exposicao(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for sufixo, extra, chave, valor in self.amostras():
+            linhas.append(f"{self.nome}{sufixo}{_formatar_rotulos(self.rotulos, chave, extra)} {_formatar_numero(valor)}")
+        return linhas
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (eventos, bytes)."""
+
+    tipo = "counter"
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+
+class Medidor(_Metrica):
+    """Valor que sobe e desce (trabalho em andamento, tamanho de fila)."""
+
+    tipo = "gauge"
+
+    def definir(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = valor
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    @contextmanager
+    def em_andamento(self, **rotulos):
+        """Soma 1 enquanto o bloco executa."""
+        self.inc(**rotulos)
+        try:
+            yield
+        finally:
+            self.dec(**rotulos)
+
+
+class Histograma(_Metrica):
+    """Distribuição em baldes cumulativos, com soma e contagem (ex: latências)."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), baldes=BALDES_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.baldes = tuple(sorted(baldes)) + (math.inf,)
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            contagens, soma = self._valores.get(chave, ([0] * len(self.baldes), 0.0))
+            for indice, limite in enumerate(self.baldes):
+                if valor <= limite:
+                    contagens[indice] += 1
+                    break
+            self._valores[chave] = (contagens, soma + valor)
+
+    @contextmanager
+    def cronometrar(self, **rotulos):
+        """
+        Observa a duração do bloco. Se a métrica tem o rótulo "resultado" e
+        ele não foi informado, usa "sucesso" ou "erro" conforme o desfecho.
+        """
+        automatico = "resultado" in self.rotulos and "resultado" not in rotulos
+        inicio = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            if automatico:
+                rotulos["resultado"] = "erro"
+            raise
+        finally:
+            if automatico:
+                rotulos.setdefault("resultado", "sucesso")
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def amostras(self):
+        linhas = []
+        with self._lock:
+            itens = [(chave, list(contagens), soma) for chave, (contagens, soma) in self._valores.items()]
+        for chave, contagens, soma in itens:
+            acumulado = 0
+            for limite, contagem in zip(self.baldes, contagens):
+                acumulado += contagem
+                linhas.append(("_bucket", (("le", _formatar_numero(limite)),), chave, acumulado))
+            linhas.append(("_sum", (), chave, soma))
+            linhas.append(("_count", (), chave, acumulado))
+        return linhas
+
+
+def _obter_ou_criar(classe, nome, ajuda, rotulos, **opcoes):
+    nome = PREFIXO + nome
+    metrica = _metricas.get(nome)
+    if metrica is None:
+        with _lock_registro:
+            metrica = _metricas.get(nome)
+            if metrica is None:
+                metrica = classe(nome, ajuda, rotulos, **opcoes)
+                _metricas[nome] = metrica
+    if not isinstance(metrica, classe) or metrica.rotulos != tuple(rotulos):
+        raise ValueError(f"Métrica {nome} já registrada com outro tipo ou rótulos.")
+    return metrica
+
+
+def contador(nome, ajuda, rotulos=()):
+    return _obter_ou_criar(Contador, nome, ajuda, rotulos)
+
+
+def medidor(nome, ajuda, rotulos=()):
+    return _obter_ou_criar(Medidor, nome, ajuda, rotulos)
+
+
+def histograma(nome, ajuda, rotulos=(), baldes=BALDES_LATENCIA):
+    return _obter_ou_criar(Histograma, nome, ajuda, rotulos, baldes=baldes)
+
+
+def registrar_coletor(nome, coletar):
+    """
+    Registra (ou substitui) uma função chamada a cada leitura. `coletar()`
+    devolve uma lista de (nome, tipo, ajuda, [(dict de rótulos, valor), ...]).
+    """
+    with _lock_registro:
+        _coletores[nome] = coletar
+
+
+def _exposicao_coletada(nome, tipo, ajuda, amostras):
+    nome = PREFIXO + nome
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+    for rotulos, valor in amostras:
+        linhas.append(f"{nome}{_formatar_rotulos(rotulos.keys(), rotulos.values())} {_formatar_numero(valor)}")
+    return linhas
+
+
+def gerar_texto():
+    """Todas as métricas no formato texto do Prometheus."""
+    with _lock_registro:
+        metricas = list(_metricas.values())
+        coletores = list(_coletores.items())
+    linhas = []
+    for metrica in metricas:
+        linhas.extend(metrica.exposicao())
+    for nome_coletor, coletar in coletores:
+        try:
+            for familia in coletar():
+                linhas.extend(_exposicao_coletada(*familia))
+        except Exception as e:
+            print(f"⚠️ Coletor de métricas '{nome_coletor}' falhou: {e}")
+    return "\n".join(linhas) + "\n"
+
+
+# --- ENDPOINT HTTP ---
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        conteudo = gerar_texto().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TIPO_CONTEUDO)
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_servidor_metricas(host=None, porta=None):
+    """Sobe o endpoint /metrics em uma thread daemon (uma vez por processo). Retorna o servidor ou None."""
+    global _servidor
+    porta = METRICAS_PORTA if porta is None else porta
+    if _servidor is not None or not porta:
+        return _servidor
+    with _lock_servidor:
+        if _servidor is None:
+            try:
+                servidor = ThreadingHTTPServer((host or METRICAS_HOST, porta), _ManipuladorMetricas)
+            except OSError as e:
+                # Outro processo (ou um rerun anterior) já ocupa a porta
+                print(f"⚠️ Endpoint de métricas indisponível na porta {porta}: {e}")
+                return None
+            servidor.daemon_threads = True
+            threading.Thread(target=servidor.serve_forever, name="servidor_metricas", daemon=True).start()
+            _servidor = servidor
+            print(f"📈 Métricas disponíveis em http://{host or METRICAS_HOST}:{porta}/metrics")
+    return _servidor
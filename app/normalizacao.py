@@ -0,0 +1,179 @@
+# ===================================================================
+# app/normalizacao.py (NORMALIZAÇÃO DE TEXTO COM CACHE E MAPA DE POSIÇÕES)
+#
+# Funcionalidades:
+# - CAMINHO RÁPIDO: Remove acentos com `str.translate` usando uma tabela
+#   pré-calculada (decomposição NFD de cada caractere sem as marcas Mn),
+#   com resultado idêntico ao da decomposição caractere a caractere.
+#   Textos com caracteres em que a ordem canônica pode importar seguem o
+#   caminho completo (NFD + filtro por categoria).
+# - CACHE: Nomes curtos (verbas) e textos longos (petição inteira) em caches
+#   LRU separados, reaproveitados por todos os analisadores.
+# - MAPA DE POSIÇÕES: `TextoNormalizado` converte posições do texto
+#   normalizado para o texto original, para reportar ocorrências e
+#   contextos no original sem normalizar de novo.
+# ===================================================================
+
+import os
+import re
+import bisect
+import threading
+import unicodedata
+from cache_lru import CacheLRU
+
+# Textos até este tamanho vão para o cache de nomes curtos
+TAMANHO_MAXIMO_CURTO = 512
+
+_cache_curtos = CacheLRU(max_entradas=int(os.getenv("NORMALIZACAO_CACHE_MAX", "8192")), nome="normalizacao_curtos")
+_cache_longos = CacheLRU(max_entradas=int(os.getenv("NORMALIZACAO_CACHE_LONGOS_MAX", "8")), nome="normalizacao_longos")
+
+# Tabela de tradução e padrões derivados (montados na primeira utilização)
+_tabela = None
+_padrao_inseguro = None
+_padrao_tamanho_variavel = None
+_padrao_substituiveis = None
+_lock_tabela = threading.Lock()
+
+
+def _sem_marcas(texto):
+    """Decomposição NFD sem as marcas diacríticas (categoria Mn)."""
+    return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+
+
+def _normalizar_exato(texto):
+    """Algoritmo de referência: NFD, remoção das marcas Mn, minúsculas e strip."""
+    return _sem_marcas(texto).lower().strip()
+
+
+def _classe_regex(codigos):
+    """Classe de caracteres de regex a partir de uma lista ordenada de code points."""
+    faixas = []
+    for codigo in codigos:
+        if faixas and faixas[-1][1] == codigo - 1:
+            faixas[-1][1] = codigo
+        else:
+            faixas.append([codigo, codigo])
+    partes = [
+        re.escape(chr(inicio)) if inicio == fim else f"{re.escape(chr(inicio))}-{re.escape(chr(fim))}"
+        for inicio, fim in faixas
+    ]
+    return "".join(partes)
+
+
+def _montar_tabela():
+    """
+    Calcula, para cada caractere do BMP, a substituição do caminho rápido.
+    Caracteres combinantes que não são Mn (e os que se decompõem neles) são
+    inseguros: a reordenação canônica do NFD poderia alterar o resultado.
+    Caracteres fora do BMP também seguem o caminho completo.
+    """
+    global _tabela, _padrao_inseguro, _padrao_tamanho_variavel, _padrao_substituiveis
+    tabela, inseguros, variaveis = {}, [], []
+    for codigo in range(0x10000):
+        caractere = chr(codigo)
+        decomposto = unicodedata.normalize('NFD', caractere)
+        if any(unicodedata.combining(c) and unicodedata.category(c) != 'Mn' for c in decomposto):
+            inseguros.append(codigo)
+            continue
+        substituto = ''.join(c for c in decomposto if unicodedata.category(c) != 'Mn')
+        if substituto != caractere:
+            tabela[codigo] = substituto
+        if len(substituto) != 1:
+            variaveis.append(codigo)
+
+    _padrao_inseguro = re.compile(f"[{_classe_regex(inseguros)}\U00010000-\U0010FFFF]")
+    _padrao_tamanho_variavel = re.compile(f"[{_classe_regex(variaveis)}\U00010000-\U0010FFFF]")
+    _padrao_substituiveis = re.compile(f"[{_classe_regex(sorted(tabela))}]+")
+    _tabela = tabela
+
+
+def _garantir_tabela():
+    if _tabela is None:
+        with _lock_tabela:
+            if _tabela is None:
+                _montar_tabela()
+
+
+def _sem_acentos(texto):
+    """Remoção de acentos (antes de minúsculas/strip), pelo caminho rápido quando seguro."""
+    if texto.isascii():
+        return texto
+    _garantir_tabela()
+    if _padrao_inseguro.search(texto):
+        return _sem_marcas(texto)
+    if len(texto) <= TAMANHO_MAXIMO_CURTO:
+        return texto.translate(_tabela)
+    # Textos longos: traduz só os trechos com acentos (o restante é copiado em C)
+    return _padrao_substituiveis.sub(lambda achado: achado.group(0).translate(_tabela), texto)
+
+
+class TextoNormalizado:
+    """
+    Texto normalizado com o mapa de posições para o original. O mapa guarda
+    apenas os trechos em que a correspondência deixa de ser 1:1 (marcas
+    removidas ou caracteres que viram mais de um), e a consulta usa bisect.
+    """
+
+    def __init__(self, original):
+        _garantir_tabela()
+        self.original = original
+        sem_acentos = _sem_acentos(original).lower()
+        self.normalizado = sem_acentos.strip()
+        self._deslocamento = len(sem_acentos) - len(sem_acentos.lstrip())
+
+        # Trechos (início no normalizado, início no original, 1:1?)
+        self._inicios_norm, self._inicios_orig, self._lineares = [0], [0], [True]
+        posicao_norm = 0
+        fim_anterior = 0
+        for achado in _padrao_tamanho_variavel.finditer(original):
+            inicio = achado.start()
+            posicao_norm += inicio - fim_anterior
+            tamanho = len(_sem_marcas(achado.group(0)).lower())
+            if tamanho:
+                # Os caracteres gerados apontam todos para o caractere de origem
+                self._registrar(posicao_norm, inicio, False)
+                posicao_norm += tamanho
+            fim_anterior = achado.end()
+            self._registrar(posicao_norm, fim_anterior, True)
+
+    def _registrar(self, posicao_norm, posicao_orig, linear):
+        if self._inicios_norm[-1] == posicao_norm:
+            self._inicios_orig[-1], self._lineares[-1] = posicao_orig, linear
+        else:
+            self._inicios_norm.append(posicao_norm)
+            self._inicios_orig.append(posicao_orig)
+            self._lineares.append(linear)
+
+    def posicao_original(self, posicao):
+        """Posição no texto original correspondente a `posicao` no texto normalizado."""
+        posicao += self._deslocamento
+        trecho = bisect.bisect_right(self._inicios_norm, posicao) - 1
+        inicio_orig = self._inicios_orig[trecho]
+        if self._lineares[trecho]:
+            inicio_orig += posicao - self._inicios_norm[trecho]
+        return min(inicio_orig, len(self.original))
+
+    def trecho_original(self, inicio, fim):
+        """Trecho do texto original correspondente a [inicio, fim) do normalizado."""
+        return self.original[self.posicao_original(inicio):self.posicao_original(fim)]
+
+
+def normalizar_com_mapa(texto):
+    """`TextoNormalizado` (com mapa de posições) do texto, memorizado."""
+    texto = texto or ""
+    cache = _cache_curtos if len(texto) <= TAMANHO_MAXIMO_CURTO else _cache_longos
+    return cache.obter_ou_gerar(("mapa", texto), lambda: TextoNormalizado(texto))
+
+
+def normalizar_texto(texto):
+    """Normaliza texto removendo acentos e convertendo para minúsculas."""
+    if not texto:
+        return ""
+    if len(texto) > TAMANHO_MAXIMO_CURTO:
+        return normalizar_com_mapa(texto).normalizado
+    return _cache_curtos.obter_ou_gerar(texto, lambda: _sem_acentos(texto).lower().strip())
+
+
+def estatisticas():
+    """Estatísticas dos caches de normalização."""
+    return {"curtos": _cache_curtos.estatisticas(), "longos": _cache_longos.estatisticas()}
@@ -8,12 +8,23 @@
 #   2. Se a página for uma imagem (pouco ou nenhum texto digital),
 #      aí sim ela é convertida para imagem e o OCR é aplicado.
 # - É significativamente mais rápido e mais preciso para PDFs mistos.
+# - Cada página é medida (instrumentacao.py): modo (digital/OCR) e bytes.
+# - Métricas (metricas.py): páginas e tempo por página por modo, bytes
+#   extraídos, erros de OCR e documentos em andamento.
 # ===================================================================
 
 import fitz  # PyMuPDF, já está no seu requirements.txt
 import pytesseract
 from PIL import Image, ImageFilter, ImageOps
 import io
+import time
+import metricas
+from instrumentacao import medir
+
+_TEMPO_PAGINA = metricas.histograma("ocr_pagina_segundos", "Tempo de extração por página, por modo (digital/ocr)", ("modo",))
+_BYTES_EXTRAIDOS = metricas.contador("ocr_bytes_extraidos_total", "Bytes de texto extraídos das páginas", ("modo",))
+_ERROS_OCR = metricas.contador("ocr_erros_total", "Páginas com erro no Tesseract")
+_DOCUMENTOS_EM_ANDAMENTO = metricas.medidor("ocr_documentos_em_andamento", "PDFs em extração de texto neste processo")
 
 def _preprocessar_imagem(imagem_pil):
     """
@@ -50,41 +61,55 @@ def aplicar_ocr(caminho_pdf):
     print("🚀 Iniciando extração de texto com estratégia híbrida...")
     texto_completo = []
     documento = fitz.open(caminho_pdf)
+    _DOCUMENTOS_EM_ANDAMENTO.inc()
+    try:
+        # Itera por cada página do documento
+        for num_pagina, pagina in enumerate(documento):
+            inicio_pagina = time.perf_counter()
+            with medir("ocr.pagina", pagina=num_pagina + 1) as span:
+                # --- Passo 1: Tenta extrair o texto diretamente ---
+                # Isso funciona para páginas que foram geradas digitalmente (ex: de um Word)
+                texto_direto = pagina.get_text("text")
 
-    # Itera por cada página do documento
-    for num_pagina, pagina in enumerate(documento):
-        # --- Passo 1: Tenta extrair o texto diretamente ---
-        # Isso funciona para páginas que foram geradas digitalmente (ex: de um Word)
-        texto_direto = pagina.get_text("text")
-
-        # --- Passo 2: Decide se usa OCR ---
-        # Se a página tem pouco ou nenhum texto (< 100 caracteres),
-        # consideramos que é uma imagem que precisa de OCR.
-        if len(texto_direto.strip()) < 100:
-            print(f"   - Página {num_pagina + 1}/{len(documento)}: Texto não encontrado. Aplicando OCR...")
+                # --- Passo 2: Decide se usa OCR ---
+                # Se a página tem pouco ou nenhum texto (< 100 caracteres),
+                # consideramos que é uma imagem que precisa de OCR.
+                if len(texto_direto.strip()) < 100:
+                    print(f"   - Página {num_pagina + 1}/{len(documento)}: Texto não encontrado. Aplicando OCR...")
             
-            # Renderiza a página como uma imagem de alta resolução (300 DPI)
-            pix = pagina.get_pixmap(dpi=300)
-            img_bytes = pix.tobytes("png")
-            imagem_pil = Image.open(io.BytesIO(img_bytes))
+                    # Renderiza a página como uma imagem de alta resolução (300 DPI)
+                    pix = pagina.get_pixmap(dpi=300)
+                    img_bytes = pix.tobytes("png")
+                    imagem_pil = Image.open(io.BytesIO(img_bytes))
 
-            # Aplica o pré-processamento na imagem
-            imagem_processada = _preprocessar_imagem(imagem_pil)
+                    # Aplica o pré-processamento na imagem
+                    imagem_processada = _preprocessar_imagem(imagem_pil)
 
-            # Usa o Tesseract para extrair texto da imagem
-            try:
-                texto_da_pagina = pytesseract.image_to_string(imagem_processada, lang='por')
-                texto_completo.append(texto_da_pagina)
-            except pytesseract.TesseractError as e:
-                print(f"❌ Erro de OCR na página {num_pagina + 1}: {e}")
-                texto_completo.append(f"\n[ERRO DE OCR NA PÁGINA {num_pagina + 1}]\n")
+                    # Usa o Tesseract para extrair texto da imagem
+                    try:
+                        texto_da_pagina = pytesseract.image_to_string(imagem_processada, lang='por')
+                        texto_completo.append(texto_da_pagina)
+                        tamanho = len(texto_da_pagina.encode("utf-8"))
+                        span.registrar(bytes=tamanho, modo="ocr")
+                        _BYTES_EXTRAIDOS.inc(tamanho, modo="ocr")
+                    except pytesseract.TesseractError as e:
+                        print(f"❌ Erro de OCR na página {num_pagina + 1}: {e}")
+                        texto_completo.append(f"\n[ERRO DE OCR NA PÁGINA {num_pagina + 1}]\n")
+                        span.registrar(modo="ocr", erro=str(e))
+                        _ERROS_OCR.inc()
+                    _TEMPO_PAGINA.observar(time.perf_counter() - inicio_pagina, modo="ocr")
         
-        # Se a página já continha texto digital, usa-o diretamente
-        else:
-            print(f"   - Página {num_pagina + 1}/{len(documento)}: Texto digital extraído diretamente.")
-            texto_completo.append(texto_direto)
-
-    documento.close()
+                # Se a página já continha texto digital, usa-o diretamente
+                else:
+                    print(f"   - Página {num_pagina + 1}/{len(documento)}: Texto digital extraído diretamente.")
+                    texto_completo.append(texto_direto)
+                    tamanho = len(texto_direto.encode("utf-8"))
+                    span.registrar(bytes=tamanho, modo="digital")
+                    _BYTES_EXTRAIDOS.inc(tamanho, modo="digital")
+                    _TEMPO_PAGINA.observar(time.perf_counter() - inicio_pagina, modo="digital")
+    finally:
+        _DOCUMENTOS_EM_ANDAMENTO.dec()
+        documento.close()
     print("✅ Extração de texto finalizada.")
     
     # Junta o texto de todas as páginas, separando-as com um marcador de quebra de página
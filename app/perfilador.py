@@ -0,0 +1,259 @@
+# ===================================================================
+# app/perfilador.py (PERFILADOR OPCIONAL DAS ANÁLISES)
+#
+# Funcionalidades:
+# - MODO OPT-IN: Desligado por padrão. PERFILADOR=cprofile (determinístico,
+#   biblioteca padrão) ou PERFILADOR=pyinstrument (por amostragem, se
+#   instalado) liga o modo no processo; a interface pode trocá-lo em tempo
+#   de execução (`definir_modo`), valendo para as próximas análises.
+# - EXECUÇÃO COMPLETA: `perfilar_execucao(...)` envolve uma análise; as
+#   threads do extrator entram na mesma sessão por `perfilar_thread()`
+#   (o contexto chega a elas por instrumentacao.propagar_contexto).
+# - ARTEFATO POR JOB: Ao final, grava o perfil em PERFILADOR_DIR (ou no
+#   diretório do job): .prof (pstats/snakeviz) ou .html + .pyisession
+#   (pyinstrument), e devolve as funções mais quentes para a interface.
+# ===================================================================
+
+import os
+import time
+import uuid
+import pstats
+import cProfile
+import datetime
+import threading
+import contextvars
+from contextlib import contextmanager
+
+MODOS = ("cprofile", "pyinstrument")
+DIR_PERFILADOR = os.getenv("PERFILADOR_DIR", os.path.join("export", "perfilador"))
+PERFILADOR_TOP = int(os.getenv("PERFILADOR_TOP", "40"))
+# Intervalo de amostragem do pyinstrument (segundos)
+PERFILADOR_INTERVALO = float(os.getenv("PERFILADOR_INTERVALO", "0.001"))
+
+_sessao_atual = contextvars.ContextVar("sessao_perfilador", default=None)
+_thread_local = threading.local()
+
+# --- SINGLETON ---
+_modo = os.getenv("PERFILADOR", "").strip().lower()
+_lock_modo = threading.Lock()
+
+
+def pyinstrument_disponivel():
+    try:
+        import pyinstrument  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def modos_disponiveis():
+    """Modos que podem ser ativados neste ambiente."""
+    return [modo for modo in MODOS if modo != "pyinstrument" or pyinstrument_disponivel()]
+
+
+def modo_atual():
+    """Modo ativo ("" = desligado). Um valor inválido em PERFILADOR é tratado como desligado."""
+    return _modo if _modo in modos_disponiveis() else ""
+
+
+def definir_modo(modo):
+    """Liga ("cprofile"/"pyinstrument") ou desliga ("" ou None) o perfilador para as próximas análises."""
+    global _modo
+    modo = (modo or "").strip().lower()
+    if modo and modo not in modos_disponiveis():
+        raise ValueError(f"Modo de perfilador indisponível: {modo}. Use um de {modos_disponiveis()} ou vazio.")
+    with _lock_modo:
+        _modo = modo
+    print(f"🔬 Perfilador {'desligado' if not modo else f'ativo ({modo})'}.")
+    return modo
+
+
+def _caminho_curto(caminho):
+    """Últimos dois componentes do caminho (ex: app/extrator.py), para a tabela ficar legível."""
+    partes = caminho.replace("\\", "/").split("/")
+    return "/".join(partes[-2:])
+
+
+class SessaoPerfilador:
+    """Perfis de uma execução: um por thread participante, combinados ao final."""
+
+    def __init__(self, modo, nome):
+        self.modo = modo
+        self.nome = nome
+        self.id = uuid.uuid4().hex[:12]
+        self.inicio = time.time()
+        self.resumo = None
+        self._perfis = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def perfilar_thread(self):
+        """Perfila o bloco na thread atual (sem aninhar: uma thread já perfilada segue como está)."""
+        if getattr(_thread_local, "ativo", False):
+            yield
+            return
+        perfil = self._iniciar_perfil()
+        if perfil is None:
+            yield
+            return
+        _thread_local.ativo = True
+        try:
+            yield
+        finally:
+            _thread_local.ativo = False
+            self._parar_perfil(perfil)
+
+    def _iniciar_perfil(self):
+        try:
+            if self.modo == "cprofile":
+                perfil = cProfile.Profile()
+                perfil.enable()
+            else:
+                from pyinstrument import Profiler
+                perfil = Profiler(interval=PERFILADOR_INTERVALO)
+                perfil.start()
+            return perfil
+        except ValueError as e:
+            # Python 3.12+: um único cProfile ativo no interpretador (que já observa todas as threads)
+            print(f"⚠️ Perfilador não iniciado na thread {threading.current_thread().name}: {e}")
+            return None
+
+    def _parar_perfil(self, perfil):
+        if self.modo == "cprofile":
+            perfil.disable()
+        else:
+            perfil.stop()
+            perfil = perfil.last_session
+        with self._lock:
+            self._perfis.append(perfil)
+
+    # --- Resultado ---
+
+    def funcoes_quentes(self, limite=PERFILADOR_TOP):
+        """Funções ordenadas pelo tempo próprio (fora das funções chamadas), somando todas as threads."""
+        with self._lock:
+            perfis = list(self._perfis)
+        if not perfis:
+            return []
+        linhas = self._linhas_cprofile(perfis) if self.modo == "cprofile" else self._linhas_pyinstrument(perfis)
+        linhas.sort(key=lambda linha: -linha["tempo_proprio_s"])
+        for linha in linhas:
+            linha["tempo_proprio_s"] = round(linha["tempo_proprio_s"], 4)
+            linha["tempo_acumulado_s"] = round(linha["tempo_acumulado_s"], 4)
+        return linhas[:limite]
+
+    @staticmethod
+    def _estatisticas(perfis):
+        estatisticas = pstats.Stats(perfis[0])
+        for perfil in perfis[1:]:
+            estatisticas.add(perfil)
+        return estatisticas
+
+    def _linhas_cprofile(self, perfis):
+        return [
+            {
+                "funcao": funcao, "arquivo": _caminho_curto(arquivo), "linha": linha,
+                "chamadas": chamadas, "tempo_proprio_s": proprio, "tempo_acumulado_s": acumulado,
+            }
+            for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in self._estatisticas(perfis).stats.items()
+        ]
+
+    @staticmethod
+    def _sessao_combinada(sessoes):
+        from pyinstrument.session import Session
+        combinada = sessoes[0]
+        for sessao in sessoes[1:]:
+            combinada = Session.combine(combinada, sessao)
+        return combinada
+
+    def _linhas_pyinstrument(self, sessoes):
+        # Agrega os quadros da árvore de amostras por função; recursões somam no acumulado
+        por_funcao = {}
+        pilha = [self._sessao_combinada(sessoes).root_frame()]
+        while pilha:
+            quadro = pilha.pop()
+            if quadro is None:
+                continue
+            chave = (quadro.file_path or "", quadro.line_no or 0, quadro.function or "")
+            linha = por_funcao.setdefault(chave, {
+                "funcao": chave[2], "arquivo": _caminho_curto(chave[0]), "linha": chave[1],
+                "chamadas": None, "tempo_proprio_s": 0.0, "tempo_acumulado_s": 0.0,
+            })
+            linha["tempo_proprio_s"] += quadro.total_self_time
+            linha["tempo_acumulado_s"] += quadro.time
+            pilha.extend(quadro.children)
+        return list(por_funcao.values())
+
+    def salvar(self, diretorio=None):
+        """Grava o artefato do perfil e retorna a lista de arquivos criados."""
+        with self._lock:
+            perfis = list(self._perfis)
+        if not perfis:
+            return []
+        diretorio = diretorio or DIR_PERFILADOR
+        os.makedirs(diretorio, exist_ok=True)
+        momento = datetime.datetime.fromtimestamp(self.inicio).strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(diretorio, f"perfilador_{self.nome}_{momento}_{self.id}")
+        if self.modo == "cprofile":
+            self._estatisticas(perfis).dump_stats(base + ".prof")
+            return [base + ".prof"]
+
+        from pyinstrument.renderers import HTMLRenderer
+        sessao = self._sessao_combinada(perfis)
+        sessao.save(base + ".pyisession")
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(HTMLRenderer().render(sessao))
+        return [base + ".html", base + ".pyisession"]
+
+    def finalizar(self, diretorio=None, limite=PERFILADOR_TOP):
+        """Grava o artefato e monta o resumo devolvido com o resultado da análise."""
+        try:
+            arquivos = self.salvar(diretorio)
+        except (OSError, ImportError) as e:
+            print(f"⚠️ Não foi possível gravar o perfil do perfilador: {e}")
+            arquivos = []
+        self.resumo = {
+            "id": self.id,
+            "nome": self.nome,
+            "modo": self.modo,
+            "inicio_iso": datetime.datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+            "duracao_s": round(time.time() - self.inicio, 3),
+            "threads": len(self._perfis),
+            "arquivos": arquivos,
+            "funcoes_quentes": self.funcoes_quentes(limite),
+        }
+        if arquivos:
+            print(f"🔬 Perfil ({self.modo}) da execução '{self.nome}' gravado em {arquivos[0]}.")
+        return self.resumo
+
+
+@contextmanager
+def perfilar_execucao(nome, diretorio=None, modo=None):
+    """
+    Perfila o bloco (e as threads que chamarem `perfilar_thread`) quando o
+    perfilador está ligado; devolve a sessão, ou None com o modo desligado.
+    Ao sair, o artefato é gravado e `sessao.resumo` fica disponível.
+    """
+    modo = modo_atual() if modo is None else modo
+    if not modo:
+        yield None
+        return
+    sessao = SessaoPerfilador(modo, nome)
+    token = _sessao_atual.set(sessao)
+    try:
+        with sessao.perfilar_thread():
+            yield sessao
+    finally:
+        _sessao_atual.reset(token)
+        sessao.finalizar(diretorio)
+
+
+@contextmanager
+def perfilar_thread():
+    """Inclui o bloco na sessão do perfilador do contexto atual (nada a fazer fora de uma sessão)."""
+    sessao = _sessao_atual.get()
+    if sessao is None:
+        yield
+        return
+    with sessao.perfilar_thread():
+        yield
@@ -0,0 +1,166 @@
+# ===================================================================
+# app/pipeline.py (PIPELINE DE ANÁLISE INDEPENDENTE DA INTERFACE)
+#
+# Funcionalidades:
+# - EXECUÇÃO FORA DO STREAMLIT: OCR, RAG, extração e consolidação sem
+#   chamadas `st.*`, para rodar em threads de background (jobs.py).
+# - PROGRESSO: Informa a fração concluída e uma mensagem a cada etapa por
+#   meio de um callback `progresso(fracao, mensagem)`.
+# - RESILIÊNCIA: Mantém os mesmos fallbacks da interface (dados mínimos
+#   quando a extração ou a consolidação falham), registrando avisos.
+# - PERFIL: Cada execução mede as etapas (instrumentacao.py) e devolve o
+#   perfil junto com o resultado, gravando-o também em JSON.
+# - PERFILADOR (opcional): Com o perfilador ligado (perfilador.py), a
+#   execução inteira é perfilada e as funções mais quentes voltam em
+#   `perfilador` no resultado.
+# ===================================================================
+
+import os
+import traceback
+from ocr import aplicar_ocr
+from extrator import dividir_em_chunks, extrair_dados_parciais, consolidar_resultados
+from rag_manager import consultar_rag
+from instrumentacao import iniciar_perfil, medir
+from perfilador import perfilar_execucao
+
+# Faixa de progresso ocupada pela extração (etapa mais longa)
+INICIO_EXTRACAO = 0.30
+FIM_EXTRACAO = 0.90
+
+
+class _ProgressoExtracao:
+    """Adapta a barra de progresso esperada por `extrair_dados_parciais` ao callback do pipeline."""
+
+    def __init__(self, progresso):
+        self._progresso = progresso
+
+    def progress(self, valor, text=""):
+        fracao = INICIO_EXTRACAO + (FIM_EXTRACAO - INICIO_EXTRACAO) * float(valor)
+        self._progresso(fracao, text)
+
+
+def _sem_progresso(fracao, mensagem):
+    print(f"⏳ [{fracao:.0%}] {mensagem}")
+
+
+def executar_pipeline(caminho_pdf, rag_is_active, progresso=None, ao_previa=None, diretorio_trabalho=None,
+                      texto_processo=None):
+    """
+    Executa a análise completa de um PDF e retorna um dicionário com
+    `texto_processo`, `log_detalhado`, `dados_completos`, `avisos` e
+    `perfil` (tempos por etapa e por chunk, também gravados em JSON), além
+    de `perfilador` (funções mais quentes) quando o perfilador está ligado.
+    Com `diretorio_trabalho`, os logs de chunks, o relatório e os perfis
+    ficam isolados nesse diretório (um por job). Com `texto_processo` (OCR
+    já feito, ex: no processamento em lote), a etapa de OCR é pulada.
+    Exceções inesperadas (ex: falha no OCR) são propagadas ao chamador.
+    """
+    metadados = {"arquivo": os.path.basename(caminho_pdf), "rag": bool(rag_is_active)}
+    with iniciar_perfil("analise", diretorio_trabalho, **metadados) as perfil, \
+            perfilar_execucao("analise", diretorio_trabalho) as sessao_perfilador:
+        resultado = _executar_etapas(
+            caminho_pdf, rag_is_active, progresso, ao_previa, diretorio_trabalho, texto_processo
+        )
+    resultado["perfil"] = perfil.para_dict()
+    if sessao_perfilador is not None:
+        resultado["perfilador"] = sessao_perfilador.resumo
+    return resultado
+
+
+def _executar_etapas(caminho_pdf, rag_is_active, progresso, ao_previa, diretorio_trabalho, texto_processo):
+    progresso = progresso or _sem_progresso
+    diretorio_logs = os.path.join(diretorio_trabalho, "logs") if diretorio_trabalho else "logs"
+    diretorio_relatorios = os.path.join(diretorio_trabalho, "relatorios") if diretorio_trabalho else None
+    avisos = []
+
+    # Etapa 1: OCR
+    progresso(0.0, "Etapa 1/4: A ler e a preparar o documento...")
+    with medir("etapa.ocr") as span:
+        if texto_processo is None:
+            texto_processo = aplicar_ocr(caminho_pdf)
+        else:
+            span.registrar(reaproveitado=True)
+        span.registrar(bytes=len(texto_processo.encode("utf-8")))
+    with medir("etapa.chunks") as span:
+        chunks = dividir_em_chunks(texto_processo)
+        span.registrar(itens=len(chunks))
+    progresso(0.20, f"Documento preparado e dividido em {len(chunks)} partes.")
+
+    # Etapa 2: Consulta ao RAG (se disponível)
+    contexto_rag = ""
+    if rag_is_active:
+        try:
+            progresso(0.22, "Etapa 2/4: A consultar a base de conhecimento (RAG)...")
+            texto_consulta = texto_processo[:5000] if len(texto_processo) > 5000 else texto_processo
+            with medir("etapa.rag"):
+                contexto_rag = consultar_rag(texto_consulta, n_results=3)
+            if contexto_rag and len(contexto_rag) > 8000:
+                contexto_rag = contexto_rag[:8000] + "... (truncado para melhor desempenho)"
+        except Exception as e:
+            avisos.append(f"Erro ao consultar a base de conhecimento: {e}. A análise prosseguiu sem contexto adicional.")
+            contexto_rag = ""
+    else:
+        avisos.append("Base de conhecimento (RAG) indisponível. A análise prosseguiu sem contexto adicional.")
+
+    # Etapa 3: Extração de dados parciais
+    progresso(INICIO_EXTRACAO, f"Etapa 3/4: A extrair dados de cada uma das {len(chunks)} partes...")
+    with medir("etapa.extracao") as span:
+        log_detalhado = extrair_dados_parciais(
+            chunks, _ProgressoExtracao(progresso), ao_previa=ao_previa, diretorio_logs=diretorio_logs
+        )
+        span.registrar(itens=len(log_detalhado))
+
+    resultados_parciais_sucesso = [
+        item.get("resultado_recebido")
+        for item in log_detalhado
+        if isinstance(item, dict) and item.get("status") == "Sucesso"
+    ]
+    ignorados = sum(1 for item in log_detalhado if isinstance(item, dict) and item.get("status") == "Ignorado")
+    total = len(log_detalhado) - ignorados
+    falhas = total - len(resultados_parciais_sucesso)
+
+    if not resultados_parciais_sucesso:
+        avisos.append(f"Falha na extração de dados. Todas as {total} partes falharam. Dados simulados mínimos foram gerados.")
+        resultados_parciais_sucesso = [
+            {"documento": "processo trabalhista", "observacoes": "Falha geral na extração. Dados simulados adicionados."}
+        ]
+    elif falhas > 0:
+        print(f"⚠️ LOG: {falhas} de {total} partes tiveram erro de processamento. Continuando com {len(resultados_parciais_sucesso)} partes válidas.")
+    if ignorados:
+        avisos.append(f"{ignorados} partes de baixa relevância foram ignoradas após todos os campos obrigatórios serem identificados.")
+
+    # Etapa 4: Consolidação
+    progresso(FIM_EXTRACAO, "Etapa 4/4: A consolidar dados com IA e a gerar resumo...")
+    try:
+        with medir("etapa.consolidacao") as span:
+            dados_completos = consolidar_resultados(resultados_parciais_sucesso, contexto_rag, diretorio_relatorios)
+            span.registrar(itens=len(resultados_parciais_sucesso))
+        if not dados_completos or not isinstance(dados_completos, dict):
+            avisos.append("A consolidação produziu um resultado inesperado. Dados mínimos foram gerados.")
+            dados_completos = {
+                "observacoes_gerais": "Consolidação parcial. Os dados podem estar incompletos devido a limitações no processamento.",
+                "dados_pessoais": {"reclamante": "Não identificado", "reclamada": "Não identificado"},
+                "informacoes_pjecalc": {"numero_processo": "Não identificado"},
+                "verbas_pleiteadas": [],
+                "bases_tecnicas_calculo": {},
+                "resultado_liquidacao": {}
+            }
+    except Exception as e:
+        traceback.print_exc()
+        avisos.append(f"Erro na consolidação final: {e}")
+        dados_completos = {
+            "observacoes_gerais": f"Não foi possível processar o documento completamente. Erro: {str(e)}",
+            "dados_pessoais": {},
+            "informacoes_pjecalc": {},
+            "verbas_pleiteadas": [],
+            "bases_tecnicas_calculo": {},
+            "resultado_liquidacao": {}
+        }
+
+    progresso(1.0, "Análise finalizada!")
+    return {
+        "texto_processo": texto_processo,
+        "log_detalhado": log_detalhado,
+        "dados_completos": dados_completos,
+        "avisos": avisos,
+    }
@@ -0,0 +1,319 @@
+# ===================================================================
+# app/processar_lote.py (PROCESSAMENTO EM LOTE SEM INTERFACE)
+#
+# Funcionalidades:
+# - ENTRADA: Uma pasta (PDFs procurados recursivamente) ou um manifesto
+#   (.txt com um caminho por linha ou .csv com a coluna "caminho").
+# - OCR EM PROCESSOS: A extração de texto (CPU) roda em um pool de
+#   processos (--workers-ocr) e alimenta as análises assim que cada
+#   documento fica pronto.
+# - ANÁLISES EM THREADS: Chunks, extração, consolidação e exportação de
+#   até --casos-simultaneos processos ao mesmo tempo, todas dividindo o
+#   mesmo limite de chamadas ao Gemini (limitador_gemini).
+# - SAÍDAS POR PROCESSO: <saida>/<nome>_<hash>/ com texto.txt,
+#   resultado.json, exportações (JSON, XML PJe-Calc, DOCX, Excel), logs
+#   e estado.json; resumo.csv com uma linha por processo.
+# - RETOMADA: Processos concluídos são pulados; os interrompidos
+#   reaproveitam o texto do OCR já gravado. O cache de casos também é
+#   consultado e alimentado, como nos jobs da interface.
+#
+# Uso (a partir de app/):
+#   python processar_lote.py ENTRADA [--saida DIR] [--workers-ocr N]
+#       [--casos-simultaneos N] [--rpm N] [--max-chamadas N] [--rag]
+#       [--formatos json,xml,docx,excel] [--reprocessar]
+# ===================================================================
+
+import io
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import threading
+import datetime
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from area_trabalho import gravar_atomico
+
+DIR_SAIDA_LOTE = os.getenv("LOTE_SAIDA_DIR", os.path.join("export", "lote"))
+WORKERS_OCR = int(os.getenv("LOTE_WORKERS_OCR", str(os.cpu_count() or 1)))
+CASOS_SIMULTANEOS = int(os.getenv("LOTE_CASOS_SIMULTANEOS", "2"))
+
+# Formato -> nome do arquivo gerado na pasta do processo
+ARQUIVOS_EXPORTACAO = {
+    "json": "dados_processo.json",
+    "xml": "saida_pjecalc.xml",
+    "docx": "resumo_processo.docx",
+    "excel": "planilha_processo.xlsx",
+}
+
+COLUNAS_RESUMO = [
+    "arquivo", "caso", "status", "numero_processo", "reclamante", "reclamada",
+    "partes_extraidas", "partes_com_falha", "tempo_ocr_s", "tempo_analise_s", "avisos", "erro",
+]
+
+# Status de um processo no lote
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+
+def _agora():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def listar_entradas(entrada):
+    """Caminhos dos PDFs de uma pasta (recursivo, ordem alfabética) ou de um manifesto .txt/.csv."""
+    if os.path.isdir(entrada):
+        return sorted(
+            os.path.join(raiz, nome)
+            for raiz, _, arquivos in os.walk(entrada)
+            for nome in arquivos
+            if nome.lower().endswith(".pdf")
+        )
+
+    base = os.path.dirname(os.path.abspath(entrada))
+    with open(entrada, encoding="utf-8") as f:
+        if entrada.lower().endswith(".csv"):
+            leitor = csv.DictReader(f)
+            coluna = next((c for c in ("caminho", "arquivo", "pdf") if c in (leitor.fieldnames or [])), None)
+            if coluna is None:
+                raise ValueError(f"Manifesto {entrada} sem a coluna 'caminho'.")
+            caminhos = [linha[coluna].strip() for linha in leitor]
+        else:
+            caminhos = [linha.strip() for linha in f]
+    # Caminhos relativos são relativos ao manifesto
+    return [os.path.join(base, c) for c in caminhos if c and not c.startswith("#")]
+
+
+class CasoLote:
+    """Um PDF do lote e a sua pasta de saída (estado, texto, resultado e exportações)."""
+
+    def __init__(self, caminho_pdf, diretorio_saida):
+        from cache_casos import hash_arquivo
+
+        self.caminho_pdf = caminho_pdf
+        self.hash_pdf = hash_arquivo(caminho_pdf)
+        nome = os.path.splitext(os.path.basename(caminho_pdf))[0]
+        self.caso = f"{nome}_{self.hash_pdf[:12]}"
+        self.diretorio = os.path.join(diretorio_saida, self.caso)
+        self.caminho_texto = os.path.join(self.diretorio, "texto.txt")
+        self.caminho_resultado = os.path.join(self.diretorio, "resultado.json")
+        self.caminho_estado = os.path.join(self.diretorio, "estado.json")
+        os.makedirs(self.diretorio, exist_ok=True)
+        # O estado é atualizado pelo laço do OCR e pelas threads de análise
+        self._lock_estado = threading.Lock()
+
+    def estado(self):
+        try:
+            with open(self.caminho_estado, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def gravar_estado(self, **campos):
+        with self._lock_estado:
+            estado = self.estado()
+            estado.update(campos, arquivo=self.caminho_pdf, caso=self.caso, atualizado_em=_agora())
+            gravar_atomico(self.caminho_estado, json.dumps(estado, ensure_ascii=False, indent=2))
+        return estado
+
+    def concluido(self):
+        return self.estado().get("status") == CONCLUIDO and os.path.exists(self.caminho_resultado)
+
+    def texto(self):
+        """Texto do OCR gravado em uma execução anterior (ou None)."""
+        if not os.path.exists(self.caminho_texto):
+            return None
+        with open(self.caminho_texto, encoding="utf-8") as f:
+            return f.read()
+
+    def linha_resumo(self):
+        estado = self.estado()
+        return {coluna: estado.get(coluna, "") for coluna in COLUNAS_RESUMO} | {
+            "arquivo": self.caminho_pdf, "caso": self.caso, "status": estado.get("status", "pendente"),
+        }
+
+
+def _ocr_para_arquivo(caminho_pdf, caminho_texto):
+    """Executado no processo filho: aplica o OCR e grava o texto. Retorna o tempo gasto."""
+    from ocr import aplicar_ocr
+
+    inicio = time.perf_counter()
+    gravar_atomico(caminho_texto, aplicar_ocr(caminho_pdf))
+    return time.perf_counter() - inicio
+
+
+def _exportar(caso, dados, texto_processo, formatos):
+    """Grava as exportações do processo; falhas de um formato viram avisos."""
+    from cache_exportacao import GERADORES
+
+    avisos = []
+    for formato in formatos:
+        gerar, _ = GERADORES[formato]
+        try:
+            conteudo = gerar(dados, texto_processo)
+            gravar_atomico(os.path.join(caso.diretorio, ARQUIVOS_EXPORTACAO[formato]), conteudo, "wb")
+        except Exception as e:
+            avisos.append(f"Exportação {formato} indisponível: {e}")
+    return avisos
+
+
+def analisar_caso(caso, rag_ativo, formatos, reprocessar=False):
+    """
+    Chunks -> extração -> consolidação -> exportação de um processo com o texto
+    já extraído. Com `reprocessar`, o cache de casos não é consultado (o novo
+    resultado o substitui).
+    """
+    from pipeline import executar_pipeline
+    from cache_casos import obter_cache_casos, versao_pipeline
+
+    inicio = time.perf_counter()
+    try:
+        versao = versao_pipeline(rag_ativo)
+        resultado = None if reprocessar else obter_cache_casos().obter(caso.hash_pdf, versao)
+        if resultado is None:
+            caso.gravar_estado(status="analisando", iniciado_em=_agora())
+
+            def progresso(fracao, mensagem):
+                print(f"⏳ [{caso.caso}] [{fracao:.0%}] {mensagem}")
+
+            resultado = executar_pipeline(
+                caso.caminho_pdf, rag_ativo, progresso, diretorio_trabalho=caso.diretorio,
+                texto_processo=caso.texto(),
+            )
+            if any(item.get("status") == "Sucesso" for item in resultado.get("log_detalhado", [])):
+                obter_cache_casos().salvar(caso.hash_pdf, versao, resultado)
+
+        gravar_atomico(caso.caminho_resultado, json.dumps(resultado, ensure_ascii=False, indent=2, default=str))
+        dados = resultado.get("dados_completos") or {}
+        avisos = list(resultado.get("avisos", [])) + _exportar(caso, dados, resultado.get("texto_processo"), formatos)
+
+        log = resultado.get("log_detalhado", [])
+        pessoais = dados.get("dados_pessoais") or {}
+        estado = caso.gravar_estado(
+            status=CONCLUIDO,
+            numero_processo=(dados.get("informacoes_pjecalc") or {}).get("numero_processo", ""),
+            reclamante=pessoais.get("reclamante", ""),
+            reclamada=pessoais.get("reclamada", ""),
+            partes_extraidas=sum(1 for item in log if item.get("status") == "Sucesso"),
+            partes_com_falha=sum(1 for item in log if item.get("status") == "Falha"),
+            tempo_analise_s=round(time.perf_counter() - inicio, 1),
+            avisos=" | ".join(avisos),
+            erro="",
+            finalizado_em=_agora(),
+        )
+        print(f"✅ [{caso.caso}] Concluído.")
+    except Exception as e:
+        traceback.print_exc()
+        estado = caso.gravar_estado(
+            status=ERRO, erro=str(e), tempo_analise_s=round(time.perf_counter() - inicio, 1), finalizado_em=_agora()
+        )
+    return estado
+
+
+def gravar_resumo(casos, caminho):
+    """resumo.csv com uma linha por processo, na ordem da entrada."""
+    buffer = io.StringIO(newline="")
+    escritor = csv.DictWriter(buffer, fieldnames=COLUNAS_RESUMO, delimiter=";")
+    escritor.writeheader()
+    for caso in casos:
+        escritor.writerow(caso.linha_resumo())
+    gravar_atomico(caminho, buffer.getvalue().encode("utf-8-sig"), "wb")
+
+
+def processar_lote(caminhos_pdf, diretorio_saida=DIR_SAIDA_LOTE, workers_ocr=WORKERS_OCR,
+                   casos_simultaneos=CASOS_SIMULTANEOS, rag_ativo=False, formatos=tuple(ARQUIVOS_EXPORTACAO),
+                   reprocessar=False):
+    """
+    Analisa uma lista de PDFs, gravando as saídas de cada processo e o
+    resumo.csv em `diretorio_saida`. Retorna as linhas do resumo.
+    """
+    os.makedirs(diretorio_saida, exist_ok=True)
+    casos = []
+    for caminho in caminhos_pdf:
+        try:
+            casos.append(CasoLote(caminho, diretorio_saida))
+        except OSError as e:
+            print(f"❌ PDF ignorado ({caminho}): {e}")
+
+    a_processar = [caso for caso in casos if reprocessar or not caso.concluido()]
+    print(f"📦 {len(casos)} processo(s) no lote; {len(casos) - len(a_processar)} já concluído(s), "
+          f"{len(a_processar)} a processar ({workers_ocr} worker(s) de OCR, {casos_simultaneos} análise(s) simultânea(s)).")
+
+    from cache_casos import obter_cache_casos, versao_pipeline
+    cache_casos, versao = obter_cache_casos(), versao_pipeline(rag_ativo)
+
+    with ThreadPoolExecutor(max_workers=casos_simultaneos, thread_name_prefix="lote_analise") as analises, \
+            ProcessPoolExecutor(max_workers=workers_ocr, mp_context=multiprocessing.get_context("spawn")) as ocr:
+        futuros_analise = []
+        futuros_ocr = {}
+        for caso in a_processar:
+            if os.path.exists(caso.caminho_texto) or (not reprocessar and cache_casos.contem(caso.hash_pdf, versao)):
+                print(f"🔁 [{caso.caso}] OCR (ou análise) de uma execução anterior reaproveitado.")
+                futuros_analise.append(analises.submit(analisar_caso, caso, rag_ativo, formatos, reprocessar))
+            else:
+                caso.gravar_estado(status="ocr")
+                futuros_ocr[ocr.submit(_ocr_para_arquivo, caso.caminho_pdf, caso.caminho_texto)] = caso
+
+        # Cada documento segue para a análise assim que o OCR dele termina
+        for futuro in as_completed(futuros_ocr):
+            caso = futuros_ocr[futuro]
+            try:
+                tempo_ocr = futuro.result()
+            except Exception as e:
+                print(f"❌ [{caso.caso}] Falha no OCR: {e}")
+                caso.gravar_estado(status=ERRO, erro=f"Falha no OCR: {e}", finalizado_em=_agora())
+                continue
+            caso.gravar_estado(tempo_ocr_s=round(tempo_ocr, 1))
+            futuros_analise.append(analises.submit(analisar_caso, caso, rag_ativo, formatos, reprocessar))
+
+        for futuro in futuros_analise:
+            futuro.result()
+
+    caminho_resumo = os.path.join(diretorio_saida, "resumo.csv")
+    gravar_resumo(casos, caminho_resumo)
+    linhas = [caso.linha_resumo() for caso in casos]
+    concluidos = sum(1 for linha in linhas if linha["status"] == CONCLUIDO)
+    print(f"📊 Lote finalizado: {concluidos} de {len(linhas)} concluído(s). Resumo em {caminho_resumo}.")
+    return linhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisa em lote uma pasta ou manifesto de PDFs de processos.")
+    parser.add_argument("entrada", help="Pasta com PDFs ou manifesto (.txt com um caminho por linha, .csv com a coluna 'caminho')")
+    parser.add_argument("--saida", default=DIR_SAIDA_LOTE, help=f"Pasta de saída (padrão: {DIR_SAIDA_LOTE})")
+    parser.add_argument("--workers-ocr", type=int, default=WORKERS_OCR, help="Processos para o OCR")
+    parser.add_argument("--casos-simultaneos", type=int, default=CASOS_SIMULTANEOS, help="Análises (LLM) ao mesmo tempo")
+    parser.add_argument("--rpm", type=float, default=None, help="Limite de requisições por minuto ao Gemini (todas as análises)")
+    parser.add_argument("--max-chamadas", type=int, default=None, help="Limite de chamadas simultâneas ao Gemini (todas as análises)")
+    parser.add_argument("--rag", action="store_true", help="Consultar a base de conhecimento (ChromaDB)")
+    parser.add_argument("--formatos", default=",".join(ARQUIVOS_EXPORTACAO), help="Exportações: json,xml,docx,excel (vazio = nenhuma)")
+    parser.add_argument("--reprocessar", action="store_true", help="Reprocessar também os processos já concluídos (sem usar o cache de casos)")
+    args = parser.parse_args(argv)
+
+    formatos = [f.strip() for f in args.formatos.split(",") if f.strip()]
+    desconhecidos = [f for f in formatos if f not in ARQUIVOS_EXPORTACAO]
+    if desconhecidos:
+        parser.error(f"Formatos desconhecidos: {', '.join(desconhecidos)}")
+
+    from limitador_gemini import configurar_limitador
+    configurar_limitador(args.rpm, args.max_chamadas)
+
+    rag_ativo = False
+    if args.rag:
+        from rag_manager import get_rag_status
+        rag_ativo = bool(get_rag_status().get("connected"))
+        if not rag_ativo:
+            print("⚠️ Base de conhecimento (RAG) indisponível. O lote prosseguirá sem contexto adicional.")
+
+    linhas = processar_lote(
+        listar_entradas(args.entrada), args.saida, max(1, args.workers_ocr), max(1, args.casos_simultaneos),
+        rag_ativo, formatos, args.reprocessar,
+    )
+    return 0 if all(linha["status"] == CONCLUIDO for linha in linhas) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,9 @@
 # - Configurado para usar juris-bert-base-portuguese como principal
 # - Fallback para Google Embeddings se necessário
 # - Mantida toda a funcionalidade existente
+# - Consultas medidas no perfil da execução (instrumentacao.py)
+# - Métricas (metricas.py): latência das consultas ao Chroma e da
+#   indexação de documentos, trechos indexados
 # ===================================================================
 
 import os
@@ -26,6 +29,15 @@ from docx import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+from instrumentacao import medir
+import metricas
+
+_LATENCIA_CONSULTA = metricas.histograma("rag_consulta_segundos", "Latência das consultas ao ChromaDB", ("resultado",))
+_LATENCIA_INDEXACAO = metricas.histograma(
+    "rag_indexacao_segundos", "Tempo de inserção (com embeddings) dos trechos de um documento no ChromaDB", ("resultado",)
+)
+_TRECHOS_INDEXADOS = metricas.contador("rag_trechos_indexados_total", "Trechos adicionados à base de conhecimento")
+
 # Novos imports para embeddings especializados
 from sentence_transformers import SentenceTransformer
 import torch
@@ -349,11 +361,13 @@ def adicionar_documento_ao_rag(file_bytes, file_name):
         # Gerar IDs únicos com timestamp para evitar conflitos
         timestamp = int(datetime.datetime.now().timestamp())
         
-        for i in range(0, len(chunks), 100):
-            fatia = chunks[i:i + 100]
-            ids = [f"{file_name}-{timestamp}-{i + j}" for j in range(len(fatia))]
-            metadatas = [{"source": file_name, "timestamp": timestamp} for _ in fatia]
-            collection.add(documents=fatia, metadatas=metadatas, ids=ids)
+        with _LATENCIA_INDEXACAO.cronometrar():
+            for i in range(0, len(chunks), 100):
+                fatia = chunks[i:i + 100]
+                ids = [f"{file_name}-{timestamp}-{i + j}" for j in range(len(fatia))]
+                metadatas = [{"source": file_name, "timestamp": timestamp} for _ in fatia]
+                collection.add(documents=fatia, metadatas=metadatas, ids=ids)
+                _TRECHOS_INDEXADOS.inc(len(fatia))
 
         registro = {
             "arquivo": file_name,
@@ -383,11 +397,17 @@ def consultar_rag(query_text, n_results=5):
             return ""
 
         print(f"🔍 Consultando ChromaDB com: '{query_text[:50]}...'")
-        results = collection.query(query_texts=[query_text], n_results=n_results)
-        
-        # Logging detalhado
-        documents = results.get("documents", [[]])
-        num_docs = len(documents[0]) if documents and documents[0] else 0
+        with medir("rag.consulta", n_results=n_results) as span:
+            with _LATENCIA_CONSULTA.cronometrar():
+                results = collection.query(query_texts=[query_text], n_results=n_results)
+
+            # Logging detalhado
+            documents = results.get("documents", [[]])
+            num_docs = len(documents[0]) if documents and documents[0] else 0
+            span.registrar(
+                bytes=sum(len(documento.encode("utf-8")) for documento in (documents[0] if num_docs else [])),
+                itens=num_docs,
+            )
         print(f"📊 Consulta RAG: recuperados {num_docs} documentos")
         
         documentos = results.get("documents", [[]])[0]
@@ -0,0 +1,142 @@
+# ===================================================================
+# app/saturacao.py (PARADA ANTECIPADA DA EXTRAÇÃO POR SATURAÇÃO)
+#
+# Funcionalidades:
+# - VISÃO CONSOLIDADA: Acompanha, chunk a chunk, os campos obrigatórios do
+#   PJe-Calc (número do processo, partes, contrato, salário e verbas) à
+#   medida que os resultados parciais chegam.
+# - CONFIANÇA POR CAMPO: Um campo escalar é considerado confirmado quando o
+#   mesmo valor aparece em um número mínimo de chunks. A lista de verbas é
+#   considerada saturada quando para de crescer por alguns chunks seguidos.
+# - RELEVÂNCIA DO CHUNK: Depois que todos os campos estão saturados, chunks
+#   de baixa relevância (provas, atas, notificações) deixam de ser enviados
+#   ao Gemini; chunks com termos de pedido/decisão continuam sendo lidos.
+# ===================================================================
+
+import os
+import re
+from collections import Counter
+from normalizacao import normalizar_texto
+
+# Campos escalares obrigatórios: (bloco, campo) no JSON de extração
+CAMPOS_OBRIGATORIOS = [
+    ("dados_processuais", "numero_processo"),
+    ("partes", "reclamante"),
+    ("partes", "reclamadas"),
+    ("contrato_trabalho", "data_admissao"),
+    ("contrato_trabalho", "data_demissao_rescisao_indireta"),
+    ("contrato_trabalho", "salario_base"),
+]
+
+# Valores que o modelo devolve quando não encontrou a informação
+VALORES_VAZIOS = {"", "string", "n/a", "na", "[nao informado]", "nao informado", "none", "null", "..."}
+
+# Termos que indicam trechos com pedidos, decisões ou dados contratuais
+TERMOS_RELEVANTES = [
+    r"\bpedidos?\b", r"\bverbas?\b", r"\bcondena", r"\bjulgo\b", r"\bsentenca\b",
+    r"\bacordao\b", r"\bpeticao inicial\b", r"\brescisa", r"\bsalario\b", r"\badmiti",
+    r"\badmissao\b", r"\bdemissao\b", r"\breclamante\b", r"\bferias\b", r"\baviso previo\b",
+    r"\bfgts\b", r"\bhoras extras\b", r"\bdano moral\b", r"\bmulta\b", r"\bart\.? ?4[67]7\b",
+    r"r\$ ?\d",
+]
+_REGEX_RELEVANCIA = [re.compile(t) for t in TERMOS_RELEVANTES]
+
+
+def _normalizar(valor):
+    """Normaliza um valor para comparação (minúsculas, sem acentos e espaços extras)."""
+    if isinstance(valor, list):
+        itens = sorted(_normalizar(v) for v in valor)
+        return "; ".join(i for i in itens if i)
+    texto = re.sub(r"\s+", " ", normalizar_texto(str(valor or "")))
+    return "" if texto in VALORES_VAZIOS else texto
+
+
+class RastreadorSaturacao:
+    """
+    Mantém uma visão consolidada dos resultados parciais e indica quando
+    todos os campos obrigatórios já foram confirmados.
+    """
+
+    def __init__(self, confirmacoes_minimas=2, janela_verbas=3, relevancia_minima=3):
+        self.confirmacoes_minimas = confirmacoes_minimas
+        self.janela_verbas = janela_verbas
+        self.relevancia_minima = relevancia_minima
+        self.ativo = os.getenv("EXTRACAO_PARADA_SATURACAO", "1") != "0"
+
+        self.contagens = {campo: Counter() for campo in CAMPOS_OBRIGATORIOS}
+        self.valores_originais = {}
+        self.verbas = {}
+        self.chunks_sem_verba_nova = 0
+        self.chunks_processados = 0
+        self.chunks_ignorados = 0
+
+    def registrar(self, resultado):
+        """Atualiza a visão consolidada com o JSON extraído de um chunk."""
+        if not isinstance(resultado, dict):
+            return
+        self.chunks_processados += 1
+
+        for bloco, campo in CAMPOS_OBRIGATORIOS:
+            dados_bloco = resultado.get(bloco)
+            if not isinstance(dados_bloco, dict):
+                continue
+            valor = dados_bloco.get(campo)
+            chave = _normalizar(valor)
+            if chave:
+                self.contagens[(bloco, campo)][chave] += 1
+                self.valores_originais.setdefault((bloco, campo, chave), valor)
+
+        novas = 0
+        pleitos = resultado.get("pleitos_e_verbas")
+        if isinstance(pleitos, list):
+            for pleito in pleitos:
+                if not isinstance(pleito, dict):
+                    continue
+                nome = _normalizar(pleito.get("verba"))
+                if nome and nome not in self.verbas:
+                    self.verbas[nome] = pleito.get("verba")
+                    novas += 1
+
+        self.chunks_sem_verba_nova = 0 if novas else self.chunks_sem_verba_nova + 1
+
+    def campos_pendentes(self):
+        """Lista os campos obrigatórios ainda sem confiança suficiente."""
+        pendentes = []
+        for bloco, campo in CAMPOS_OBRIGATORIOS:
+            mais_comuns = self.contagens[(bloco, campo)].most_common(1)
+            if not mais_comuns or mais_comuns[0][1] < self.confirmacoes_minimas:
+                pendentes.append(f"{bloco}.{campo}")
+        if not self.verbas or self.chunks_sem_verba_nova < self.janela_verbas:
+            pendentes.append("pleitos_e_verbas")
+        return pendentes
+
+    def saturado(self):
+        """True quando todos os campos obrigatórios estão confirmados."""
+        return self.ativo and not self.campos_pendentes()
+
+    def relevancia(self, chunk):
+        """Pontua o chunk pela quantidade de termos de pedido/decisão distintos."""
+        texto = _normalizar(chunk)
+        return sum(1 for regex in _REGEX_RELEVANCIA if regex.search(texto))
+
+    def deve_processar(self, chunk):
+        """
+        Decide se o chunk ainda deve ser enviado ao modelo. Antes da saturação
+        todos são processados; depois, apenas os de relevância alta.
+        """
+        if not self.saturado():
+            return True
+        if self.relevancia(chunk) >= self.relevancia_minima:
+            return True
+        self.chunks_ignorados += 1
+        return False
+
+    def visao_consolidada(self):
+        """Retorna o valor mais frequente de cada campo e as verbas encontradas."""
+        visao = {}
+        for (bloco, campo), contagem in self.contagens.items():
+            if contagem:
+                chave = contagem.most_common(1)[0][0]
+                visao.setdefault(bloco, {})[campo] = self.valores_originais[(bloco, campo, chave)]
+        visao["pleitos_e_verbas"] = list(self.verbas.values())
+        return visao